@@ -2,10 +2,11 @@
 TradingView Flask 애플리케이션
 Yahoo Finance 데이터를 조회하고 TradingView 차트로 표시합니다.
 """
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
+import json
 import pandas as pd
 import logging
 import numpy as np
@@ -15,11 +16,15 @@ from services.yahoo_finance_service import YahooFinanceService
 from utils.technical_analysis import analyze_chart as analyze
 from services.news_analysis_service import analyze_news_endpoint
 from services.ai_analysis_service import analyze_ai_endpoint
+from services.batch_prediction_service import iter_batch_ai_predictions
 from services.chart_pattern_service import analyze_chart_patterns_endpoint
-from services.news_rss_service import get_news_rss_endpoint
+from services.backtest_service import run_backtest_endpoint
+from services.feed_snapshot_service import get_feed_snapshot_endpoint, get_feed_snapshot_store, FEED_SNAPSHOT_ENABLED
 from services.portfolio_optimizer_service import optimize_portfolio_endpoint, get_available_stocks
 from services.chatbot_service import chat_endpoint
+from services.job_service import job_manager
 import re
+import multiprocessing
 
 try:
     # (이 파일들은 flask-service/ 폴더에 복사되어 있어야 합니다)
@@ -258,44 +263,63 @@ def convert_numpy_types(obj):
         
     return obj
 
+def _build_portfolio_request(data):
+    """
+    요청 본문(stocks 목록)에서 tickers_info와 전문가 설정을 만듭니다.
+    종목이 2개 미만이면 ValueError를 발생시킵니다.
+    """
+    selected_stocks = (data or {}).get('stocks', []) # 예: ["삼성전자 (005930)", "Apple (AAPL)"]
+    
+    if not selected_stocks or len(selected_stocks) < 2:
+        raise ValueError("최소 2개 이상의 종목을 선택해야 합니다.")
+
+    # 1. tickers_info 딕셔너리 생성 (2_AI_Portfolio.py 코드와 동일)
+    tickers_info = {s.split(" (")[0].strip(): re.search(r"\((.*?)\)", s).group(1) for s in selected_stocks}
+    
+    # 2. 전문가 설정 (2_AI_Portfolio.py의 기본값 사용)
+    expert_rules = {
+        "base_weight": 0.90,
+        "sentiment_map": {
+            "매우 긍정적": 0.10, "긍정적": 0.05, "중립적": 0.0, 
+            "부정적": -0.10, "매우 부정적": -0.20
+        },
+        "prediction_weights": {
+            "상승": 0.05, "하락": -0.15, "중립": 0.0
+        }
+    }
+    return tickers_info, expert_rules
+
+
+def _run_portfolio_optimization(data, progress=None):
+    """포트폴리오 최적화 실행 (동기 엔드포인트와 작업 큐가 공유)"""
+    tickers_info, expert_rules = _build_portfolio_request(data)
+    if progress:
+        progress(0.05, "포트폴리오 분석 시작")
+    
+    # 3. 핵심 로직 실행 (복사해 온 backend_logic.py의 함수 호출)
+    analysis_result = run_full_portfolio_analysis(
+        tickers_info, 
+        expert_rules, 
+        use_news_sentiment=True 
+    )
+    
+    # 4. 결과 반환
+    return convert_numpy_types(analysis_result)
+
+
 @app.route('/api/optimize-portfolio', methods=['POST'])
 def optimize_portfolio_api():
     """
     프론트엔드(HTML)에서 선택한 종목 목록을 받아 포트폴리오 최적화를 실행합니다.
     """
     data = request.json
-    selected_stocks = data.get('stocks', []) # 예: ["삼성전자 (005930)", "Apple (AAPL)"]
+    selected_stocks = data.get('stocks', [])
     
     if not selected_stocks or len(selected_stocks) < 2:
         return jsonify({"error": "최소 2개 이상의 종목을 선택해야 합니다."}), 400
 
     try:
-        # 1. tickers_info 딕셔너리 생성 (2_AI_Portfolio.py 코드와 동일)
-        tickers_info = {s.split(" (")[0].strip(): re.search(r"\((.*?)\)", s).group(1) for s in selected_stocks}
-        
-        # 2. 전문가 설정 (2_AI_Portfolio.py의 기본값 사용)
-        expert_rules = {
-            "base_weight": 0.90,
-            "sentiment_map": {
-                "매우 긍정적": 0.10, "긍정적": 0.05, "중립적": 0.0, 
-                "부정적": -0.10, "매우 부정적": -0.20
-            },
-            "prediction_weights": {
-                "상승": 0.05, "하락": -0.15, "중립": 0.0
-            }
-        }
-        
-        # 3. 핵심 로직 실행 (복사해 온 backend_logic.py의 함수 호출)
-        analysis_result = run_full_portfolio_analysis(
-            tickers_info, 
-            expert_rules, 
-            use_news_sentiment=True 
-        )
-        
-        # 4. 결과 반환
-        cleaned_result = convert_numpy_types(analysis_result)
-        
-        return jsonify(cleaned_result)
+        return jsonify(_run_portfolio_optimization(data))
     
     except Exception as e:
         app.logger.error(f"포트폴리오 최적화 오류: {e}")
@@ -560,6 +584,34 @@ def analyze_ai():
         }), 500
 
 
+@app.route('/api/ai/analyze/batch', methods=['POST'])
+def analyze_ai_batch():
+    """
+    배치 AI 분석 엔드포인트 (여러 종목을 병렬 처리)
+    
+    Request Body:
+        {'companies': [{'symbol': 'AAPL'}, {'symbol': '005930.KS'}, ...]}
+    
+    Returns:
+        NDJSON 스트림: 종목별 결과를 완료되는 순서대로 한 줄씩 전송하고,
+        마지막 줄에 {'done': true, 'total': N} 을 전송합니다.
+    """
+    data = request.get_json() or {}
+    
+    def generate():
+        total = 0
+        try:
+            for result in iter_batch_ai_predictions(data):
+                total += 1
+                yield json.dumps(convert_numpy_types(result), ensure_ascii=False) + '\n'
+        except Exception as e:
+            logger.error(f"Error in analyze_ai_batch: {str(e)}")
+            yield json.dumps({'success': False, 'error': str(e)}, ensure_ascii=False) + '\n'
+        yield json.dumps({'done': True, 'total': total}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 @app.route('/api/chart/analyze-patterns', methods=['POST'])
 def analyze_chart_patterns():
     """차트 패턴 분석 엔드포인트"""
@@ -577,10 +629,10 @@ def analyze_chart_patterns():
 
 @app.route('/api/news/rss', methods=['GET'])
 def get_news_rss():
-    """RSS 뉴스 피드 엔드포인트"""
+    """RSS 뉴스 피드 엔드포인트 (백그라운드에서 갱신되는 메모리 스냅샷 반환)"""
     try:
         feed_key = request.args.get('feed', None)
-        result = get_news_rss_endpoint(feed_key)
+        result = get_feed_snapshot_endpoint(feed_key)
         return jsonify(result)
     except Exception as e:
         logger.error(f"Error in get_news_rss: {str(e)}")
@@ -622,6 +674,99 @@ def optimize_portfolio():
         }), 500
 
 
+# --- 비동기 작업(Job) API ---
+# 오래 걸리는 분석을 작업 큐에서 실행합니다. (POST로 작업 생성 -> GET으로 진행률/결과 조회)
+job_manager.register('optimize-portfolio', _run_portfolio_optimization)
+job_manager.register('ai-analyze', analyze_ai_endpoint)
+job_manager.register('chart-patterns', analyze_chart_patterns_endpoint)
+job_manager.register('backtest', run_backtest_endpoint)
+
+# 백그라운드 서비스는 서버 프로세스에서만 시작 (배치 예측 프로세스 풀은 spawn 방식이라 워커가 이 모듈을 다시 import 함)
+if multiprocessing.parent_process() is None:
+    # FINBERT_PRELOAD=true 이면 서버 시작 시 백그라운드에서 FinBERT 모델을 미리 로드 (첫 감성 분석 요청 지연 방지)
+    if os.getenv('FINBERT_PRELOAD', 'false').lower() == 'true':
+        from services.sentiment_service import get_sentiment_service
+        get_sentiment_service().preload()
+
+    # 뉴스 수집 분석 워커 시작 (큐가 비어 있는 동안 미분석 기사를 주기적으로 백필)
+    # NEWS_INGEST_BACKFILL_ON_START=true 이면 첫 주기를 기다리지 않고 바로 백필 시작
+    from services.news_ingest_service import NEWS_INGEST_ENABLED, get_news_ingest_worker
+    if NEWS_INGEST_ENABLED:
+        if os.getenv('NEWS_INGEST_BACKFILL_ON_START', 'false').lower() == 'true':
+            get_news_ingest_worker().backfill_unscored()
+        else:
+            get_news_ingest_worker().start()
+
+    # 뉴스 피드 스냅샷 스케줄러 시작 (첫 페이지 로드 전에 스냅샷을 미리 준비)
+    if FEED_SNAPSHOT_ENABLED:
+        get_feed_snapshot_store().start()
+
+    # BROWSER_POOL_WARM=true 이면 야후 크롤링용 헤드리스 브라우저를 미리 띄워 둠 (스케줄 크롤링 시 브라우저 부팅 지연 제거)
+    if os.getenv('BROWSER_POOL_WARM', 'false').lower() == 'true':
+        from crawlers import browser_pool
+        browser_pool.warm()
+
+
+@app.route('/api/jobs/<kind>', methods=['POST'])
+def submit_job(kind):
+    """
+    작업 생성 엔드포인트
+    
+    Args:
+        kind: 'optimize-portfolio', 'ai-analyze', 'chart-patterns', 'backtest'
+    
+    Request Body:
+        각 동기 엔드포인트와 동일한 요청 본문
+    
+    Returns:
+        202 응답: {'success': True, 'job': 작업 상태 (job_id, status, progress, cached ...)}
+        (같은 입력으로 완료된 작업이 있으면 결과가 포함된 작업이 즉시 반환됩니다)
+    """
+    try:
+        data = request.get_json() or {}
+        if kind == 'optimize-portfolio':
+            _build_portfolio_request(data)  # 입력 검증 (실패 시 ValueError)
+        job = job_manager.submit(kind, data)
+        return jsonify({'success': True, 'job': convert_numpy_types(job)}), 202
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in submit_job: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """작업 상태/결과 조회 엔드포인트 (폴링용)"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': convert_numpy_types(job)})
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """작업 진행 상황 구독 엔드포인트 (Server-Sent Events, 완료 시 스트림 종료)"""
+    if job_manager.get(job_id) is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    
+    def generate():
+        last_version = -1
+        while True:
+            job = job_manager.wait_for_update(job_id, last_version)
+            if job is None:
+                break
+            if job['version'] != last_version:
+                last_version = job['version']
+                yield f"data: {json.dumps(convert_numpy_types(job), ensure_ascii=False, default=str)}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+            if job['status'] in ('succeeded', 'failed'):
+                break
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream')
+
+
 @app.route('/api/chatbot/chat', methods=['POST'])
 def chatbot_chat():
     """AI 챗봇 엔드포인트"""
@@ -7,7 +7,6 @@ import time
 import re
 import hashlib
 import math
-import copy
 import concurrent.futures
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
@@ -15,6 +14,7 @@ from pathlib import Path
 # --- 서드파티 라이브러리 ---
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import requests
 from dotenv import load_dotenv
 import mysql.connector
@@ -37,9 +37,6 @@ from sklearn.metrics import (
 from sklearn.preprocessing import MinMaxScaler
 
 # ML / DL
-import torch
-import torch.nn.functional as F
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from tensorflow import keras
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
@@ -53,6 +50,16 @@ from db_utils import ( # db_utils에서 필요한 함수들을 가져옵니다.
     news_sources_exist, get_articles_since, get_daily_stock_sentiment_scores
 )
 from crawlers import search_domestic_news, search_overseas_news
+from model_backends import DIRECTION_MODEL_BACKENDS, create_direction_model, create_direction_model_for_ticker
+from services.batch_prediction_service import BatchPredictionService
+from http_client import http_get
+from services.sentiment_service import get_sentiment_service, get_korean_sentiment_service
+from services.sentiment_cache import get_headline_sentiment_cache
+from services.translation_service import TranslationScheduler, TranslationCountMismatch, request_translations
+from services.sentiment_aggregation import (
+    get_decayed_daily_sentiment, get_sentiment_aggregator, aggregate_articles, score_to_sentiment_label,
+    SENTIMENT_MIN_EFFECTIVE_WEIGHT
+)
 
 # 기술적 분석
 try:
@@ -237,12 +244,77 @@ def get_stock_data(ticker, years=3):
 
 # --- LSTM 모델 관련 함수 ---
 def create_sequences(data, target, time_steps=60):
-    """LSTM 입력용 시퀀스 데이터를 생성합니다."""
-    X, y = [], []
-    for i in range(len(data) - time_steps):
-        X.append(data[i:(i + time_steps)])
-        y.append(target[i + time_steps])
-    return np.array(X), np.array(y)
+    """
+    LSTM 입력용 시퀀스 데이터를 생성합니다.
+    [수정] 윈도우를 복사하지 않고 sliding_window_view로 원본 배열의 '뷰'를 반환합니다.
+    (반환된 X는 읽기 전용이며 shape은 (샘플 수, time_steps, 피처 수))
+    """
+    data = np.asarray(data)
+    target = np.asarray(target)
+    n_samples = len(data) - time_steps
+    if n_samples <= 0:
+        return np.empty((0, time_steps, data.shape[1] if data.ndim > 1 else 1)), np.empty((0,))
+    # sliding_window_view는 (윈도우 수, 피처 수, time_steps) 뷰를 만들므로 축만 바꿔줍니다.
+    windows = sliding_window_view(data, time_steps, axis=0)[:n_samples]
+    X = windows.transpose(0, 2, 1) if data.ndim > 1 else windows[..., np.newaxis]
+    return X, target[time_steps:]
+
+
+class SlidingWindowSequence(keras.utils.Sequence):
+    """
+    create_sequences가 만든 윈도우 뷰에서 배치 단위로만 데이터를 꺼내 모델에 공급합니다.
+    전체 (샘플 수 x time_steps x 피처 수) 배열을 메모리에 만들지 않으므로
+    학습 데이터 기간/피처 수와 무관하게 추가 메모리는 배치 크기만큼만 사용됩니다.
+    """
+    def __init__(self, X, y=None, indices=None, batch_size=32, shuffle=False):
+        super().__init__()
+        self.X = X
+        self.y = y
+        # 매 에폭 제자리에서 섞으므로 호출한 쪽의 인덱스 배열(폴드 인덱스 등)은 복사해서 사용
+        self.indices = np.arange(len(X)) if indices is None else np.array(indices, copy=True)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        if self.shuffle:
+            np.random.shuffle(self.indices)  # fit(shuffle=True) 처럼 첫 에폭부터 섞음
+
+    def __len__(self):
+        return math.ceil(len(self.indices) / self.batch_size)
+
+    def __getitem__(self, idx):
+        batch_idx = self.indices[idx * self.batch_size:(idx + 1) * self.batch_size]
+        X_batch = np.ascontiguousarray(self.X[batch_idx], dtype=np.float32)
+        if self.y is None:
+            return X_batch
+        return X_batch, self.y[batch_idx]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.indices)
+
+
+def _evaluate_lstm_folds(X, y, n_splits=5):
+    """시퀀스 뷰(X)와 타겟(y)으로 TimeSeriesSplit 교차검증을 수행합니다 (LSTM 공통)."""
+    tscv = TimeSeriesSplit(n_splits=n_splits); scores, total_cm = [], np.zeros((2, 2))
+    for train_index, test_index in tscv.split(X):
+        y_test = y[test_index]
+        model = keras.models.Sequential([
+            keras.layers.LSTM(50, return_sequences=True, input_shape=(X.shape[1], X.shape[2])),
+            keras.layers.Dropout(0.2),
+            keras.layers.LSTM(50), keras.layers.Dropout(0.2),
+            keras.layers.Dense(25), keras.layers.Dense(1, activation='sigmoid')
+        ])
+        model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+        model.fit(SlidingWindowSequence(X, y, train_index, batch_size=32, shuffle=True), epochs=10, verbose=0)
+        y_pred = (model.predict(SlidingWindowSequence(X, indices=test_index, batch_size=256), verbose=0) > 0.5).astype(int)
+        scores.append({
+            "Accuracy": accuracy_score(y_test, y_pred),
+            "F1-Score": f1_score(y_test, y_pred, labels=[0, 1], zero_division=0),
+            "Precision": precision_score(y_test, y_pred, labels=[0, 1], zero_division=0),
+            "Recall": recall_score(y_test, y_pred, labels=[0, 1], zero_division=0)
+        })
+        cm = confusion_matrix(y_test, y_pred, labels=[0, 1])
+        if cm.shape == (2, 2): total_cm += cm
+    return pd.DataFrame(scores).mean().to_dict(), total_cm.astype(int)
 
 # 1. LSTM (기본)
 def train_and_evaluate_lstm(ticker, years):
@@ -267,42 +339,28 @@ def train_and_evaluate_lstm(ticker, years):
         print(f"LSTM 오류: 시퀀스 데이터 생성 불가 (데이터 수: {len(df)})")
         return None, None, None
 
-    tscv = TimeSeriesSplit(n_splits=5); scores, total_cm = [], np.zeros((2, 2))
-    for train_index, test_index in tscv.split(X):
-        X_train, X_test = X[train_index], X[test_index]; y_train, y_test = y[train_index], y[test_index]
-        model = keras.models.Sequential([
-            keras.layers.LSTM(50, return_sequences=True, input_shape=(X_train.shape[1], X_train.shape[2])),
-            keras.layers.Dropout(0.2),
-            keras.layers.LSTM(50), keras.layers.Dropout(0.2),
-            keras.layers.Dense(25), keras.layers.Dense(1, activation='sigmoid')
-        ])
-        model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
-        model.fit(X_train, y_train, batch_size=32, epochs=10, verbose=0)
-        y_pred = (model.predict(X_test, verbose=0) > 0.5).astype(int)
-        scores.append({
-            "Accuracy": accuracy_score(y_test, y_pred),
-            "F1-Score": f1_score(y_test, y_pred, labels=[0, 1], zero_division=0),
-            "Precision": precision_score(y_test, y_pred, labels=[0, 1], zero_division=0),
-            "Recall": recall_score(y_test, y_pred, labels=[0, 1], zero_division=0)
-        })
-        cm = confusion_matrix(y_test, y_pred, labels=[0, 1])
-        if cm.shape == (2, 2): total_cm += cm
-    avg_metrics = pd.DataFrame(scores).mean().to_dict(); return avg_metrics, total_cm.astype(int), valid_features
+    # (의존성) _evaluate_lstm_folds 함수 호출 (배치 단위 공급)
+    avg_metrics, total_cm = _evaluate_lstm_folds(X, y)
+    return avg_metrics, total_cm, valid_features
 
 # --- 트리 기반 모델 공통 학습/평가 함수 ---
 def _train_tree_model(X, y, model_type='rf', n_estimators=100, max_depth=10, min_samples_leaf=5):
-    """RF 모델 학습 및 평가 (하이퍼파라미터 인자 사용)."""
+    """
+    방향 예측 모델 학습 및 평가 (하이퍼파라미터 인자 사용).
+    [수정] model_type 으로 model_backends 의 백엔드('rf', 'hgb', 'logistic')를 선택합니다.
+    (n_estimators, max_depth, min_samples_leaf 는 'rf' 에만 적용)
+    """
     tscv = TimeSeriesSplit(n_splits=5)
     scores, total_cm = [], np.zeros((2, 2))
     model = None
-    if model_type != 'rf': raise ValueError(f"지원하지 않는 모델 타입: {model_type}")
+    if model_type not in DIRECTION_MODEL_BACKENDS: raise ValueError(f"지원하지 않는 모델 타입: {model_type}")
+    model_params = dict(n_estimators=n_estimators, max_depth=max_depth, min_samples_leaf=min_samples_leaf) if model_type == 'rf' else {}
 
     for train_index, test_index in tscv.split(X):
         X_train, X_test = X.iloc[train_index], X.iloc[test_index]
         y_train, y_test = y.iloc[train_index], y.iloc[test_index]
 
-        model = RandomForestClassifier(n_estimators=n_estimators, random_state=42, n_jobs=-1,
-                                       max_depth=max_depth, min_samples_leaf=min_samples_leaf)
+        model = create_direction_model(model_type, **model_params)
 
         model.fit(X_train, y_train)
         y_pred = model.predict(X_test)
@@ -387,7 +445,7 @@ def train_and_evaluate_rf_MA_MACD_RSI(ticker, years):
 
 # 공통: 감성 점수 데이터 병합 함수
 def _merge_sentiment_data(df_ohlcv, ticker, start_date, end_date):
-    """[수정] '종목별' 일별 평균 감성 '점수 계산' 함수를 호출하여 병합 (시간대/인덱스/컬럼 레벨 최종 수정)"""
+    """[수정] '종목별' 일별 감성 점수(시간 감쇠 + 신뢰도 가중)를 조회하여 병합 (시간대/인덱스/컬럼 레벨 최종 수정)"""
     if df_ohlcv.empty: return df_ohlcv
 
     try:
@@ -420,8 +478,8 @@ def _merge_sentiment_data(df_ohlcv, ticker, start_date, end_date):
         df_ohlcv_processed.columns = df_ohlcv_processed.columns.get_level_values(0)
         df_ohlcv_processed = df_ohlcv_processed.loc[:,~df_ohlcv_processed.columns.duplicated()]
 
-    # (의존성) get_daily_stock_sentiment_scores 함수 호출
-    df_sentiment = get_daily_stock_sentiment_scores(ticker, start_dt_utc, end_dt_utc)
+    # [수정] 단순 평균(get_daily_stock_sentiment_scores) 대신 감쇠 가중 일별 시계열 사용
+    df_sentiment = get_decayed_daily_sentiment(ticker, start_dt_utc, end_dt_utc)
 
     df_sentiment_processed = pd.DataFrame(columns=['sentiment_score'])
     df_sentiment_processed.index.name = 'Date'
@@ -472,26 +530,9 @@ def train_and_evaluate_lstm_with_sentiment(ticker, years):
     X, y = create_sequences(scaled_data, df['Target'].values);
     if X.shape[0] == 0: return None, None, None
 
-    tscv = TimeSeriesSplit(n_splits=5); scores, total_cm = [], np.zeros((2, 2))
-    for train_index, test_index in tscv.split(X):
-        X_train, X_test = X[train_index], X[test_index]; y_train, y_test = y[train_index], y[test_index]
-        model = keras.models.Sequential([
-            keras.layers.LSTM(50, return_sequences=True, input_shape=(X_train.shape[1], X_train.shape[2])),
-            keras.layers.Dropout(0.2), keras.layers.LSTM(50), keras.layers.Dropout(0.2),
-            keras.layers.Dense(25), keras.layers.Dense(1, activation='sigmoid')
-        ])
-        model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
-        model.fit(X_train, y_train, batch_size=32, epochs=10, verbose=0)
-        y_pred = (model.predict(X_test, verbose=0) > 0.5).astype(int)
-        scores.append({
-            "Accuracy": accuracy_score(y_test, y_pred),
-            "F1-Score": f1_score(y_test, y_pred, labels=[0, 1], zero_division=0),
-            "Precision": precision_score(y_test, y_pred, labels=[0, 1], zero_division=0),
-            "Recall": recall_score(y_test, y_pred, labels=[0, 1], zero_division=0)
-        })
-        cm = confusion_matrix(y_test, y_pred, labels=[0, 1])
-        if cm.shape == (2, 2): total_cm += cm
-    avg_metrics = pd.DataFrame(scores).mean().to_dict(); return avg_metrics, total_cm.astype(int), valid_features
+    # (의존성) _evaluate_lstm_folds 함수 호출 (배치 단위 공급)
+    avg_metrics, total_cm = _evaluate_lstm_folds(X, y)
+    return avg_metrics, total_cm, valid_features
 
 # 7. Baseline RF + Sentiment
 def train_and_evaluate_rf_baseline_with_sentiment(ticker, years):
@@ -675,7 +716,11 @@ def predict_stock(ticker: str, years: int = 1, data_df: pd.DataFrame = None) ->
         X_cls = df_cls[features_to_use]
         y_cls = df_cls['Target']
 
-        cls_model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1, max_depth=10, min_samples_leaf=5)
+        # (의존성) create_direction_model_for_ticker 함수 호출 (model_backends.py, 기본 백엔드는 DIRECTION_MODEL_BACKEND)
+        # model_registry 에 오프라인 탐색으로 찾은 종목별 하이퍼파라미터가 있고 피처/기간이 같으면 적용
+        # (제공된 data_df 로 학습할 때는 기간을 알 수 없으므로 기본값)
+        cls_model = create_direction_model_for_ticker(fdr_ticker, features=features_to_use,
+                                                      years=years if data_df is None else None)
         cls_model.fit(X_cls, y_cls)
 
         latest_data_features = df_model_ready[features_to_use].iloc[-1].values.reshape(1, -1)
@@ -727,214 +772,218 @@ print("모듈 로드: news_analyzer.py")
 load_dotenv()
 try:
     if not os.environ.get("OPENAI_API_KEY"): raise ValueError("...")
-    news_analyzer_client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    # OPENAI_BASE_URL 지정 시 해당 서버(예: 로컬 스텁)로 요청
+    news_analyzer_client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), base_url=os.environ.get("OPENAI_BASE_URL") or None)
     print("OpenAI 클라이언트 (번역용) 설정 완료.")
 except Exception as e:
     print(f"오류: OpenAI 클라이언트 초기화 실패: {e}"); news_analyzer_client = None
 
 # --- EN-FinBERT 모델 로드 ---
+# [수정] 모델은 services.sentiment_service 가 프로세스당 한 번만 로드하여 보관합니다.
 def load_en_finbert_model():
-    try:
-        model_name = "ProsusAI/finbert"; tokenizer = AutoTokenizer.from_pretrained(model_name)
-        model = AutoModelForSequenceClassification.from_pretrained(model_name)
-        print("EN-FinBERT 모델 로드 완료."); return tokenizer, model
-    except Exception as e: print(f"오류: EN-FinBERT 모델 로딩 실패: {e}"); return None, None
+    service = get_sentiment_service()
+    if not service.load(): print("오류: EN-FinBERT 모델 로딩 실패"); return None, None
+    return service._tokenizer, service._model
+
+# --- OpenAI 배치 번역 함수 ---
+# [수정] 요청 로직은 services.translation_service.request_translations 로 이동 (실패 시 예외 발생)
+def _request_translations(headlines_ko: list[str]) -> list[str | None]:
+    if not news_analyzer_client: raise RuntimeError("OpenAI 클라이언트 없음")
+    return request_translations(news_analyzer_client, headlines_ko)
 
-# --- OpenAI 배치 번역 함수 (변경 없음) ---
 def translate_headlines_batch_openai(headlines_ko: list[str]) -> list[str | None]:
     if not news_analyzer_client: print("OpenAI 클라이언트 없음"); return [None] * len(headlines_ko)
-    numbered_headlines = "\n".join([f"{i+1}. {h}" for i, h in enumerate(headlines_ko)])
-    system_prompt = "You are a helpful assistant who translates Korean news headlines into English."
-    user_prompt = f"""Translate the following numbered Korean headlines into English.
-Return the results ONLY as a JSON object containing a single key "translations" which holds a list of strings. Each string in the list must be the English translation corresponding to the numbered headline.
-Example JSON structure: {{"translations": ["translation 1", "translation 2", ...]}}
-
-Korean Headlines:
-{numbered_headlines}
-
-JSON Result:"""
     try:
-        response = news_analyzer_client.chat.completions.create(
-            model="gpt-4o-mini", messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
-            max_tokens=len(headlines_ko) * 70, temperature=0.0, response_format={"type": "json_object"})
-        result_text = response.choices[0].message.content.strip(); result_json = json.loads(result_text)
-        translations = result_json.get("translations")
-        if isinstance(translations, list) and len(translations) == len(headlines_ko):
-            cleaned = [t.strip().strip('"').strip("'") if isinstance(t, str) else None for t in translations]
-            print(f"배치 번역 성공 ({len(headlines_ko)}개)"); return cleaned
-        else: print(f"배치 번역 결과 형식/개수 오류..."); return [None] * len(headlines_ko)
+        cleaned = _request_translations(headlines_ko)
+        print(f"배치 번역 성공 ({len(headlines_ko)}개)"); return cleaned
+    except TranslationCountMismatch as e: print(f"배치 번역 결과 형식/개수 오류... ({e})"); return [None] * len(headlines_ko)
     except Exception as e: print(f"OpenAI 배치 번역 오류: {e}"); return [None] * len(headlines_ko)
 
+# [신규] 번역 배치를 RPM/TPM 예산 안에서 동시에 요청 (재시도 + 개수 불일치 시 분할)
+translation_scheduler = TranslationScheduler(_request_translations)
+
 # --- 개별 언어 감지 함수 (변경 없음) ---
 def get_headline_language(headline: str) -> str:
     if not headline: return 'en'
     if re.search("[ㄱ-ㅎㅏ-ㅣ가-힣]", headline): return 'ko'
     return 'en'
 
-# --- EN-FinBERT 예측 함수 (변경 없음) ---
+# --- EN-FinBERT 예측 함수 ---
+# [수정] 매 호출마다 모델을 다시 로드하지 않고, 공유 추론 서비스(get_sentiment_service)에 위임
 def predict_sentiment_en_finbert(headlines: list):
-    tokenizer, model = load_en_finbert_model()
-    if not tokenizer or not model: print("경고: EN-FinBERT 모델 없음"); return [{'sentiment': 'neutral', 'confidence': 0.5}] * len(headlines)
-    id2label = {0: "positive", 1: "negative", 2: "neutral"}
-    results = []
-    try:
-        inputs = tokenizer(headlines, padding=True, truncation=True, return_tensors="pt", max_length=512)
-        with torch.no_grad(): outputs = model(**inputs)
-        probs = F.softmax(outputs.logits, dim=1); preds = torch.argmax(probs, dim=1)
-        for i in range(len(headlines)): pred_id = preds[i].item(); results.append({'sentiment': id2label[pred_id], 'confidence': probs[i][pred_id].item()})
-        print(f"EN-FinBERT 예측 완료 ({len(headlines)}개)")
-    except Exception as e: print(f"오류: EN-FinBERT 예측 오류: {e}"); results = [{'sentiment': 'neutral', 'confidence': 0.5}] * len(headlines)
+    results = get_sentiment_service().predict(headlines)
+    print(f"EN-FinBERT 예측 완료 ({len(headlines)}개)")
     return results
 
+def _check_result_count(results: list, count: int, source: str):
+    """
+    [신규] 감성 모델 결과 개수가 입력 헤드라인 수와 다르면 위치를 신뢰할 수 없으므로
+    전체를 실패(fallback: 중립, 신뢰도 0)로 처리합니다. (번역 경로의 TranslationCountMismatch 와 동일한 취지)
+    """
+    if results is not None and len(results) == count:
+        return results
+    print(f"경고: {source} 결과 개수 오류 ({len(results) if results is not None else None} != {count}). 해당 항목을 분석 실패로 처리합니다.")
+    return [{'sentiment': 'neutral', 'confidence': 0.0, 'fallback': True} for _ in range(count)]
+
+# --- [수정] 감성 집계 공통 함수 (레이블 코드 배열 기반) ---
+# 레이블 코드 = gamma 점수 + 1 (negative=-1, neutral=0, positive=1)
+SENTIMENT_LABELS = ('negative', 'neutral', 'positive')
+_GAMMA_BY_LABEL = {'negative': -1, 'positive': 1}
+
+def _sentiment_outlook(name: str, score: float, source_desc: str):
+    if score > 0.1: return f"{name} 관련 {source_desc} 감성이 긍정적입니다.", "적극 투자"
+    elif score < -0.1: return f"{name} 관련 {source_desc} 감성이 부정적입니다.", "보수적/방어적 투자"
+    return f"{name} 관련 {source_desc} 감성은 중립적입니다.", "중립"
+
+def _summarize_gamma(gamma: np.ndarray):
+    """gamma(int8) 배열 -> (평균 점수, 레이블별 개수)"""
+    counts = np.bincount(gamma.astype(np.int64) + 1, minlength=3)
+    score = float(gamma.mean()) if len(gamma) else 0.0
+    return score, {"total": int(len(gamma)), "positive": int(counts[2]), "negative": int(counts[0]), "neutral": int(counts[1])}
+
+def _materialize_articles(news_items: list, headlines: list, gamma: np.ndarray, confidence: np.ndarray):
+    """출력용 기사 레코드를 한 번만 생성 (원본 항목은 수정하지 않음)"""
+    return [
+        {**item, 'headline': headlines[i], 'link': item.get('link', '#'),
+         'sentiment': SENTIMENT_LABELS[gamma[i] + 1], 'confidence': confidence[i]}
+        for i, item in enumerate(news_items)
+    ]
+
 # --- (내부용) 영어 뉴스 종합 분석 함수 ---
 def _analyze_sentiment_english(news_items: list, name: str):
-    """[수정] 분석 결과에 sentiment 레이블만 포함"""
+    """[수정] 헤드라인을 한 번에 분석하고 레이블/신뢰도 배열로 집계"""
     if not news_items: return {"stock_name": name, "sentiment_score": 0, "market_outlook": "분석할 영어 뉴스 없음", "investment_strategy": "정보 부족", "summary": {"total": 0}, "analyzed_articles": []}
     headlines = [item['headline'] for item in news_items]
-    analysis_results = predict_sentiment_en_finbert(headlines)
-    analyzed_articles = []
-    gamma_scores = []
-    counts = {"positive": 0, "negative": 0, "neutral": 0}
-
-    for i in range(len(news_items)):
-        original_item = news_items[i]
-        res = analysis_results[i]
-        senti = res.get('sentiment', 'neutral').lower()
-        conf = res.get('confidence', 0.5)
-
-        analysis_result_item = {
-            **original_item,
-            'headline': original_item.get('headline'),
-            'link': original_item.get('link', '#'),
-            'sentiment': senti,
-            'confidence': conf
-        }
-        analyzed_articles.append(analysis_result_item)
+    results = _check_result_count(predict_sentiment_en_finbert(headlines), len(headlines), "EN-FinBERT")
+    gamma = np.fromiter((_GAMMA_BY_LABEL.get(res.get('sentiment', 'neutral'), 0) for res in results), dtype=np.int8, count=len(headlines))
+    confidence = [res.get('confidence', 0.5) for res in results]
+
+    score, summary = _summarize_gamma(gamma)
+    outlook, strategy = _sentiment_outlook(name, score, "(영어/번역) 뉴스")
+    return {"stock_name": name, "sentiment_score": score, "market_outlook": outlook, "investment_strategy": strategy, "summary": summary,
+            "analyzed_articles": _materialize_articles(news_items, headlines, gamma, confidence)}
+
+# --- [신규] 헤드라인 감성 점수 계산 (요청 시 분석 / 수집 시 백그라운드 분석 공용) ---
+def score_headlines(headlines: list, name: str = ""):
+    """
+    헤드라인 언어 감지 -> 캐시 조회 -> (번역 또는 로컬 한국어 모델) -> 감성 분석 후 배열로 반환.
+
+    Returns:
+        (gamma(int8), confidence(float64), output_headlines, failed(bool), stats)
+        failed: 번역 실패 또는 모델 fallback 결과로 실제 레이블이 없는 항목
+    """
+    n = len(headlines)
+    output_headlines = list(headlines)  # 번역 경로 항목은 번역된 헤드라인으로 출력
+    is_korean = np.fromiter((get_headline_language(h) == 'ko' for h in headlines), dtype=bool, count=n)
+    gamma = np.zeros(n, dtype=np.int8)
+    confidence = np.zeros(n, dtype=np.float64)
+    done = np.zeros(n, dtype=bool)
+    failed = np.zeros(n, dtype=bool)
+
+    # [신규] 헤드라인 감성 캐시 조회: 캐시 적중 항목은 번역/분석을 건너뜀
+    sentiment_cache = get_headline_sentiment_cache()
+    model_version = get_sentiment_service().model_version
+    cache_entries = sentiment_cache.get_many(headlines, model_version)
+
+    # [신규] KO_SENTIMENT_ROUTE=local: 한국어 헤드라인은 번역 없이 로컬 한국어 모델로 분석 (로드 실패 시 번역 경로)
+    ko_service = get_korean_sentiment_service()
+    if ko_service and not ko_service.load():
+        print("경고: 로컬 한국어 감성 모델 로드 실패. 번역 경로를 사용합니다."); ko_service = None
+    if ko_service:
+        ko_positions = np.flatnonzero(is_korean)
+        ko_entries = sentiment_cache.get_many([headlines[i] for i in ko_positions], ko_service.model_version)
+        for i, entry in zip(ko_positions, ko_entries):
+            cache_entries[i] = {**entry, 'translation': None} if entry else None  # 원문 헤드라인 유지
+
+    cached_translations = {}
+    for i, entry in enumerate(cache_entries):
+        if not entry: continue
+        if entry['translation']:
+            output_headlines[i] = entry['translation']; cached_translations[i] = entry['translation']
+        if entry['sentiment']:
+            gamma[i] = _GAMMA_BY_LABEL.get(entry['sentiment'], 0); confidence[i] = entry['confidence']; done[i] = True
+    cache_hit_count = int(done.sum())
+
+    print(f"총 {n}개 뉴스 언어 감지 및 분리 시작 ({name})...")
+    english_idx = np.flatnonzero(~done & ~is_korean)
+    korean_idx = np.flatnonzero(~done & is_korean)
+    if ko_service:
+        korean_local_idx, korean_translate_idx = korean_idx, korean_idx[:0]
+    else:
+        korean_local_idx = korean_idx[:0]
+        has_translation = np.fromiter((i in cached_translations for i in korean_idx), dtype=bool, count=len(korean_idx))
+        korean_translate_idx = korean_idx[~has_translation]
+        english_idx = np.sort(np.concatenate([english_idx, korean_idx[has_translation]]))  # 번역만 캐시된 항목
+    print(f"  -> 캐시 적중 {cache_hit_count}개 / 번역 필요 한국어 {len(korean_translate_idx)}개 / 로컬 분석 한국어 {len(korean_local_idx)}개 / 영어(번역 캐시 포함) {len(english_idx)}개 분리 완료.")
 
-        if senti == 'positive': gamma_scores.append(1); counts['positive'] += 1
-        elif senti == 'negative': gamma_scores.append(-1); counts['negative'] += 1
-        else: gamma_scores.append(0); counts['neutral'] += 1
+    translation_failed_count = 0
 
-    score = sum(gamma_scores) / len(gamma_scores) if gamma_scores else 0
-    outlook, strategy = "", "중립"
-    if score > 0.1: outlook = f"{name} 관련 (영어/번역) 뉴스 감성 긍정적."; strategy = "적극 투자"
-    elif score < -0.1: outlook = f"{name} 관련 (영어/번역) 뉴스 감성 부정적."; strategy = "보수적/방어적 투자"
-    else: outlook = f"{name} 관련 (영어/번역) 뉴스 감성 중립적."; strategy = "중립"
+    def score_with(service_predict, indices, version):
+        """indices 위치의 output_headlines 를 분석하여 배열에 기록하고 캐시에 저장 (결과 개수가 다르면 전부 실패 처리)"""
+        results = _check_result_count(service_predict([output_headlines[i] for i in indices]), len(indices), version)
+        to_cache = []
+        for i, res in zip(indices, results):
+            gamma[i] = _GAMMA_BY_LABEL.get(res['sentiment'], 0); confidence[i] = res['confidence']; done[i] = True
+            if res.get('fallback'): failed[i] = True
+            else: to_cache.append((headlines[i], SENTIMENT_LABELS[gamma[i] + 1], res['confidence']))
+        sentiment_cache.put_sentiments(to_cache, version)
+
+    if len(korean_local_idx):
+        print(f"한국어 뉴스 {len(korean_local_idx)}개 로컬 한국어 모델 분석 시작...")
+        score_with(ko_service.predict, korean_local_idx, ko_service.model_version)
+
+    if len(korean_translate_idx):
+        headlines_ko = [headlines[i] for i in korean_translate_idx]
+        if news_analyzer_client:
+            print(f"한국어 뉴스 {len(korean_translate_idx)}개 번역 시작 (배치 동시 요청)...")
+            translations = translation_scheduler.translate(headlines_ko)
+            print(f"  -> 번역 완료 ({sum(1 for t in translations if t)}/{len(translations)}개 성공)")
+        else:
+            print("OpenAI 클라이언트 없음"); translations = [None] * len(headlines_ko)
+        sentiment_cache.put_translations(list(zip(headlines_ko, translations)))
+
+        translated = np.fromiter((bool(t) for t in translations), dtype=bool, count=len(translations))
+        for i, translation in zip(korean_translate_idx[translated], (t for t in translations if t)):
+            output_headlines[i] = translation
+        # 번역 실패 항목: 중립, 신뢰도 0
+        failed_idx = korean_translate_idx[~translated]
+        done[failed_idx] = True; failed[failed_idx] = True
+        translation_failed_count = len(failed_idx)
+        english_idx = np.sort(np.concatenate([english_idx, korean_translate_idx[translated]]))
+
+    if len(english_idx):
+        print(f"총 {len(english_idx)}개 뉴스(영어+번역) 영어 모델 분석 시작...")
+        score_with(predict_sentiment_en_finbert, english_idx, model_version)
+        print("영어 모델 분석 완료.")
 
-    return {"stock_name": name, "sentiment_score": score, "market_outlook": outlook, "investment_strategy": strategy, "summary": {"total": len(news_items), **counts},
-            "analyzed_articles": analyzed_articles}
+    stats = {"cache_hits": cache_hit_count, "translation_failed": translation_failed_count,
+             "analysis_failed": int(failed.sum()) - translation_failed_count}
+    return gamma, confidence, output_headlines, failed, stats
 
 # --- [수정] 자동 감지 및 분석 라우터 (_analyze_sentiments_auto_detect) ---
 def _analyze_sentiments_auto_detect(name: str, news_items: list):
-    """[수정] 뉴스 언어 감지, 번역, 분석 후 **sentiment 레이블**만 결과에 포함."""
+    """
+    [수정] 뉴스 언어 감지, 번역, 분석 후 **sentiment 레이블**만 결과에 포함.
+    [수정] 항목 복사 없이 인덱스 배열과 레이블(gamma)/신뢰도 배열로 처리하고, 출력 레코드는 마지막에 한 번만 생성.
+    """
     if not news_items: return {"stock_name": name, "sentiment_score": 0, "market_outlook": "분석할 뉴스 없음", "investment_strategy": "정보 부족", "summary": {"total": 0}, "analyzed_articles": []}
 
-    final_analyzed_articles = [None] * len(news_items)
-    all_gamma_scores = []
-    translation_failed_count = 0
-    analysis_failed_count = 0
-
-    korean_indices = []
-    english_indices = []
-    items_for_analysis = []
-    original_indices_map = {}
+    headlines = [item['headline'] for item in news_items]
+    gamma, confidence, output_headlines, _, stats = score_headlines(headlines, name)
 
-    print(f"총 {len(news_items)}개 뉴스 언어 감지 및 분리 시작 ({name})...")
-    for idx, item in enumerate(news_items):
-        lang = get_headline_language(item['headline'])
-        if lang == 'ko': korean_indices.append(idx)
-        else:
-            english_indices.append(idx)
-            items_for_analysis.append(item)
-            original_indices_map[len(items_for_analysis) - 1] = idx
-    print(f"  -> 한국어 {len(korean_indices)}개 / 영어 {len(english_indices)}개 분리 완료.")
-
-    if korean_indices:
-        print(f"한국어 뉴스 {len(korean_indices)}개 배치 번역 시작...")
-        BATCH_SIZE = 20
-        num_ko_batches = math.ceil(len(korean_indices) / BATCH_SIZE)
-        for i in range(num_ko_batches):
-            batch_start_ko_idx = i * BATCH_SIZE
-            batch_end_ko_idx = batch_start_ko_idx + BATCH_SIZE
-            current_batch_original_indices = korean_indices[batch_start_ko_idx:batch_end_ko_idx]
-            current_batch_headlines_ko = [news_items[idx]['headline'] for idx in current_batch_original_indices]
-
-            print(f"  - 배치 {i+1}/{num_ko_batches} 번역 요청 ({len(current_batch_headlines_ko)}개)...")
-            batch_translations = translate_headlines_batch_openai(current_batch_headlines_ko)
-
-            for j, translation in enumerate(batch_translations):
-                original_idx = current_batch_original_indices[j]
-                if translation:
-                    analysis_item = copy.deepcopy(news_items[original_idx])
-                    analysis_item['headline'] = translation
-                    items_for_analysis.append(analysis_item)
-                    original_indices_map[len(items_for_analysis) - 1] = original_idx
-                else:
-                    translation_failed_count += 1
-                    failed_item = copy.deepcopy(news_items[original_idx])
-                    failed_item['sentiment'] = 'neutral'
-                    failed_item['confidence'] = 0.0
-                    final_analyzed_articles[original_idx] = failed_item
-                    all_gamma_scores.append(0)
-
-    analysis_results_list = []
-    if items_for_analysis:
-        print(f"총 {len(items_for_analysis)}개 뉴스(영어+번역) 영어 모델 분석 시작...")
-        analysis_output = _analyze_sentiment_english(items_for_analysis, name)
-        analysis_results_list = analysis_output.get("analyzed_articles", [])
-        print("영어 모델 분석 완료.")
-        if len(analysis_results_list) != len(items_for_analysis):
-            analysis_failed_count = abs(len(items_for_analysis) - len(analysis_results_list))
-            print(f"경고: 분석 결과 개수 불일치 ({len(analysis_results_list)} != {len(items_for_analysis)})!")
-
-    final_summary = {"total": len(news_items), "positive": 0, "negative": 0, "neutral": 0}
-    processed_indices = set()
-
-    for analysis_idx, analyzed_item in enumerate(analysis_results_list):
-        if analysis_idx in original_indices_map:
-            original_idx = original_indices_map[analysis_idx]
-            final_analyzed_articles[original_idx] = analyzed_item
-            processed_indices.add(original_idx)
-
-            senti = analyzed_item.get('sentiment', 'neutral')
-            if senti == 'positive': all_gamma_scores.append(1); final_summary['positive'] += 1
-            elif senti == 'negative': all_gamma_scores.append(-1); final_summary['negative'] += 1
-            else: all_gamma_scores.append(0); final_summary['neutral'] += 1
-        else:
-             print(f"경고: 분석 인덱스 {analysis_idx} 매핑 정보 없음!")
-             analysis_failed_count += 1
-
-    final_summary['neutral'] += translation_failed_count
-
-    missing_items = 0
-    for idx in range(len(news_items)):
-        if final_analyzed_articles[idx] is None:
-            print(f"경고: 뉴스 인덱스 {idx} 최종 결과 누락! 중립 처리.")
-            missing_item = copy.deepcopy(news_items[idx])
-            missing_item['sentiment'] = 'neutral'
-            missing_item['confidence'] = 0.0
-            final_analyzed_articles[idx] = missing_item
-            all_gamma_scores.append(0)
-            final_summary['neutral'] += 1
-            missing_items += 1
-    analysis_failed_count += missing_items
-
-    final_score = sum(all_gamma_scores) / len(all_gamma_scores) if all_gamma_scores else 0.0
-    final_outlook, final_strategy = "", "중립"
-    if final_score > 0.1: final_outlook = f"{name} 관련 뉴스(영어/번역)의 전반적인 감성이 긍정적입니다."; final_strategy = "적극 투자"
-    elif final_score < -0.1: final_outlook = f"{name} 관련 뉴스(영어/번역)의 전반적인 감성이 부정적입니다."; final_strategy = "보수적/방어적 투자"
-    else: final_outlook = f"{name} 관련 뉴스(영어/번역)의 전반적인 감성은 중립적입니다."; final_strategy = "중립"
+    final_score, final_summary = _summarize_gamma(gamma)
+    final_outlook, final_strategy = _sentiment_outlook(name, final_score, "뉴스(영어/번역)의 전반적인")
 
     status_messages = []
-    if translation_failed_count > 0: status_messages.append(f"{translation_failed_count}개 번역 실패")
-    if analysis_failed_count > 0: status_messages.append(f"{analysis_failed_count}개 분석 오류")
+    if stats["translation_failed"] > 0: status_messages.append(f"{stats['translation_failed']}개 번역 실패")
+    if stats["analysis_failed"] > 0: status_messages.append(f"{stats['analysis_failed']}개 분석 오류")
     if status_messages: final_outlook += f" ({', '.join(status_messages)})"
 
     return {
         "stock_name": name, "sentiment_score": final_score,
         "market_outlook": final_outlook, "investment_strategy": final_strategy,
         "summary": final_summary,
-        "analyzed_articles": final_analyzed_articles
+        "analyzed_articles": _materialize_articles(news_items, output_headlines, gamma, confidence.tolist())
     }
 
 # --- 외부 호출용 함수들 (변경 없음) ---
@@ -1122,7 +1171,7 @@ def get_exchange_rate():
     url = "https://m.search.naver.com/p/csearch/content/qapirender.nhn?key=calculator&pkid=141&q=%ED%99%98%EC%9C%A8&where=m&u1=keb&u6=standardUnit&u7=0&u3=USD&u4=KRW&u8=down&u2=1"
     
     try:
-        response = requests.get(url)
+        response = http_get(url, timeout=5)
         
         if response.status_code == 200:
             data = response.json()
@@ -1216,37 +1265,12 @@ def get_stock_data_for_portfolio(tickers, period="3y"): # 함수 이름 변경 (
     return final_df.dropna(axis=0, how='any'), errors, currency_info
 
 def predict_stock_prices_rf(stock_data, currency_info):
-    """Random Forest 모델로 주가를 예측하고 통화 정보를 포함합니다."""
-    predictions = {}
-    for ticker in stock_data.columns:
-        df = pd.DataFrame(stock_data[ticker])
-        if df.empty or len(df) < 2: continue
-
-        df['prediction'] = df[ticker].shift(-1)
-        df.dropna(inplace=True)
-        if len(df) < 2: continue
-        
-        X = np.array(df.drop(['prediction'], axis=1))
-        y = np.array(df['prediction'])
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        if len(X_train) == 0: continue
-
-        rf = RandomForestRegressor(n_estimators=100, random_state=42)
-        rf.fit(X_train, y_train)
-        
-        last_price = X[-1].reshape(1, -1)
-        predicted_price = rf.predict(last_price)[0]
-        current_price = last_price[0][0]
-        
-        direction = "상승" if predicted_price > current_price else "하락"
-        
-        predictions[ticker] = {
-            "current_price": current_price,
-            "predicted_price": predicted_price,
-            "direction": direction,
-            "currency": currency_info.get(ticker, 'N/A')
-        }
-    return predictions
+    """
+    Random Forest 모델로 주가를 예측하고 통화 정보를 포함합니다.
+    [수정] 종목별 학습/예측을 공유 프로세스 풀에서 병렬로 실행하고, 같은 데이터로 학습된 모델은 캐시에서 재사용합니다.
+    """
+    # (의존성) BatchPredictionService 호출 (services/batch_prediction_service.py)
+    return BatchPredictionService().predict_prices(stock_data, currency_info)
 
 def get_portfolio_sentiment(tickers_info):
     """
@@ -1304,11 +1328,26 @@ def get_portfolio_sentiment(tickers_info):
          # 해외 주식만 있으면 analyze_news_sentiments_english 호출
          sentiment_result = analyze_news_sentiments_english(portfolio_name, unique_news)
 
+    # [수정] 포트폴리오 점수: 저장된 기사의 시간 감쇠 + 신뢰도 가중 점수 (유효 가중치가 부족하면 방금 분석한 기사로 계산)
+    # status 는 run_full_portfolio_analysis 의 sentiment_map 키(매우 긍정적 ~ 매우 부정적)와 일치해야 함
+    analyzed_articles = sentiment_result.get('analyzed_articles', [])
+    aggregator = get_sentiment_aggregator()
+    aggregator.update()
+    decayed = aggregator.combined_score([s['ticker'] for s in tickers_info if s.get('ticker')])
+    if decayed["effective_weight"] >= SENTIMENT_MIN_EFFECTIVE_WEIGHT:
+        score, score_source = decayed["score"], "stored"
+    else:
+        score, _ = aggregate_articles(analyzed_articles, aggregator.half_life_hours)
+        score_source = "live"
+
     return {
-        "status": sentiment_result.get('investment_strategy', 'N/A'),
-        "sentiment_score": sentiment_result.get('sentiment_score', 0),
+        "status": score_to_sentiment_label(score),
+        "sentiment_score": score,
+        "score_source": score_source,
+        "mean_label_score": sentiment_result.get('sentiment_score', 0),
+        "investment_strategy": sentiment_result.get('investment_strategy', 'N/A'),
         "summary": sentiment_result.get('summary', {}),
-        "analyzed_articles": sentiment_result.get('analyzed_articles', [])
+        "analyzed_articles": analyzed_articles
     }
 def optimize_portfolio(stock_data):
     """마코위츠 모델로 포트폴리오를 최적화합니다."""
@@ -6,8 +6,15 @@ import requests
 import yfinance as yf
 import urllib.parse
 import concurrent.futures
+import inspect
 import tempfile
+import shutil
+import queue
+import atexit
+import threading
+from contextlib import contextmanager
 from app_helpers import get_stock_mapping
+from http_client import http_get, get_http_client
 from urllib.parse import quote, urljoin, quote_plus
 from datetime import datetime, timezone, timedelta
 from dateutil import parser as date_parser
@@ -21,6 +28,7 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException, TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 
 CHROME_DRIVER_PATH = r"C:\Users\chslo\.wdm\drivers\chromedriver\win64\141.0.7390.122\chromedriver-win32/chromedriver.exe" 
@@ -29,7 +37,7 @@ stock_name_to_ticker_map = get_stock_mapping()
 ticker_to_name_map = {v: k for k, v in stock_name_to_ticker_map.items()}
 
 def get_driver():
-    """매번 새로운 Selenium WebDriver를 초기화하고 반환합니다."""
+    """새로운 Selenium WebDriver를 초기화하고 반환합니다. (크롤링에서는 browser_pool 을 통해 재사용)"""
     
     options = Options() 
     
@@ -52,9 +60,15 @@ def get_driver():
         print(f"!!! 치명적 오류: Chrome 드라이버 경로({CHROME_DRIVER_PATH})를 찾을 수 없습니다.")
         print("!!! CHROME_DRIVER_PATH 변수를 올바르게 설정했는지 확인하세요.")
         print(f"!!! 상세 오류: {e}")
+        shutil.rmtree(user_data_dir, ignore_errors=True)
         return None # 드라이버 생성 실패
         
-    driver = webdriver.Chrome(service=service, options=options)
+    try:
+        driver = webdriver.Chrome(service=service, options=options)
+    except Exception:
+        shutil.rmtree(user_data_dir, ignore_errors=True) # 실행 실패 시 프로필 폴더 정리
+        raise
+    driver.user_data_dir = user_data_dir # 종료 시 프로필 폴더 삭제용
     
     driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
         'source': '''
@@ -65,14 +79,113 @@ def get_driver():
     })
     return driver
 
-    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-        'source': '''
-            Object.defineProperty(navigator, 'webdriver', {
-              get: () => undefined
-            })
-        '''
-    })
-    return driver
+
+# [신규] 헤드리스 브라우저 풀
+BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', 2))
+# 드라이버 하나로 처리할 최대 페이지(크롤링) 수. 초과하면 새 드라이버로 교체 (메모리 누수 방지)
+BROWSER_MAX_PAGES_PER_DRIVER = int(os.getenv('BROWSER_MAX_PAGES_PER_DRIVER', 50))
+
+class BrowserPool:
+    """
+    최대 size 개의 헤드리스 Chrome 을 띄워 두고 재사용하는 풀.
+
+    with browser_pool.driver() as driver: 형태로 빌려 쓰며, 반납 시 쿠키/스토리지/창을 초기화합니다.
+    max_pages 회 사용했거나 사용 중 드라이버가 죽은 경우(WebDriverException) 종료 후 새로 만듭니다.
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_pages=BROWSER_MAX_PAGES_PER_DRIVER, factory=get_driver):
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.factory = factory
+        self._idle = queue.LifoQueue() # 최근에 쓴(따뜻한) 드라이버부터 사용
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._pages = {} # id(driver) -> 사용 횟수
+        self._lock = threading.Lock()
+
+    def _create(self):
+        driver = self.factory()
+        if driver is None: raise RuntimeError("Chrome 드라이버 생성 실패")
+        driver.set_page_load_timeout(30) # 페이지 로드 최대 30초 대기
+        driver.set_script_timeout(20)
+        with self._lock: self._pages[id(driver)] = 0
+        return driver
+
+    def _discard(self, driver):
+        """드라이버 종료 + 프로필 폴더 삭제"""
+        with self._lock: self._pages.pop(id(driver), None)
+        try: driver.quit()
+        except Exception as e: print(f"브라우저 종료 중 오류 (무시): {e}")
+        profile_dir = getattr(driver, 'user_data_dir', None)
+        if profile_dir: shutil.rmtree(profile_dir, ignore_errors=True)
+
+    def _is_alive(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _reset(self, driver):
+        """다음 사용자를 위해 상태 초기화 (여분 창 닫기, 쿠키/스토리지 삭제, 빈 페이지로 이동)"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle); driver.close()
+        driver.switch_to.window(handles[0])
+        driver.delete_all_cookies()
+        driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+        driver.get("about:blank")
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """풀에서 드라이버를 빌려 줍니다 (모두 사용 중이면 반납될 때까지 대기)."""
+        acquired = self._slots.acquire(timeout=timeout) if timeout is not None else self._slots.acquire()
+        if not acquired: raise TimeoutError("사용 가능한 브라우저가 없습니다.")
+        driver, healthy = None, False
+        try:
+            try: driver = self._idle.get_nowait()
+            except queue.Empty: driver = self._create()
+            try:
+                yield driver
+                healthy = True
+            except WebDriverException:
+                healthy = self._is_alive(driver) # 브라우저 충돌/세션 종료면 폐기 (대기 시간 초과 등은 재사용)
+                raise
+            except Exception:
+                healthy = True # 파싱 오류 등은 브라우저 문제가 아님
+                raise
+        finally:
+            if driver is not None:
+                with self._lock:
+                    self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+                    worn_out = self._pages[id(driver)] >= self.max_pages
+                if healthy and not worn_out:
+                    try:
+                        self._reset(driver)
+                        self._idle.put(driver)
+                    except Exception as e:
+                        print(f"브라우저 초기화 실패, 교체합니다: {e}")
+                        self._discard(driver)
+                else:
+                    self._discard(driver)
+            self._slots.release()
+
+    def warm(self, count=None):
+        """백그라운드에서 드라이버를 미리 띄워 둡니다 (첫 크롤링의 브라우저 부팅 지연 제거)."""
+        def _warm():
+            target = min(count or self.size, self.size)
+            while len(self._pages) < target: # 사용 중 + 유휴 드라이버 수가 풀 크기를 넘지 않도록
+                try: self._idle.put(self._create())
+                except Exception as e: print(f"브라우저 미리 띄우기 실패: {e}"); break
+        threading.Thread(target=_warm, name='browser-pool-warm', daemon=True).start()
+
+    def close(self):
+        """유휴 드라이버 모두 종료 (프로세스 종료 시 호출)"""
+        while True:
+            try: self._discard(self._idle.get_nowait())
+            except queue.Empty: break
+
+browser_pool = BrowserPool()
+atexit.register(browser_pool.close)
 # 3. google
 
 HEADERS = {
@@ -110,7 +223,7 @@ def search_google_news(query, limit=100):
     encoded_query = quote(query)
     url = f"https://news.google.com/rss/search?q={encoded_query}&hl=ko&gl=KR&ceid=KR:ko"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
+        response = http_get(url, headers=HEADERS, timeout=10, conditional=True)
         response.raise_for_status()
         soup = BeautifulSoup(response.content, 'xml')
         items = soup.find_all('item')
@@ -124,7 +237,7 @@ def get_latest_google_news(limit=100):
     news_items = []
     url = "https://news.google.com/rss/headlines/section/topic/BUSINESS?hl=ko&gl=KR&ceid=KR:ko"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
+        response = http_get(url, headers=HEADERS, timeout=10, conditional=True)
         response.raise_for_status()
         soup = BeautifulSoup(response.content, 'xml')
         items = soup.find_all('item')
@@ -149,70 +262,89 @@ def parse_relative_time(time_str):
         elif unit == 'd': return now - timedelta(days=value)
     return None
 
+# [신규] 스크롤 대기 설정: 고정 sleep 대신 기사 개수 증가를 짧은 주기로 확인
+YAHOO_SCROLL_TIMEOUT = float(os.getenv('YAHOO_SCROLL_TIMEOUT', 4)) # 스크롤 1회당 새 기사 대기 최대 시간 (초)
+YAHOO_SCROLL_POLL = 0.1
+YAHOO_MAX_SCROLLS = 15
+YAHOO_MAX_STALE_SCROLLS = 2 # 연속으로 새 기사가 없으면 중단
+
+# 아직 파싱하지 않은 기사 요소의 HTML (arguments[1] 이 true 면 파싱 표시까지, false 면 개수만 반환)
+# DOM 순서(인덱스) 대신 요소에 현재 링크를 data 속성으로 표시하므로, 위쪽에 광고가 끼어들거나
+# 가상 스크롤로 요소가 제거/재사용되어도(링크가 바뀌면 다시 파싱) 기사를 건너뛰지 않습니다.
+_UNPARSED_ITEMS_JS = """
+const items = [];
+for (const e of document.querySelectorAll(arguments[0])) {
+    const a = e.querySelector('a[href]');
+    const key = a ? a.getAttribute('href') : e.textContent.slice(0, 200);
+    if (e.getAttribute('data-ff-parsed') === key) continue;
+    if (arguments[1]) { e.setAttribute('data-ff-parsed', key); items.push(e.outerHTML); }
+    else items.push(null);
+}
+return arguments[1] ? items : items.length;
+"""
+
+def _parse_yahoo_item(item, base_url):
+    """야후 stream-item 요소(BeautifulSoup) 하나를 기사 딕셔너리로 변환 (헤드라인/링크 없으면 None)"""
+    headline_tag = item.select_one('h3')
+    link_tag = headline_tag.find_parent('a') if headline_tag else None
+    relative_time_tag = item.select_one('div[class*="publishing"]')
+    if not relative_time_tag: relative_time_tag = item.select_one('div.yf-m1e6lz')
+    absolute_time_tag = item.select_one('time')
+    if not headline_tag or not link_tag: return None
+    headline = headline_tag.text.strip()
+    link = link_tag.get('href', '')
+    if not link.startswith('http'): link = urljoin(base_url, link)
+    img_tag = item.select_one('img')
+    pub_date_utc = None
+    if relative_time_tag: # 상대 시간
+        time_str = relative_time_tag.get_text(strip=True)
+        match = re.search(r'•\s*(.*)', time_str)
+        if match: relative_str = match.group(1).strip(); pub_date_utc = parse_relative_time(relative_str)
+    if pub_date_utc is None and absolute_time_tag and absolute_time_tag.get('datetime'): # 절대 시간
+        date_str = absolute_time_tag['datetime']
+        try: aware_dt = date_parser.parse(date_str); pub_date_utc = aware_dt.astimezone(timezone.utc)
+        except ValueError: pass
+    if pub_date_utc is None: pub_date_utc = datetime.now(timezone.utc) # 현재 시간
+    return {"headline": headline, "link": link, "source": "Yahoo Finance", "image_url": img_tag.get('src') if img_tag and img_tag.get('src') else "", "pub_date": pub_date_utc}
+
 def _crawl_yahoo_news(limit=100):
     """실제 야후 파이낸스 뉴스 크롤링을 수행하는 내부 함수"""
     url = "https://finance.yahoo.com/topic/latest-news/"
     news_items = []
-    driver = None
     print(f"야후 실시간 속보 크롤링 시작")
-    try:
-        driver = get_driver() # common.py에 정의된 함수 사용
-        driver.set_page_load_timeout(30) # 페이지 로드 최대 30초 대기
-        driver.set_script_timeout(20)
-        driver.implicitly_wait(10) # 요소를 찾을 때 최대 10초 대기
+    # [수정] 매번 Chrome 을 새로 띄우지 않고 풀에서 따뜻한 드라이버를 빌려 사용
+    with browser_pool.driver() as driver:
+        driver.implicitly_wait(0) # [수정] 암묵적 대기 제거 (모든 대기는 명시적 조건으로)
         driver.maximize_window(); driver.get(url)
-        wait = WebDriverWait(driver, 2)
-
-        
 
         news_container_selector = "li[class*='stream-item']"
         try: # 뉴스 컨테이너 로딩 대기
-            WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.CSS_SELECTOR, news_container_selector)))
+            WebDriverWait(driver, 10, poll_frequency=YAHOO_SCROLL_POLL).until(EC.visibility_of_element_located((By.CSS_SELECTOR, news_container_selector)))
         # [수정] SyntaxError 해결: except 블록 내용 분리 및 들여쓰기
         except Exception as e:
             print(f"야후: 뉴스 컨테이너 로딩 실패: {e}")
             return [] 
 
-        # 스크롤 로직 (변경 없음)
-        scroll_attempts, max_scroll_attempts = 0, 15
-        while len(news_items) < limit and scroll_attempts < max_scroll_attempts:
-            current_article_count = len(driver.find_elements(By.CSS_SELECTOR, news_container_selector))
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);"); time.sleep(2)
-            new_article_count = len(driver.find_elements(By.CSS_SELECTOR, news_container_selector))
-            if new_article_count == current_article_count:
-                scroll_attempts += 1
-                if scroll_attempts >= 3: break
-            else: scroll_attempts = 0
-            scroll_attempts += 1
-
-        # 파싱 로직 (변경 없음)
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        articles = soup.select(news_container_selector)
-        for item in articles:
+        # [수정] 스크롤 + 증분 파싱: 새로 로드된 기사만 파싱하고, limit 개가 모이면 즉시 중단
+        stale_scrolls = 0
+        seen_links = set()
+        for _ in range(YAHOO_MAX_SCROLLS + 1):
+            new_html = driver.execute_script(_UNPARSED_ITEMS_JS, news_container_selector, True)
+            for element in BeautifulSoup(''.join(new_html), 'html.parser').select(news_container_selector):
+                article = _parse_yahoo_item(element, url)
+                if article and article['link'] not in seen_links:
+                    seen_links.add(article['link']); news_items.append(article)
             if len(news_items) >= limit: break
-            headline_tag = item.select_one('h3')
-            link_tag = headline_tag.find_parent('a') if headline_tag else None
-            relative_time_tag = item.select_one('div[class*="publishing"]')
-            if not relative_time_tag: relative_time_tag = item.select_one('div.yf-m1e6lz')
-            absolute_time_tag = item.select_one('time')
-            if not headline_tag or not link_tag: continue
-            headline = headline_tag.text.strip()
-            link = link_tag.get('href', '')
-            if not link.startswith('http'): link = urljoin(url, link)
-            img_tag = item.select_one('img')
-            pub_date_utc = None
-            if relative_time_tag: # 상대 시간
-                time_str = relative_time_tag.get_text(strip=True)
-                match = re.search(r'•\s*(.*)', time_str)
-                if match: relative_str = match.group(1).strip(); pub_date_utc = parse_relative_time(relative_str)
-            if pub_date_utc is None and absolute_time_tag and absolute_time_tag.get('datetime'): # 절대 시간
-                date_str = absolute_time_tag['datetime']
-                try: aware_dt = date_parser.parse(date_str); pub_date_utc = aware_dt.astimezone(timezone.utc)
-                except ValueError: pass
-            if pub_date_utc is None: pub_date_utc = datetime.now(timezone.utc) # 현재 시간
-            news_items.append({"headline": headline, "link": link, "source": "Yahoo Finance", "image_url": img_tag.get('src') if img_tag and img_tag.get('src') else "", "pub_date": pub_date_utc})
-    finally:
-        if driver: driver.quit()
+
+            # 바닥까지 스크롤 후 파싱하지 않은 기사가 나타날 때까지만 대기 (고정 sleep 없음)
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            try:
+                WebDriverWait(driver, YAHOO_SCROLL_TIMEOUT, poll_frequency=YAHOO_SCROLL_POLL).until(
+                    lambda d: d.execute_script(_UNPARSED_ITEMS_JS, news_container_selector, False) > 0)
+                stale_scrolls = 0
+            except TimeoutException:
+                stale_scrolls += 1
+                if stale_scrolls >= YAHOO_MAX_STALE_SCROLLS: break
     return news_items[:limit]
 
 # search_yahoo_news_by_ticker 함수 (이전 수정본 유지 - 'content' 파싱)
@@ -259,9 +391,55 @@ COMMON_HEADERS = {
 # KST 시간대
 KST = timezone(timedelta(hours=9))
 
-# [수정] 내부 로직만 변경 (URL, 선택자)
-def _crawl_major_news(limit=100):
-    """[수정] 네이버 금융 '실시간 속보'를 'limit' 개수만큼 여러 페이지에 걸쳐 크롤링합니다."""
+# [신규] 네이버 금융 요청 설정: keep-alive 세션 공유 + 호스트 동시 요청/속도 제한
+NAVER_MAX_CONCURRENCY = int(os.getenv('NAVER_MAX_CONCURRENCY', 5))
+NAVER_REQUESTS_PER_MINUTE = int(os.getenv('NAVER_REQUESTS_PER_MINUTE', 600))
+
+get_http_client().configure_host("finance.naver.com", rpm=NAVER_REQUESTS_PER_MINUTE, pool_maxsize=NAVER_MAX_CONCURRENCY)
+
+def _parse_naver_realtime_item(item, base_url):
+    """'실시간 속보' 목록의 li 하나를 기사 딕셔너리로 변환 (헤드라인/날짜 없으면 None)"""
+    headline_link_tag = item.select_one('dl > dd:nth-child(2) > a')
+    date_tag = item.select_one('dl > dd:nth-child(3) > span.wdate')
+    if not headline_link_tag or not date_tag: return None
+
+    headline = headline_link_tag.get('title', headline_link_tag.get_text(strip=True))
+    link = headline_link_tag.get('href', '')
+    if not link.startswith('http'):
+        link = urljoin(base_url, link)
+
+    date_str = date_tag.get_text(strip=True) # 예: "2025-10-22 17:09"
+    try:
+        # [수정] '실시간 속보' 시간 형식 '%Y-%m-%d %H:%M' 파싱
+        naive_dt = datetime.strptime(date_str, '%Y-%m-%d %H:%M')
+        pub_date_utc = naive_dt.replace(tzinfo=KST).astimezone(timezone.utc)
+    except ValueError:
+        print(f"네이버 시간 파싱 오류 (실시간 속보): {date_str}")
+        pub_date_utc = datetime.now(timezone.utc)
+
+    return {
+        "headline": headline,
+        "link": link,
+        "source": "Naver Major",
+        "image_url": "", # 이미지 없음
+        "pub_date": pub_date_utc
+    }
+
+def _fetch_naver_realtime_page(list_base_url, page, base_url):
+    """목록 페이지 하나를 가져와 기사 목록으로 반환 (공용 HTTP 클라이언트의 호스트 속도 제한 적용)"""
+    response = http_get(f"{list_base_url}&page={page}", headers=COMMON_HEADERS, timeout=10)
+    response.raise_for_status()
+    response.encoding = 'EUC-KR'
+    soup = BeautifulSoup(response.text, 'lxml')
+    news_list = soup.select('#contentarea_left > ul.realtimeNewsList > li')
+    return [article for article in (_parse_naver_realtime_item(item, base_url) for item in news_list) if article]
+
+# [수정] 페이지를 동시에 가져오되, 페이지 순서대로 처리하며 limit 도달/빈 페이지/이미 저장된 링크에서 중단
+def _crawl_major_news(limit=100, is_known=None):
+    """
+    [수정] 네이버 금융 '실시간 속보'를 'limit' 개수만큼 여러 페이지에 걸쳐 크롤링합니다.
+    is_known(link) 가 주어지면 이미 저장된 기사를 만난 페이지까지만 가져옵니다 (목록은 최신순).
+    """
     news_items = []
     base_url = "https://finance.naver.com"
     
@@ -274,62 +452,26 @@ def _crawl_major_news(limit=100):
     print(f"네이버 실시간 속보 크롤링 시작...") # 로그 수정
 
     try:
-        for page in range(1, max_page_to_crawl + 1):
-            url = f"{list_base_url}&page={page}"
-
-            response = requests.get(url, headers=COMMON_HEADERS, timeout=10)
-            response.raise_for_status()
-            response.encoding = 'EUC-KR'
-            html_content = response.text
-            soup = BeautifulSoup(html_content, 'lxml')
-
-            news_list = soup.select('#contentarea_left > ul.realtimeNewsList > li')
-            
-            if not news_list:
-                print(f"  -> {page} 페이지에서 뉴스 목록을 찾지 못함. 크롤링 중단.")
-                break
-
-            for item in news_list:
-                headline_link_tag = item.select_one('dl > dd:nth-child(2) > a')
-                
-             
-                date_tag = item.select_one('dl > dd:nth-child(3) > span.wdate')
-
-                if headline_link_tag and date_tag:
-                    headline = headline_link_tag.get('title', headline_link_tag.get_text(strip=True))
-                    link = headline_link_tag.get('href', '')
-                    if not link.startswith('http'):
-                        link = urljoin(base_url, link)
-
-                    pub_date_utc = None
-                    date_str = date_tag.get_text(strip=True) # 예: "2025-10-22 17:09"
-                    try:
-                        # [수정] '실시간 속보' 시간 형식 '%Y-%m-%d %H:%M' 파싱
-                        naive_dt = datetime.strptime(date_str, '%Y-%m-%d %H:%M')
-                        aware_dt_kst = naive_dt.replace(tzinfo=KST)
-                        pub_date_utc = aware_dt_kst.astimezone(timezone.utc)
-                    except ValueError:
-                        print(f"네이버 시간 파싱 오류 (실시간 속보): {date_str}")
-                        pub_date_utc = datetime.now(timezone.utc)
-
-                    news_items.append({
-                        "headline": headline,
-                        "link": link,
-                        "source": "Naver Major",
-                        "image_url": "", # 이미지 없음
-                        "pub_date": pub_date_utc
-                    })
-
-                    # [추가] limit 개수에 도달하면 즉시 모든 루프 종료
+        with concurrent.futures.ThreadPoolExecutor(max_workers=NAVER_MAX_CONCURRENCY) as executor:
+            done = False
+            # 동시 요청 수만큼씩 페이지를 묶어서 요청 (필요 이상으로 앞서 가져오지 않도록)
+            for wave_start in range(1, max_page_to_crawl + 1, NAVER_MAX_CONCURRENCY):
+                pages = range(wave_start, min(wave_start + NAVER_MAX_CONCURRENCY, max_page_to_crawl + 1))
+                futures = [executor.submit(_fetch_naver_realtime_page, list_base_url, page, base_url) for page in pages]
+                for page, future in zip(pages, futures):
+                    page_items = future.result()
+                    if not page_items:
+                        print(f"  -> {page} 페이지에서 뉴스 목록을 찾지 못함. 크롤링 중단.")
+                        done = True; break
+                    news_items.extend(page_items)
                     if len(news_items) >= limit:
-                        break
-            
-            # [추가] limit 개수에 도달하면 외부 루프도 종료
-            if len(news_items) >= limit:
-                break
-
-            # [추가] 네이버 서버에 대한 과도한 요청 방지
-            time.sleep(0.5) 
+                        done = True; break
+                    if is_known and any(is_known(article['link']) for article in page_items):
+                        print(f"  -> {page} 페이지에서 이미 저장된 기사 발견. 크롤링 중단.")
+                        done = True; break
+                if done:
+                    for future in futures: future.cancel()
+                    break
 
     except Exception as e:
         print(f"네이버 실시간 속보 크롤링 중 오류 발생: {e}") # 로그 수정
@@ -350,7 +492,7 @@ def search_naver_news(query, limit=100):
     }
     news_items = []
     try:
-        response = requests.get(url, headers=api_headers, timeout=10)
+        response = http_get(url, headers=api_headers, timeout=10)
         response.raise_for_status()
         result = response.json()
         for item in result.get('items', []):
@@ -483,23 +625,30 @@ def manage_news_crawling(source_name, crawl_func, limit):
     """
     
     try:
-        from backend_logic import get_existing_links_by_source, save_news_articles, get_articles_from_db
+        from backend_logic import save_news_articles, get_articles_from_db
+        from services.news_ingest_service import enqueue_saved_articles
+        from services.link_dedup import get_link_deduper
     except ImportError:
         print(f"!!! 치명적 오류: [{source_name}] 'backend_logic.py' 파일을 찾을 수 없어 DB 작업이 불가능합니다.")
         return [] # 빈 리스트 반환
     
     try:
-        # 1. 웹사이트에서 최신 기사 목록을 크롤링합니다.
-        crawled_articles = crawl_func()
+        # 1. [수정] 전체 링크를 매번 읽는 대신, 출처별 링크 필터에 지난 주기 이후 저장된 기사만 반영합니다.
+        link_deduper = get_link_deduper(source_name)
+        link_deduper.sync()
+
+        # 2. 웹사이트에서 최신 기사 목록을 크롤링합니다.
+        #    [수정] 크롤러가 is_known 을 지원하면 이미 저장된 기사를 만나는 즉시 페이지 순회를 멈춥니다.
+        if 'is_known' in inspect.signature(crawl_func).parameters:
+            crawled_articles = crawl_func(is_known=link_deduper.is_known)
+        else:
+            crawled_articles = crawl_func()
         
         if crawled_articles:
-            # 2. DB에 이미 저장된 기사 링크들을 가져옵니다.
-            existing_links = get_existing_links_by_source(source=source_name)
 
             # 3. 크롤링된 기사 중 DB에 없는 '새로운' 기사만 필터링합니다.
-            new_articles = [
-                article for article in crawled_articles if article['link'] not in existing_links
-            ]
+            #    (필터에 있을 수도 있는 링크만 link_hash 인덱스로 DB 확인)
+            new_articles = link_deduper.filter_new(crawled_articles)
 
             # 4. 새로운 기사가 있으면 DB에 저장합니다.
             if new_articles:
@@ -508,6 +657,10 @@ def manage_news_crawling(source_name, crawl_func, limit):
                     article['source'] = source_name
                 print(f"[{source_name}] {len(new_articles)}개의 새 기사를 DB에 저장합니다.")
                 save_news_articles(new_articles)
+                link_deduper.add(article['link'] for article in new_articles)
+                link_deduper.save()
+                # 5. [신규] 저장된 기사를 백그라운드 감성 분석 큐에 넣습니다 (레이블/신뢰도/관련 티커 기록).
+                enqueue_saved_articles(new_articles)
     
     except Exception as e:
         print(f"[{source_name}] 크롤링 중 오류 발생: {e}")
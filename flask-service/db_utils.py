@@ -1,6 +1,6 @@
 import hashlib
 import mysql.connector # 다른 import들과 함께
-from datetime import datetime, timezone # 필요한 다른 import들
+from datetime import datetime, timezone, timedelta # 필요한 다른 import들
 import pandas as pd
 
 DB_CONFIG = {
@@ -53,7 +53,7 @@ def news_sources_exist():
 
 
 def get_daily_stock_sentiment_scores(ticker: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
-    """[수정] 특정 종목/기간의 'sentiment' 레이블을 조회하고 '점수'를 계산하여 반환"""
+    """[수정] 미리 집계된 daily_ticker_sentiment 테이블에서 (ticker, date) 인덱스 범위 조회로 일별 점수 반환"""
     conn = get_db_connection()
     if not conn: return pd.DataFrame(columns=['sentiment_score']).set_index(pd.to_datetime([])) # 빈 DF 구조 명확화
     c = conn.cursor(dictionary=True)
@@ -62,12 +62,11 @@ def get_daily_stock_sentiment_scores(ticker: str, start_date: datetime, end_date
     start_date_str = start_date.astimezone(timezone.utc).strftime('%Y-%m-%d')
     end_date_str = end_date.astimezone(timezone.utc).strftime('%Y-%m-%d')
 
-    # [수정] sentiment 레이블을 날짜별로 조회
+    # [수정] 점수 = (긍정 수 - 부정 수) / 전체 수 는 집계 테이블 갱신 시 계산됨
     query = """
-    SELECT DATE(pub_date) as date, sentiment, COUNT(*) as count
-    FROM news_articles
-    WHERE related_ticker = %s AND DATE(pub_date) BETWEEN %s AND %s AND sentiment IS NOT NULL
-    GROUP BY DATE(pub_date), sentiment
+    SELECT date, score AS sentiment_score
+    FROM daily_ticker_sentiment
+    WHERE ticker = %s AND date BETWEEN %s AND %s
     ORDER BY date ASC
     """
     try:
@@ -80,32 +79,135 @@ def get_daily_stock_sentiment_scores(ticker: str, start_date: datetime, end_date
         if not data: # 해당 기간/종목 데이터 없으면 빈 DF 반환
              return pd.DataFrame(columns=['sentiment_score']).set_index(pd.to_datetime([]))
 
-        df_raw = pd.DataFrame(data)
-        df_raw['date'] = pd.to_datetime(df_raw['date'])
+        df_final = pd.DataFrame(data)
+        df_final['date'] = pd.to_datetime(df_final['date'])
+        df_final['sentiment_score'] = df_final['sentiment_score'].astype(float)
+        df_final = df_final.set_index('date')
 
-        # 날짜별로 긍정/부정/중립 개수 집계 (pivot_table 사용)
-        df_pivot = df_raw.pivot_table(index='date', columns='sentiment', values='count', fill_value=0)
+        return df_final
 
-        # 집계 결과에 누락된 sentiment 컬럼 추가 (예: 'positive'가 없는 날)
-        for col in ['positive', 'negative', 'neutral']:
-            if col not in df_pivot.columns:
-                df_pivot[col] = 0
+    except mysql.connector.Error as err:
+        print(f"[{ticker}] 일별 종목 감성 점수 조회 오류: {err}")
+        return pd.DataFrame(columns=['sentiment_score']) # 오류 시 빈 DF
+    finally:
+        if c: c.close()
+        if conn: conn.close()
 
-        # 점수 계산: (긍정 수 - 부정 수) / (긍정 수 + 부정 수 + 중립 수)
-        total = df_pivot['positive'] + df_pivot['negative'] + df_pivot['neutral']
 
-        # 0으로 나누는 경우 방지 (total이 0이면 점수도 0)
-        df_score = ((df_pivot['positive'] - df_pivot['negative']) / total).where(total > 0, 0.0)
+# --- [신규] 일별 종목 감성 집계 테이블 (daily_ticker_sentiment) 유지 ---
+# 기사 저장/재분석 시 영향받은 (ticker, date) 키만 news_articles 에서 다시 집계합니다.
+# (related_ticker, pub_date) 복합 인덱스 범위 조회이므로 DATE(pub_date) 전체 스캔이 없습니다.
+# 신뢰도 가중 합/신뢰도 합(weighted_sum, weight)에는 신뢰도가 없는(모델로 분석하지 않은) 기사를 넣지 않습니다.
+_DAILY_ROLLUP_SELECT = """
+    SELECT related_ticker, DATE(pub_date),
+           SUM(sentiment = 'positive'), SUM(sentiment = 'negative'), SUM(sentiment = 'neutral'),
+           (SUM(sentiment = 'positive') - SUM(sentiment = 'negative')) / COUNT(*),
+           COALESCE(SUM(CASE sentiment WHEN 'positive' THEN sentiment_confidence
+                                       WHEN 'negative' THEN -sentiment_confidence ELSE 0 END), 0),
+           COALESCE(SUM(sentiment_confidence), 0)
+    FROM news_articles
+"""
 
-        # 최종 결과 DataFrame 생성 (컬럼 이름은 'sentiment_score' 유지)
-        df_final = pd.DataFrame(df_score, columns=['sentiment_score'])
-        df_final.index.name = 'date'
+def _refresh_daily_ticker_sentiment(c, keys):
+    """
+    커서 c 로 (ticker, date) 키들의 집계 행을 다시 계산합니다.
+    크롤러와 수집 워커가 같은 키를 동시에 갱신하므로 각 단계는 단일 문장으로 처리합니다
+    (집계 결과는 INSERT ... SELECT ... ON DUPLICATE KEY UPDATE 로 덮어쓰고,
+     레이블 있는 기사가 모두 사라진 키만 NOT EXISTS 조건으로 삭제).
+    """
+    for ticker, day in keys:
+        if not ticker or day is None: continue
+        day_start = datetime(day.year, day.month, day.day)
+        day_end = day_start + timedelta(days=1)
+        c.execute(
+            "INSERT INTO daily_ticker_sentiment (ticker, date, positive, negative, neutral, score, weighted_sum, weight) "
+            + _DAILY_ROLLUP_SELECT +
+            """WHERE related_ticker = %s AND pub_date >= %s AND pub_date < %s AND sentiment IS NOT NULL
+               GROUP BY related_ticker, DATE(pub_date)
+               ON DUPLICATE KEY UPDATE positive = VALUES(positive), negative = VALUES(negative),
+                   neutral = VALUES(neutral), score = VALUES(score),
+                   weighted_sum = VALUES(weighted_sum), weight = VALUES(weight)""",
+            (ticker, day_start, day_end)
+        )
+        c.execute(
+            """DELETE FROM daily_ticker_sentiment
+               WHERE ticker = %s AND date = %s AND NOT EXISTS (
+                   SELECT 1 FROM news_articles
+                   WHERE related_ticker = %s AND pub_date >= %s AND pub_date < %s AND sentiment IS NOT NULL)""",
+            (ticker, day_start.date(), ticker, day_start, day_end)
+        )
 
-        return df_final
+def get_daily_sentiment_rollup(ticker: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+    """일별 신뢰도 가중 합(weighted_sum)과 신뢰도 합(weight) 조회 (date 인덱스, 시간 감쇠 집계용)"""
+    empty = pd.DataFrame(columns=['weighted_sum', 'weight']).set_index(pd.to_datetime([]))
+    conn = get_db_connection()
+    if not conn: return empty
+    c = conn.cursor(dictionary=True)
+    try:
+        c.execute(
+            """SELECT date, weighted_sum, weight FROM daily_ticker_sentiment
+               WHERE ticker = %s AND date BETWEEN %s AND %s ORDER BY date ASC""",
+            (ticker.split('.')[0], start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+        )
+        data = c.fetchall()
+        if not data: return empty
+        df = pd.DataFrame(data)
+        df['date'] = pd.to_datetime(df['date'])
+        return df.set_index('date').astype(float)
+    except mysql.connector.Error as err:
+        print(f"[{ticker}] 일별 감성 집계 조회 오류: {err}")
+        return empty
+    finally:
+        if c: c.close()
+        if conn: conn.close()
+
+def get_scored_articles_since(scored_after=None, after_id=0, limit=1000, scored_before=None):
+    """
+    (sentiment_scored_at, id) 워터마크 이후에 감성 레이블이 기록된 기사 (시간 감쇠 집계의 증분 입력)
+    scored_after 가 None 이면 처음부터 조회합니다.
+    scored_before 가 주어지면 그 시각 이전에 기록된 기사만 조회합니다 (아직 커밋 중인 기록을 건너뛰지 않도록).
+    """
+    conn = get_db_connection()
+    if not conn: return []
+    c = conn.cursor(dictionary=True)
+    try:
+        base = """SELECT id, related_ticker, sentiment, sentiment_confidence, pub_date, crawl_date, sentiment_scored_at
+                  FROM news_articles
+                  WHERE sentiment IS NOT NULL AND sentiment_scored_at IS NOT NULL AND related_ticker IS NOT NULL"""
+        params = []
+        if scored_before is not None:
+            base += " AND sentiment_scored_at < %s"
+            params.append(scored_before)
+        if scored_after is not None:
+            base += " AND (sentiment_scored_at > %s OR (sentiment_scored_at = %s AND id > %s))"
+            params += [scored_after, scored_after, after_id]
+        c.execute(base + " ORDER BY sentiment_scored_at, id LIMIT %s", params + [limit])
+        return c.fetchall()
+    except mysql.connector.Error as err:
+        print(f"감성 기록 기사 조회 오류: {err}")
+        return []
+    finally:
+        if c: c.close()
+        if conn: conn.close()
 
+def rebuild_daily_ticker_sentiment():
+    """daily_ticker_sentiment 전체 재생성 (최초 마이그레이션/복구용)"""
+    conn = get_db_connection()
+    if not conn: return False
+    c = conn.cursor()
+    try:
+        c.execute("DELETE FROM daily_ticker_sentiment")
+        c.execute(
+            "INSERT INTO daily_ticker_sentiment (ticker, date, positive, negative, neutral, score, weighted_sum, weight) "
+            + _DAILY_ROLLUP_SELECT +
+            """WHERE related_ticker IS NOT NULL AND pub_date IS NOT NULL AND sentiment IS NOT NULL
+               GROUP BY related_ticker, DATE(pub_date)"""
+        )
+        print(f"일별 종목 감성 집계 테이블 재생성 완료 ({c.rowcount}행).")
+        return True
     except mysql.connector.Error as err:
-        print(f"[{ticker}] 일별 종목 감성 점수 계산 오류: {err}")
-        return pd.DataFrame(columns=['sentiment_score']) # 오류 시 빈 DF
+        print(f"일별 종목 감성 집계 재생성 오류: {err}")
+        return False
     finally:
         if c: c.close()
         if conn: conn.close()
@@ -226,11 +328,16 @@ def init_db():
             image_url VARCHAR(512),
             pub_date DATETIME(6),
             crawl_date DATETIME(6) NOT NULL,
-            sentiment VARCHAR(10),       /* [신규] 감성 레이블 (positive, negative, neutral) */
+            sentiment VARCHAR(10),       /* [신규] 감성 레이블 (positive, negative, neutral), NULL = 아직 분석 전 */
+            sentiment_confidence FLOAT,  /* [신규] 감성 모델 신뢰도 */
+            sentiment_scored_at DATETIME(6),  /* [신규] 감성 레이블 기록 시각 */
             related_ticker VARCHAR(20),   /* 관련 종목 티커 */
+            link_hash BINARY(20),         /* [신규] SHA1(link), 링크 중복 확인용 */
             INDEX(source), INDEX(pub_date), INDEX(crawl_date),
             INDEX(sentiment),            /* [신규] 인덱스 추가 */
-            INDEX(related_ticker)        /* 인덱스 추가 */
+            INDEX(related_ticker),       /* 인덱스 추가 */
+            INDEX idx_sentiment_scored_at (sentiment_scored_at, id),
+            INDEX idx_link_hash (link_hash)
             /* sentiment_score 컬럼은 제거됨 */
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
     ''')
@@ -258,6 +365,44 @@ def init_db():
         if 'Duplicate column name' not in err.msg and 'Duplicate key name' not in err.msg:
             print(f"테이블 수정 중 예상치 못한 오류(sentiment): {err}")
 
+    # [신규] sentiment_confidence 컬럼 추가 시도 (수집 단계 감성 분석 결과 저장용)
+    try:
+        c.execute("ALTER TABLE news_articles ADD COLUMN sentiment_confidence FLOAT AFTER sentiment")
+    except mysql.connector.Error as err:
+        if 'Duplicate column name' not in err.msg:
+            print(f"테이블 수정 중 예상치 못한 오류(sentiment_confidence): {err}")
+
+    # [신규] sentiment_scored_at 컬럼: 감성 레이블이 기록된 시각 (시간 감쇠 집계의 증분 처리 기준)
+    try:
+        c.execute("ALTER TABLE news_articles ADD COLUMN sentiment_scored_at DATETIME(6) AFTER sentiment_confidence")
+        c.execute("ALTER TABLE news_articles ADD INDEX idx_sentiment_scored_at (sentiment_scored_at, id)")
+        # 이전 버전이 분석 없이 저장한 'neutral' 자리표시 레이블(신뢰도 없음)은 NULL 로 되돌려 백필이 다시 분석하게 함
+        c.execute("UPDATE news_articles SET sentiment = NULL WHERE sentiment = 'neutral' AND sentiment_confidence IS NULL")
+        print(f"분석 대기로 되돌린 기존 'neutral' 기사: {c.rowcount}개")
+        # 나머지 기존 레이블 기사는 수집 시각을 기록 시각으로 간주
+        c.execute("UPDATE news_articles SET sentiment_scored_at = crawl_date WHERE sentiment IS NOT NULL")
+    except mysql.connector.Error as err:
+        if 'Duplicate column name' not in err.msg and 'Duplicate key name' not in err.msg:
+            print(f"테이블 수정 중 예상치 못한 오류(sentiment_scored_at): {err}")
+
+    # [신규] (related_ticker, pub_date) 복합 인덱스: 일별 집계 갱신 시 범위 조회용
+    try:
+        c.execute("ALTER TABLE news_articles ADD INDEX idx_ticker_pub_date (related_ticker, pub_date)")
+    except mysql.connector.Error as err:
+        if 'Duplicate key name' not in err.msg:
+            print(f"테이블 수정 중 예상치 못한 오류(idx_ticker_pub_date): {err}")
+
+    # [신규] link_hash 컬럼: 긴 link 문자열 대신 고정 길이 해시로 중복 여부 조회 (link_dedup 에서 사용)
+    link_hash_added = False
+    try:
+        c.execute("ALTER TABLE news_articles ADD COLUMN link_hash BINARY(20)")
+        link_hash_added = True
+        c.execute("ALTER TABLE news_articles ADD INDEX idx_link_hash (link_hash)")
+    except mysql.connector.Error as err:
+        if 'Duplicate column name' not in err.msg and 'Duplicate key name' not in err.msg:
+            print(f"테이블 수정 중 예상치 못한 오류(link_hash): {err}")
+    if link_hash_added: _backfill_link_hashes(c)
+
     # [신규] sentiment_score 컬럼 삭제 시도 (주의: 데이터 손실 발생 가능)
     try:
         c.execute("ALTER TABLE news_articles DROP COLUMN sentiment_score")
@@ -267,16 +412,60 @@ def init_db():
         if 'check that column/key exists' not in err.msg and 'Unknown column' not in err.msg:
              print(f"테이블 수정 중 예상치 못한 오류(sentiment_score 삭제): {err}")
 
+    # [신규] 일별 종목 감성 집계 테이블
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS daily_ticker_sentiment (
+            ticker VARCHAR(20) NOT NULL,
+            date DATE NOT NULL,
+            positive INT NOT NULL DEFAULT 0,
+            negative INT NOT NULL DEFAULT 0,
+            neutral INT NOT NULL DEFAULT 0,
+            score DOUBLE NOT NULL DEFAULT 0,  /* (긍정 수 - 부정 수) / 전체 수 */
+            weighted_sum DOUBLE NOT NULL DEFAULT 0,  /* 신뢰도 가중 레이블 합 (시간 감쇠 집계용) */
+            weight DOUBLE NOT NULL DEFAULT 0,        /* 신뢰도 합 */
+            PRIMARY KEY (ticker, date)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    ''')
+    # [신규] 신뢰도 가중 컬럼 추가 시도 (기존 테이블) -> 추가되면 집계 재생성
+    try:
+        c.execute("ALTER TABLE daily_ticker_sentiment ADD COLUMN weighted_sum DOUBLE NOT NULL DEFAULT 0, ADD COLUMN weight DOUBLE NOT NULL DEFAULT 0")
+        rollup_migrated = True
+    except mysql.connector.Error as err:
+        rollup_migrated = False
+        if 'Duplicate column name' not in err.msg:
+            print(f"테이블 수정 중 예상치 못한 오류(daily_ticker_sentiment): {err}")
+    # 집계 테이블이 비어 있으면 기존 기사로 한 번 채움
+    c.execute("SELECT 1 FROM daily_ticker_sentiment LIMIT 1")
+    rollup_empty = c.fetchone() is None
+
     c.close()
     conn.close()
+    if rollup_empty or rollup_migrated: rebuild_daily_ticker_sentiment()
+
+def _backfill_link_hashes(c, batch_size=10000):
+    """
+    link_hash 컬럼 추가 직후 기존 기사의 해시를 id 범위 단위로 채웁니다 (큰 단일 UPDATE 로 테이블을 오래 잠그지 않도록).
+    MySQL SHA1 은 utf8mb4 바이트 기준이라 link_hash() 와 같은 값입니다.
+    중간에 실패해도 get_link_hashes_since 가 빈 해시를 COALESCE 로 계산하므로 중복 확인은 동작합니다.
+    """
+    c.execute("SELECT COALESCE(MAX(id), 0) FROM news_articles")
+    max_id = c.fetchone()[0]
+    filled = 0
+    for start in range(0, max_id, batch_size):
+        c.execute(
+            "UPDATE news_articles SET link_hash = UNHEX(SHA1(link)) WHERE id > %s AND id <= %s AND link_hash IS NULL",
+            (start, start + batch_size)
+        )
+        filled += c.rowcount
+    print(f"link_hash 백필 완료: {filled}개 기사")
 
 def save_news_articles(articles):
-    """[수정] DB 저장 시 sentiment 레이블 저장"""
+    """[수정] DB 저장 시 sentiment 레이블 저장 (레이블이 없으면 NULL 로 저장하고 수집 파이프라인이 나중에 채움)"""
     conn = get_db_connection()
     if not conn or not articles: return
     c = conn.cursor()
     # [수정] 쿼리 변경 (sentiment 추가, sentiment_score 제거)
-    query = "INSERT IGNORE INTO news_articles (headline, link, source, image_url, pub_date, crawl_date, sentiment, related_ticker) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+    query = "INSERT IGNORE INTO news_articles (headline, link, source, image_url, pub_date, crawl_date, sentiment, related_ticker, sentiment_scored_at, link_hash) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
     now_utc_naive = datetime.now(timezone.utc).replace(tzinfo=None) # 현재 시간 (Naive UTC)
 
     data_to_insert = []
@@ -291,10 +480,10 @@ def save_news_articles(articles):
                     pub_date_naive_utc = pub_date
             # datetime 객체가 아니거나 없으면 NULL (None)
 
-            # [수정] sentiment 레이블 가져오기 (없으면 'neutral')
-            sentiment_label = a.get('sentiment', 'neutral')
+            # [수정] sentiment 레이블 가져오기 (없거나 유효하지 않으면 NULL = 분석 대기)
+            sentiment_label = a.get('sentiment')
             if sentiment_label not in ['positive', 'negative', 'neutral']:
-                sentiment_label = 'neutral' # 유효하지 않으면 neutral
+                sentiment_label = None
 
             data_to_insert.append((
                 a.get('headline',''), a.get('link',''), a.get('source',''),
@@ -302,12 +491,121 @@ def save_news_articles(articles):
                 pub_date_naive_utc, # Naive UTC 또는 None 저장
                 now_utc_naive,      # Naive UTC 저장
                 sentiment_label,         # [수정] 레이블 저장
-                a.get('related_ticker')  # 관련 티커 또는 None 저장
+                a.get('related_ticker'),  # 관련 티커 또는 None 저장
+                now_utc_naive if sentiment_label else None,  # 레이블 기록 시각
+                link_hash(a['link'])      # 링크 해시 (중복 확인용)
             ))
 
     if not data_to_insert: return
     try:
         c.executemany(query, data_to_insert)
+        # [신규] 레이블과 티커가 함께 저장된 기사는 일별 집계에 바로 반영
+        rollup_keys = {(row[7], row[4].date()) for row in data_to_insert if row[6] and row[7] and row[4]}
+        try:
+            _refresh_daily_ticker_sentiment(c, rollup_keys)
+        except mysql.connector.Error as err:
+            print(f"일별 종목 감성 집계 갱신 오류: {err}")
+    finally:
+        if c: c.close()
+        if conn: conn.close()
+
+def update_article_sentiments(rows):
+    """
+    수집 파이프라인이 분석한 감성 레이블/신뢰도/관련 티커를 기사(link 기준)에 기록합니다.
+    rows: [{'link', 'sentiment', 'confidence', 'related_ticker'}, ...]
+    related_ticker 는 기존 값이 없을 때만 채웁니다.
+    아직 레이블이 없는(sentiment IS NULL) 기사만 기록합니다. 같은 기사가 백필과 크롤링 큐로 두 번 분석되어도
+    한 번만 기록되어, 증분 감쇠 집계(sentiment_scored_at 워터마크)에 두 번 더해지지 않습니다.
+    Returns: 실제로 기록한 기사 수
+    """
+    if not rows: return 0
+    conn = get_db_connection()
+    if not conn: return 0
+    c = conn.cursor()
+    query = """UPDATE news_articles
+               SET sentiment = %s, sentiment_confidence = %s, related_ticker = COALESCE(related_ticker, %s),
+                   sentiment_scored_at = %s
+               WHERE link = %s AND sentiment IS NULL"""
+    scored_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    try:
+        c.executemany(query, [(r['sentiment'], r['confidence'], r.get('related_ticker'), scored_at, r['link']) for r in rows])
+        written = c.rowcount
+        if not written: return 0
+        # [신규] 재분석된 기사의 (티커, 날짜) 집계 갱신
+        links = [r['link'] for r in rows]
+        c.execute(
+            f"SELECT DISTINCT related_ticker, DATE(pub_date) FROM news_articles WHERE link IN ({', '.join(['%s'] * len(links))})",
+            links
+        )
+        _refresh_daily_ticker_sentiment(c, set(c.fetchall()))
+        return written
+    except mysql.connector.Error as err:
+        print(f"기사 감성 결과 저장 오류: {err}")
+        return 0
+    finally:
+        if c: c.close()
+        if conn: conn.close()
+
+def get_unscored_articles(limit=500, after_id=0):
+    """
+    아직 감성 분석되지 않은(sentiment IS NULL) 기사 목록 (수집 파이프라인 백필용)
+    id 가 after_id 보다 큰 기사를 오래된 순으로 반환합니다. 반환된 마지막 id 를 다음 호출에 넘기면
+    새 미분석 기사가 계속 들어와도 오래된 미분석 기사까지 차례로 처리됩니다 (키셋 페이지 조회).
+    """
+    conn = get_db_connection()
+    if not conn: return []
+    c = conn.cursor(dictionary=True)
+    try:
+        c.execute(
+            """SELECT id, headline, link, source, related_ticker FROM news_articles
+               WHERE sentiment IS NULL AND id > %s ORDER BY id LIMIT %s""",
+            (after_id, limit)
+        )
+        return c.fetchall()
+    except mysql.connector.Error as err:
+        print(f"미분석 기사 조회 오류: {err}")
+        return []
+    finally:
+        if c: c.close()
+        if conn: conn.close()
+
+def link_hash(link):
+    """news_articles.link_hash 값: 링크(UTF-8)의 SHA1 20바이트"""
+    return hashlib.sha1(link.encode('utf-8')).digest()
+
+def find_existing_link_hashes(hashes, chunk_size=500):
+    """주어진 링크 해시 중 이미 저장된 것만 반환합니다 (idx_link_hash 인덱스 조회)."""
+    hashes = list(dict.fromkeys(hashes))
+    if not hashes: return set()
+    conn = get_db_connection()
+    if not conn: return set()
+    c = conn.cursor()
+    found = set()
+    try:
+        for i in range(0, len(hashes), chunk_size):
+            chunk = hashes[i:i + chunk_size]
+            c.execute(f"SELECT link_hash FROM news_articles WHERE link_hash IN ({', '.join(['%s'] * len(chunk))})", chunk)
+            found.update(bytes(row[0]) for row in c.fetchall())
+        return found
+    finally:
+        if c: c.close()
+        if conn: conn.close()
+
+def get_link_hashes_since(source, after_id=0, limit=10000):
+    """출처별로 id 가 after_id 보다 큰 기사의 (id, link_hash) 목록 (id 순, 링크 필터 증분 갱신용)"""
+    conn = get_db_connection()
+    if not conn: return []
+    c = conn.cursor()
+    try:
+        c.execute(
+            """SELECT id, COALESCE(link_hash, UNHEX(SHA1(link))) FROM news_articles
+               WHERE source = %s AND id > %s ORDER BY id LIMIT %s""",
+            (source, after_id, limit)
+        )
+        return [(row[0], bytes(row[1])) for row in c.fetchall()]
+    except mysql.connector.Error as err:
+        print(f"링크 해시 조회 오류: {err}")
+        return []
     finally:
         if c: c.close()
         if conn: conn.close()
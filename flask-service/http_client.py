@@ -0,0 +1,236 @@
+"""
+공용 HTTP 클라이언트
+크롤러/RSS/환율 조회가 각자 requests.get 을 호출하던 것을 하나로 모아,
+호스트별 keep-alive 세션(커넥션 풀), 지터를 더한 제한된 재시도, 호스트별 속도 제한,
+ETag/Last-Modified 조건부 요청(+작은 LRU 응답 캐시)을 제공합니다.
+
+변경 없는 RSS 피드는 conditional=True 로 요청하면 전체 다운로드 대신 304 응답만 받고
+캐시된 본문을 그대로 돌려줍니다.
+
+사용 예:
+    from http_client import http_get
+    response = http_get(url, conditional=True)
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+HTTP_DEFAULT_TIMEOUT = float(os.getenv('HTTP_DEFAULT_TIMEOUT', 10))
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 3))
+# 읽기 타임아웃 재시도 횟수. 응답이 느린 서버에서 timeout x (재시도+1) 만큼 묶이지 않도록 기본은 재시도 안 함
+HTTP_READ_RETRIES = int(os.getenv('HTTP_READ_RETRIES', 0))
+HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.5))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 10))
+# 호스트별 기본 분당 요청 수 (configure_host 로 호스트마다 변경 가능)
+HTTP_DEFAULT_RPM = int(os.getenv('HTTP_DEFAULT_RPM', 600))
+# 조건부 요청 응답 캐시: 최대 항목 수 / 항목당 최대 크기
+HTTP_CACHE_SIZE = int(os.getenv('HTTP_CACHE_SIZE', 256))
+HTTP_CACHE_MAX_BYTES = int(os.getenv('HTTP_CACHE_MAX_BYTES', 2 * 1024 * 1024))
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class RateLimiter:
+    """분당 용량을 가진 토큰 버킷 (여러 스레드가 공유)"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(per_minute, 1))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> None:
+        """amount 만큼의 예산이 생길 때까지 대기한 뒤 차감합니다."""
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class JitterRetry(Retry):
+    """urllib3 지수 백오프에 0~backoff 만큼의 무작위 지터를 더한 재시도 정책 (동시 재시도 몰림 방지)"""
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return backoff + random.uniform(0, backoff) if backoff > 0 else 0
+
+
+def _host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+class HttpClient:
+    """호스트별 세션/속도 제한/조건부 요청 캐시를 관리하는 HTTP 클라이언트"""
+
+    def __init__(self, max_retries: int = HTTP_MAX_RETRIES, read_retries: int = HTTP_READ_RETRIES,
+                 backoff_factor: float = HTTP_BACKOFF_FACTOR,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE, default_rpm: int = HTTP_DEFAULT_RPM,
+                 cache_size: int = HTTP_CACHE_SIZE, cache_max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.max_retries = max_retries
+        self.read_retries = read_retries
+        self.backoff_factor = backoff_factor
+        self.pool_maxsize = pool_maxsize
+        self.default_rpm = default_rpm
+        self.cache_size = cache_size
+        self.cache_max_bytes = cache_max_bytes
+        self._sessions: Dict[str, requests.Session] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._host_options: Dict[str, dict] = {}
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'not_modified': 0, 'cache_stores': 0}
+
+    def configure_host(self, host: str, rpm: Optional[int] = None, pool_maxsize: Optional[int] = None) -> None:
+        """호스트별 분당 요청 수/커넥션 풀 크기 지정 (세션 생성 전에 호출해야 풀 크기가 반영됨)"""
+        host = host.lower()
+        with self._lock:
+            options = self._host_options.setdefault(host, {})
+            if rpm is not None:
+                options['rpm'] = rpm
+                self._limiters[host] = RateLimiter(rpm)
+            if pool_maxsize is not None:
+                options['pool_maxsize'] = pool_maxsize
+
+    def _build_session(self, host: str) -> requests.Session:
+        retry = JitterRetry(
+            total=self.max_retries, connect=self.max_retries, read=self.read_retries, status=self.max_retries,
+            backoff_factor=self.backoff_factor, status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']), respect_retry_after_header=True, raise_on_status=False,
+        )
+        pool_maxsize = self._host_options.get(host, {}).get('pool_maxsize', self.pool_maxsize)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get_session(self, url: str) -> requests.Session:
+        """URL 호스트 전용 keep-alive 세션"""
+        host = _host_of(url)
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._sessions[host] = self._build_session(host)
+            return session
+
+    def _limiter(self, host: str) -> RateLimiter:
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = RateLimiter(self.default_rpm)
+            return limiter
+
+    @staticmethod
+    def _cache_key(url: str, headers: dict, params=None) -> str:
+        """조건부 요청 캐시 키: params 를 반영한 최종 URL + 호출자가 지정한 헤더 (Accept-Language 등에 따라 본문이 다름)"""
+        if params:
+            url = requests.Request('GET', url, params=params).prepare().url
+        varying = sorted((name.lower(), str(value)) for name, value in headers.items())
+        return url + ''.join(f"\n{name}: {value}" for name, value in varying)
+
+    def _cached(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            return entry
+
+    def _store(self, key: str, response: requests.Response) -> None:
+        etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        if not (etag or last_modified) or len(response.content) > self.cache_max_bytes:
+            return
+        with self._lock:
+            self._cache[key] = {'etag': etag, 'last_modified': last_modified, 'content': response.content,
+                                'headers': dict(response.headers), 'encoding': response.encoding}
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self.stats['cache_stores'] += 1
+
+    @staticmethod
+    def _from_cache(url: str, entry: dict, not_modified: requests.Response) -> requests.Response:
+        """304 응답을 캐시된 본문을 가진 200 응답으로 변환"""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = not_modified.url or url
+        response._content = entry['content']
+        response.headers.update(entry['headers'])
+        response.headers.update(not_modified.headers)  # 갱신된 캐시 헤더 반영
+        response.encoding = entry['encoding']
+        response.request = not_modified.request
+        response.from_cache = True
+        return response
+
+    def get(self, url: str, headers: Optional[dict] = None, timeout: Optional[float] = None,
+            conditional: bool = False, **kwargs) -> requests.Response:
+        """
+        GET 요청 (호스트 속도 제한 + 재시도 적용)
+
+        Args:
+            conditional: True 면 이전 응답의 ETag/Last-Modified 로 조건부 요청을 보내고,
+                         304 이면 캐시된 본문을 담은 200 응답(response.from_cache=True)을 반환
+            **kwargs: requests.Session.get 에 그대로 전달 (params, stream 등)
+        """
+        host = _host_of(url)
+        request_headers = dict(headers or {})
+        use_cache = conditional and not kwargs.get('stream')
+        cache_key = self._cache_key(url, request_headers, kwargs.get('params')) if use_cache else None
+        entry = self._cached(cache_key) if use_cache else None
+        if entry:
+            if entry['etag']: request_headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']: request_headers['If-Modified-Since'] = entry['last_modified']
+
+        self._limiter(host).acquire()
+        response = self.get_session(url).get(url, headers=request_headers, timeout=timeout or HTTP_DEFAULT_TIMEOUT, **kwargs)
+        self.stats['requests'] += 1
+
+        if entry and response.status_code == 304:
+            self.stats['not_modified'] += 1
+            logger.debug(f"304 Not Modified, 캐시 사용: {url[:100]}")
+            return self._from_cache(url, entry, response)
+        response.from_cache = False
+        if use_cache and response.status_code == 200:
+            self._store(cache_key, response)
+        return response
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """프로세스 전체에서 공유하는 HTTP 클라이언트를 반환합니다."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """get_http_client().get 의 단축 함수"""
+    return get_http_client().get(url, **kwargs)
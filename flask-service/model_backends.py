@@ -0,0 +1,177 @@
+"""
+방향(상승/하락) 예측 모델 백엔드
+predict_stock / _train_tree_model 이 사용하는 분류 모델을 이름으로 선택할 수 있게 하고,
+백엔드별 학습 시간, 예측 지연, 모델 크기, walk-forward 정확도를 비교하는 벤치마크를 제공합니다.
+
+사용 예:
+    python model_backends.py 005930 000660 AAPL --years 3
+"""
+import os
+import time
+import pickle
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.metrics import accuracy_score
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from model_registry import get_model_entry
+
+# 기존 predict_stock / _train_tree_model 과 동일한 RF 하이퍼파라미터
+RF_DEFAULT_PARAMS = {
+    "n_estimators": 100,
+    "max_depth": 10,
+    "min_samples_leaf": 5,
+    "random_state": 42,
+    "n_jobs": -1,
+}
+HGB_DEFAULT_PARAMS = {
+    "max_iter": 200,
+    "learning_rate": 0.05,
+    "max_leaf_nodes": 15,
+    "min_samples_leaf": 20,
+    "l2_regularization": 1.0,
+    "early_stopping": False,
+    "random_state": 42,
+}
+LOGISTIC_DEFAULT_PARAMS = {
+    "C": 1.0,
+    "max_iter": 1000,
+}
+
+
+def _build_rf(**params):
+    return RandomForestClassifier(**{**RF_DEFAULT_PARAMS, **params})
+
+
+def _build_hgb(**params):
+    return HistGradientBoostingClassifier(**{**HGB_DEFAULT_PARAMS, **params})
+
+
+def _build_logistic(**params):
+    # L2 정규화 로지스틱 회귀 (스케일에 민감하므로 표준화 포함)
+    return make_pipeline(StandardScaler(), LogisticRegression(**{**LOGISTIC_DEFAULT_PARAMS, **params}))
+
+
+# 백엔드 이름 -> 모델 생성 함수
+DIRECTION_MODEL_BACKENDS = {
+    "rf": _build_rf,
+    "hgb": _build_hgb,
+    "logistic": _build_logistic,
+}
+
+# .env 의 DIRECTION_MODEL_BACKEND 로 기본 백엔드 변경 가능 (기본값: 기존과 동일한 rf)
+DEFAULT_DIRECTION_BACKEND = os.getenv("DIRECTION_MODEL_BACKEND", "rf")
+
+
+def create_direction_model(backend=None, **params):
+    """
+    이름으로 방향 예측 분류 모델을 생성합니다.
+
+    Args:
+        backend: 'rf', 'hgb', 'logistic' 중 하나 (None이면 DEFAULT_DIRECTION_BACKEND)
+        **params: 백엔드 기본 하이퍼파라미터를 덮어쓸 값
+
+    Returns:
+        학습되지 않은 scikit-learn 분류 모델
+    """
+    backend = backend or DEFAULT_DIRECTION_BACKEND
+    if backend not in DIRECTION_MODEL_BACKENDS:
+        raise ValueError(f"지원하지 않는 모델 타입: {backend}")
+    return DIRECTION_MODEL_BACKENDS[backend](**params)
+
+
+def create_direction_model_for_ticker(ticker, backend=None, features=None, years=None, **params):
+    """
+    종목별 튜닝된 하이퍼파라미터(model_registry)를 적용한 방향 예측 모델을 생성합니다.
+    튜닝 값은 탐색에 사용한 피처 목록/데이터 기간(년)이 이번 학습의 features/years 와 같을 때만 적용하고,
+    다르거나(감성 피처 추가 등) 알 수 없으면 백엔드 기본값을 사용합니다.
+    """
+    backend = backend or DEFAULT_DIRECTION_BACKEND
+    entry = get_model_entry(ticker, backend)
+    tuned = {}
+    if entry and features is not None and years is not None:
+        if set(entry.get("features") or []) == set(features) and entry.get("years") == years:
+            tuned = dict(entry["params"])
+        else:
+            print(f"[{ticker}] 튜닝 파라미터의 피처/기간이 달라 기본값 사용 "
+                  f"(탐색: {entry.get('features')}, {entry.get('years')}년 / 학습: {list(features)}, {years}년)")
+    return create_direction_model(backend, **{**tuned, **params})
+
+
+def benchmark_direction_backends(datasets, backends=None, n_splits=5, latency_repeats=50):
+    """
+    백엔드별 성능/비용을 종목마다 측정합니다.
+
+    Args:
+        datasets: {티커: (X, y)} 형식의 딕셔너리 (X는 피처 DataFrame, y는 0/1 타겟)
+        backends: 비교할 백엔드 이름 목록 (None이면 전체)
+        n_splits: walk-forward(TimeSeriesSplit) 폴드 수
+        latency_repeats: 단일 행 예측 지연 측정 반복 횟수
+
+    Returns:
+        pd.DataFrame: ticker, backend, fit_time_s, predict_latency_ms, model_size_kb, walk_forward_accuracy
+    """
+    backends = backends or list(DIRECTION_MODEL_BACKENDS)
+    rows = []
+    for ticker, (X, y) in datasets.items():
+        if X is None or len(X) <= n_splits + 1:
+            print(f"[{ticker}] 벤치마크 데이터 부족. 건너뜁니다.")
+            continue
+        X_values = np.asarray(X, dtype=float)
+        y_values = np.asarray(y)
+        latest_row = X_values[-1:].copy()
+
+        for backend in backends:
+            # 1. walk-forward 정확도
+            fold_scores = []
+            for train_index, test_index in TimeSeriesSplit(n_splits=n_splits).split(X_values):
+                model = create_direction_model(backend)
+                model.fit(X_values[train_index], y_values[train_index])
+                fold_scores.append(accuracy_score(y_values[test_index], model.predict(X_values[test_index])))
+
+            # 2. 전체 데이터 학습 시간 (실서비스의 predict_stock 과 동일한 조건)
+            model = create_direction_model(backend)
+            start = time.perf_counter()
+            model.fit(X_values, y_values)
+            fit_time = time.perf_counter() - start
+
+            # 3. 최신 1행 예측 지연
+            start = time.perf_counter()
+            for _ in range(latency_repeats):
+                model.predict(latest_row)
+            predict_latency = (time.perf_counter() - start) / latency_repeats
+
+            rows.append({
+                "ticker": ticker,
+                "backend": backend,
+                "fit_time_s": round(fit_time, 4),
+                "predict_latency_ms": round(predict_latency * 1000, 3),
+                "model_size_kb": round(len(pickle.dumps(model)) / 1024, 1),
+                "walk_forward_accuracy": round(float(np.mean(fold_scores)), 4),
+            })
+            print(f"[{ticker}] {backend}: 정확도 {rows[-1]['walk_forward_accuracy']:.4f}, 학습 {fit_time:.3f}s")
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="방향 예측 모델 백엔드 벤치마크")
+    parser.add_argument("tickers", nargs="+", help="예: 005930 000660 AAPL")
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--backends", nargs="*", default=None, choices=list(DIRECTION_MODEL_BACKENDS))
+    args = parser.parse_args()
+
+    from services.prediction_service import get_stock_data_for_analysis
+
+    datasets = {ticker: get_stock_data_for_analysis(ticker, years=args.years) for ticker in args.tickers}
+    report = benchmark_direction_backends(datasets, backends=args.backends)
+    print(report.to_string(index=False))
+    if not report.empty:
+        print("\n[백엔드별 평균]")
+        print(report.groupby("backend")[["fit_time_s", "predict_latency_ms", "model_size_kb", "walk_forward_accuracy"]].mean().to_string())
@@ -0,0 +1,78 @@
+"""
+종목별 모델 하이퍼파라미터 레지스트리
+오프라인 하이퍼파라미터 탐색(services/hyperparameter_search_service.py)이 찾은 최적 파라미터를
+JSON 파일에 저장하고, predict_stock 등 요청 시점의 코드는 탐색 비용 없이 조회만 합니다.
+
+파일 형식:
+    {"005930": {"rf": {"params": {...}, "score": 0.54, "features": [...], "updated_at": "..."}}}
+"""
+import os
+import json
+import threading
+from datetime import datetime
+
+# .env 의 MODEL_REGISTRY_PATH 로 경로 변경 가능
+MODEL_REGISTRY_PATH = os.getenv("MODEL_REGISTRY_PATH", "model_registry.json")
+
+_lock = threading.Lock()
+_cache = {"mtime": None, "entries": {}}
+
+
+def _load(path=MODEL_REGISTRY_PATH):
+    """레지스트리 파일을 읽습니다 (파일이 바뀌지 않았으면 메모리 사본 사용)."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    with _lock:
+        if _cache["mtime"] != mtime:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    _cache["entries"] = json.load(f)
+                _cache["mtime"] = mtime
+            except (OSError, ValueError) as e:
+                print(f"모델 레지스트리 로드 실패 ({path}): {e}")
+                return {}
+        return _cache["entries"]
+
+
+def get_model_entry(ticker, backend, path=MODEL_REGISTRY_PATH):
+    """종목/백엔드의 레지스트리 항목 (없으면 None)"""
+    return _load(path).get(str(ticker), {}).get(backend)
+
+
+def get_tuned_params(ticker, backend, path=MODEL_REGISTRY_PATH):
+    """종목/백엔드의 최적 하이퍼파라미터 (없으면 빈 딕셔너리)"""
+    entry = get_model_entry(ticker, backend, path)
+    return dict(entry["params"]) if entry else {}
+
+
+def save_model_entry(ticker, backend, params, score, features=None, extra=None, path=MODEL_REGISTRY_PATH):
+    """
+    종목/백엔드의 최적 하이퍼파라미터를 저장합니다.
+
+    Args:
+        ticker: 종목 코드
+        backend: model_backends 의 백엔드 이름
+        params: 백엔드 기본값을 덮어쓸 하이퍼파라미터
+        score: 탐색 시 walk-forward 평균 점수
+        features: 탐색에 사용한 피처 목록
+        extra: 함께 기록할 부가 정보 (탐색 설정 등)
+    """
+    with _lock:
+        entries = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        entries.setdefault(str(ticker), {})[backend] = {
+            "params": params,
+            "score": score,
+            "features": features,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+            **(extra or {}),
+        }
+        # 요청 처리 중인 프로세스가 읽을 수 있으므로 임시 파일에 쓴 뒤 교체
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
@@ -15,6 +15,7 @@ import joblib
 import os
 import yfinance as yf
 import re
+from utils.indicators import calculate_momentum
 
 class AIAnalysisService:
     def __init__(self):
@@ -26,40 +27,21 @@ class AIAnalysisService:
             'combined': 57
         }
         
-    def analyze_ai_predictions(self, companies: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_ai_predictions(self, companies: List[Dict[str, Any]], progress=None) -> Dict[str, Any]:
         """
         AI 분석 메인 함수
+        
+        progress가 주어지면 종목 하나를 끝낼 때마다 progress(완료 비율, 메시지)를 호출합니다.
         """
         try:
             predictions = []
             
-            for company in companies:
-                symbol = company['symbol']
-                
-                # 주식 데이터 가져오기
-                stock_data = self.get_stock_data(symbol)
-                
-                if stock_data is not None:
-                    # LSTM 예측
-                    lstm_prediction = self.predict_with_lstm(stock_data)
-                    
-                    # Random Forest 예측
-                    rf_prediction = self.predict_with_random_forest(stock_data)
-                    
-                    # 결합된 예측
-                    combined_prediction = self.combine_predictions(lstm_prediction, rf_prediction)
-                    
-                    predictions.append({
-                        'symbol': symbol,
-                        'direction': 'up' if combined_prediction['percentage'] > 0 else 'down',
-                        'percentage': combined_prediction['percentage'],
-                        'lstm_accuracy': self.model_accuracy['lstm'],
-                        'rf_accuracy': self.model_accuracy['random_forest'],
-                        'combined_accuracy': self.model_accuracy['combined'],
-                        'lstm_prediction': lstm_prediction,
-                        'rf_prediction': rf_prediction,
-                        'confidence': combined_prediction['confidence']
-                    })
+            for i, company in enumerate(companies):
+                prediction = self.analyze_company(company['symbol'])
+                if prediction is not None:
+                    predictions.append(prediction)
+                if progress:
+                    progress((i + 1) / len(companies), company['symbol'])
             
             return {
                 'success': True,
@@ -80,6 +62,50 @@ class AIAnalysisService:
                 'data': self.get_mock_ai_data(companies)
             }
     
+    def analyze_company(self, symbol: str, model_cache=None) -> Dict[str, Any]:
+        """
+        단일 종목 AI 분석 (데이터 로드 -> LSTM/RF 예측 -> 결합)
+        
+        Args:
+            symbol: 주식 심볼
+            model_cache: 학습된 RF 모델 캐시 (get/set 지원 객체, 없으면 매번 학습)
+        
+        Returns:
+            예측 결과 딕셔너리 (데이터가 없으면 None)
+        """
+        # 주식 데이터 가져오기
+        stock_data = self.get_stock_data(symbol)
+        
+        if stock_data is None:
+            return None
+        
+        # LSTM/RF 가 공유하는 피처 배열 (한 번만 생성)
+        feature_array = self.build_feature_array(stock_data)
+        
+        # LSTM 예측
+        lstm_prediction = self.predict_with_lstm(stock_data, feature_array=feature_array)
+        
+        # Random Forest 예측
+        cache_key = f"ai_rf:{symbol}" if model_cache is not None else None
+        rf_prediction = self.predict_with_random_forest(
+            stock_data, model_cache=model_cache, cache_key=cache_key, feature_array=feature_array
+        )
+        
+        # 결합된 예측
+        combined_prediction = self.combine_predictions(lstm_prediction, rf_prediction)
+        
+        return {
+            'symbol': symbol,
+            'direction': 'up' if combined_prediction['percentage'] > 0 else 'down',
+            'percentage': combined_prediction['percentage'],
+            'lstm_accuracy': self.model_accuracy['lstm'],
+            'rf_accuracy': self.model_accuracy['random_forest'],
+            'combined_accuracy': self.model_accuracy['combined'],
+            'lstm_prediction': lstm_prediction,
+            'rf_prediction': rf_prediction,
+            'confidence': combined_prediction['confidence']
+        }
+    
     def get_stock_data(self, symbol: str, period: str = '3y') -> pd.DataFrame:
         """
         주식 데이터 가져오기 (3년치)
@@ -173,55 +199,59 @@ class AIAnalysisService:
             'lower': lower
         }
     
-    def predict_with_lstm(self, data: pd.DataFrame) -> Dict[str, float]:
+    def build_feature_array(self, data: pd.DataFrame) -> Tuple[List[str], np.ndarray]:
+        """
+        LSTM/RF 예측이 공유하는 피처 배열 생성 (결측 행 제거)
+        
+        Returns:
+            (피처 이름 목록, [날짜, 피처] numpy 배열) - 첫 번째 피처는 항상 'Close'
+        """
+        # 기본 features
+        features = ['Close', 'Volume', 'MA5', 'MA10', 'MA20', 'RSI', 'MACD']
+        
+        # MACD_Signal이 있고 실제 데이터가 있는지 확인
+        if 'MACD_Signal' in data.columns and data['MACD_Signal'].notna().any():
+            features.append('MACD_Signal')
+        
+        values = data[features].to_numpy(dtype=float)
+        values = values[~np.isnan(values).any(axis=1)]
+        return features, values
+    
+    def predict_with_lstm(self, data: pd.DataFrame, feature_array: Tuple[List[str], np.ndarray] = None) -> Dict[str, float]:
         """
         LSTM 모델을 사용한 예측 (30일 후 주가 예측)
+        
+        feature_array가 주어지면 build_feature_array 결과를 재사용합니다.
         """
         try:
-            # 기본 features
-            features = ['Close', 'Volume', 'MA5', 'MA10', 'MA20', 'RSI', 'MACD']
-            
-            # MACD_Signal이 있고 실제 데이터가 있는지 확인
-            if 'MACD_Signal' in data.columns and data['MACD_Signal'].notna().any():
-                features.append('MACD_Signal')
+            features, values = feature_array or self.build_feature_array(data)
             
-            # 결측값 제거
-            clean_data = data[features].dropna()
-            
-            if len(clean_data) < 60:
+            if len(values) < 60:
                 return {'percentage': 0.0, 'confidence': 0.5}
             
-            # 30일 후 가격 타겟 생성
-            clean_data['Target_30d'] = clean_data['Close'].shift(-30)
-            
-            # 타겟 데이터가 있는 데이터만 사용
-            clean_data = clean_data.dropna()
+            # 30일 후 가격 타겟이 있는 행만 사용 (마지막 30행 제외)
+            usable = values[:-30]
             
-            if len(clean_data) < 30:
+            if len(usable) < 30:
                 return {'percentage': 0.0, 'confidence': 0.5}
             
             # 최근 90일 데이터로 트렌드 분석 (평균 변화율 기반)
-            recent_data = clean_data.tail(90)
-            
-            # 30일 변화율 계산
-            day30_changes = []
-            for i in range(len(recent_data) - 30):
-                if i + 30 < len(recent_data):
-                    change = (recent_data['Close'].iloc[i + 30] / recent_data['Close'].iloc[i] - 1) * 100
-                    day30_changes.append(change)
+            recent = usable[-90:]
+            latest = dict(zip(features, recent[-1]))
             
             # 평균 30일 변화율
-            avg_30day_change = np.mean(day30_changes) if day30_changes else 0
+            day30_changes = calculate_momentum(recent[:, 0], window=30) * 100
+            avg_30day_change = day30_changes.mean() if len(day30_changes) else 0
             
             # 기술적 지표 기반 신호
-            rsi_signal = 1 if recent_data['RSI'].iloc[-1] < 70 else -1
+            rsi_signal = 1 if latest['RSI'] < 70 else -1
             
             # MACD_Signal이 있으면 사용, 없으면 MACD만 사용
-            if 'MACD_Signal' in recent_data.columns:
-                macd_signal = 1 if recent_data['MACD'].iloc[-1] > recent_data['MACD_Signal'].iloc[-1] else -1
+            if 'MACD_Signal' in latest:
+                macd_signal = 1 if latest['MACD'] > latest['MACD_Signal'] else -1
             else:
                 # MACD가 0보다 크면 상승, 작으면 하락
-                macd_signal = 1 if recent_data['MACD'].iloc[-1] > 0 else -1
+                macd_signal = 1 if latest['MACD'] > 0 else -1
             
             # 가중 평균으로 최종 예측 (30일 평균 변화율 + 기술적 지표)
             prediction = avg_30day_change * 0.7 + (rsi_signal * 2.0 + macd_signal * 2.0) * 0.3
@@ -238,57 +268,59 @@ class AIAnalysisService:
             print(f"LSTM prediction error: {e}")
             return {'percentage': 0.0, 'confidence': 0.5}
     
-    def predict_with_random_forest(self, data: pd.DataFrame) -> Dict[str, float]:
+    def predict_with_random_forest(self, data: pd.DataFrame, model_cache=None, cache_key: str = None,
+                                   feature_array: Tuple[List[str], np.ndarray] = None) -> Dict[str, float]:
         """
         Random Forest 모델을 사용한 예측 (30일 후 주가 예측)
+        
+        model_cache와 cache_key가 주어지면 같은 학습 데이터로 이미 학습된 모델(및 R²)을 재사용합니다.
+        feature_array가 주어지면 build_feature_array 결과를 재사용합니다.
         """
         try:
-            # 기본 features
-            features = ['Close', 'Volume', 'MA5', 'MA10', 'MA20', 'RSI', 'MACD']
-            
-            # MACD_Signal이 있고 실제 데이터가 있는지 확인
-            if 'MACD_Signal' in data.columns and data['MACD_Signal'].notna().any():
-                features.append('MACD_Signal')
+            features, values = feature_array or self.build_feature_array(data)
             
-            # 결측값 제거
-            clean_data = data[features].dropna()
-            
-            if len(clean_data) < 90:
+            if len(values) < 90:
                 return {'percentage': 0.0, 'confidence': 0.5}
             
-            # 30일 후 가격 타겟 생성
-            clean_data['Target_30d'] = clean_data['Close'].shift(-30)
-            
-            # 타겟 데이터가 있는 데이터만 사용
-            clean_data = clean_data.dropna()
+            # 특성과 타겟 준비 (타겟 = 30일 후 가격, 타겟이 없는 마지막 30행 제외)
+            X = values[:-30]
+            y = values[30:, 0]
             
-            if len(clean_data) < 60:
+            if len(X) < 60:
                 return {'percentage': 0.0, 'confidence': 0.5}
             
-            # 특성과 타겟 준비
-            X = clean_data[features].values
-            y = clean_data['Target_30d'].values  # 30일 후 가격
-            
-            # 훈련/테스트 분할
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
-            )
-            
-            # Random Forest 모델 훈련
-            rf_model = RandomForestRegressor(n_estimators=100, random_state=42)
-            rf_model.fit(X_train, y_train)
-            
-            # 예측
-            y_pred = rf_model.predict(X_test)
+            # 동일한 학습 데이터로 학습된 모델이 캐시에 있으면 재사용
+            cached = None
+            if model_cache is not None and cache_key:
+                cache_key = f"{cache_key}:{model_cache.fingerprint(X, y)}"
+                cached = model_cache.get(cache_key)
             
-            # 정확도 계산
-            mse = mean_squared_error(y_test, y_pred)
-            r2 = r2_score(y_test, y_pred)
+            if cached is not None:
+                rf_model, r2 = cached
+            else:
+                # 훈련/테스트 분할
+                X_train, X_test, y_train, y_test = train_test_split(
+                    X, y, test_size=0.2, random_state=42
+                )
+                
+                # Random Forest 모델 훈련
+                rf_model = RandomForestRegressor(n_estimators=100, random_state=42)
+                rf_model.fit(X_train, y_train)
+                
+                # 예측
+                y_pred = rf_model.predict(X_test)
+                
+                # 정확도 계산
+                mse = mean_squared_error(y_test, y_pred)
+                r2 = r2_score(y_test, y_pred)
+                
+                if model_cache is not None and cache_key:
+                    model_cache.set(cache_key, (rf_model, r2))
             
             # 최근 데이터로 예측
-            recent_features = clean_data[features].iloc[-1:].values
+            recent_features = X[-1:]
             prediction = rf_model.predict(recent_features)[0]
-            current_price = clean_data['Close'].iloc[-1]
+            current_price = X[-1, 0]
             
             # 30일 후 주가 변화율 계산
             percentage = ((prediction - current_price) / current_price) * 100
@@ -396,12 +428,12 @@ class AIAnalysisService:
         return pd.DataFrame() # 모든 시도 실패
 
 # Flask API 엔드포인트용 함수
-def analyze_ai_endpoint(request_data: Dict[str, Any]) -> Dict[str, Any]:
+def analyze_ai_endpoint(request_data: Dict[str, Any], progress=None) -> Dict[str, Any]:
     """
     Flask API 엔드포인트용 AI 분석 함수
     """
     service = AIAnalysisService()
     companies = request_data.get('companies', [])
     
-    return service.analyze_ai_predictions(companies)
+    return service.analyze_ai_predictions(companies, progress=progress)
 
@@ -0,0 +1,247 @@
+"""
+뉴스 기사 본문 추출기
+BeautifulSoup 로 페이지 전체를 파싱한 뒤 CSS 선택자를 차례로 시도하던 방식 대신,
+lxml.html 로 직접 파싱하고 도메인별로 미리 컴파일한 XPath 규칙으로 본문을 찾습니다.
+
+- 응답은 stream 으로 받아 ARTICLE_MAX_BYTES 까지만 읽습니다 (광고/스크립트가 많은 대형 페이지 방지).
+- script/style 등은 선택 전에 한 번에 제거합니다 (lxml.etree.strip_elements).
+- 도메인 규칙이 없거나 실패하면 문단 텍스트 밀도(readability 방식)로 본문 후보를 고릅니다.
+
+사용 예:
+    from services.article_extractor import fetch_article_text
+    content = fetch_article_text(url)
+"""
+
+import os
+import re
+import codecs
+import logging
+import threading
+from urllib.parse import urlsplit
+from typing import Dict, List, Optional
+
+import lxml.html
+from lxml import etree
+
+from http_client import http_get
+
+logger = logging.getLogger(__name__)
+
+# 소켓에서 읽을 최대 바이트 수 / 반환할 본문 최대 글자 수
+ARTICLE_MAX_BYTES = int(os.getenv('ARTICLE_MAX_BYTES', 1024 * 1024))
+ARTICLE_MAX_CHARS = 10000
+# 이보다 짧으면 본문으로 인정하지 않음
+MIN_CONTENT_LENGTH = 100
+# 밀도 계산에 포함할 최소 문단 길이
+MIN_PARAGRAPH_LENGTH = 25
+READ_CHUNK_SIZE = 16 * 1024
+
+# 본문 추출 전에 통째로 제거하는 태그
+STRIP_TAGS = ('script', 'style', 'noscript', 'iframe', 'template', 'svg', 'button', 'select')
+# 밀도 기반 추출 시 후보에서 제외하는 영역 (메뉴/푸터 등)
+BOILERPLATE_TAGS = ('nav', 'header', 'footer', 'aside', 'form')
+# 줄바꿈으로 구분할 블록 태그
+BLOCK_TAGS = frozenset(['p', 'div', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'section', 'article'])
+
+
+def _has_class(name: str) -> str:
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+# 도메인(접미사) -> 본문 XPath 목록 (앞의 규칙부터 시도)
+DOMAIN_RULES: Dict[str, List[str]] = {
+    'naver.com': [
+        '//*[@id="dic_area"]',  # n.news.naver.com
+        '//*[@id="newsct_article"]',
+        '//*[@id="articleBodyContents"]',
+        '//*[@id="newsEndContents"]',
+        '//*[@id="viewContent"]',
+    ],
+    'hankyung.com': [
+        '//*[@id="articletxt"]',
+        f'//div[{_has_class("article-body")}]',
+        f'//*[{_has_class("article_body")}]',
+    ],
+    'mk.co.kr': [
+        f'//*[{_has_class("news_cnt_detail_wrap")}]',
+        '//*[@itemprop="articleBody"]',
+        '//*[@id="article_body"]',
+    ],
+    'nasdaq.com': [
+        f'//*[{_has_class("body__content")}]',
+        f'//*[{_has_class("article-body")}]',
+    ],
+}
+# 모든 도메인에서 도메인 규칙 다음으로 시도하는 공통 규칙
+GENERIC_RULES = [
+    '//*[@itemprop="articleBody"]',
+    '//article',
+    f'//div[{_has_class("article-body")}]',
+    f'//*[{_has_class("article-content")}]',
+]
+
+# 선언된 인코딩이 없을 때 사용하는 도메인별 기본 인코딩
+DOMAIN_ENCODINGS = {
+    'finance.naver.com': 'euc-kr',
+}
+
+_compiled_rules: Dict[str, List[etree.XPath]] = {
+    domain: [etree.XPath(rule) for rule in rules] for domain, rules in DOMAIN_RULES.items()
+}
+_compiled_generic_rules = [etree.XPath(rule) for rule in GENERIC_RULES]
+_parser_local = threading.local()  # lxml 파서는 스레드 간 공유하지 않음
+_link_text_xpath = etree.XPath('string-length(normalize-space(string(.)))')
+_meta_charset_pattern = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+_space_pattern = re.compile(r'[ \t\r\f\v\xa0\u200b]+')
+
+
+def _rules_for(host: str) -> List[etree.XPath]:
+    for domain, rules in _compiled_rules.items():
+        if host == domain or host.endswith('.' + domain):
+            return rules + _compiled_generic_rules
+    return _compiled_generic_rules
+
+
+def _detect_encoding(body: bytes, host: str, declared: Optional[str]) -> str:
+    """Content-Type 헤더 -> <meta charset> -> 도메인 기본값 -> UTF-8 순서로 인코딩 결정"""
+    if declared:
+        return declared
+    match = _meta_charset_pattern.search(body[:4096])
+    if match:
+        return match.group(1).decode('ascii', 'ignore')
+    for domain, encoding in DOMAIN_ENCODINGS.items():
+        if host == domain or host.endswith('.' + domain):
+            return encoding
+    return 'utf-8'
+
+
+def _html_parser():
+    parser = getattr(_parser_local, 'parser', None)
+    if parser is None:
+        parser = _parser_local.parser = lxml.html.HTMLParser(remove_comments=True)
+    return parser
+
+
+def _parse(body: bytes, encoding: str):
+    """선언된 인코딩으로 디코딩 후 파싱 (ks_c_5601-1987/euc-kr 은 상위 집합인 cp949 로 처리)"""
+    try:
+        codec = codecs.lookup(encoding).name
+    except LookupError:
+        codec = 'utf-8'
+    if codec == 'euc_kr':
+        codec = 'cp949'
+    return lxml.html.document_fromstring(body.decode(codec, 'replace'), parser=_html_parser())
+
+
+def _element_text(element) -> str:
+    """블록 태그/<br> 단위로 줄을 나눈 정리된 텍스트"""
+    for node in element.iter('br', *BLOCK_TAGS):
+        node.tail = '\n' + (node.tail or '')
+    lines = (_space_pattern.sub(' ', line).strip() for line in element.text_content().splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def _text_length(element) -> int:
+    return int(_link_text_xpath(element))
+
+
+def _density_candidate(root):
+    """문단 길이를 부모(전체)/조부모(절반)에 더하고 링크 밀도로 감점해 가장 점수가 높은 요소 반환"""
+    scores = {}
+
+    def add(element, score):
+        if element is not None:
+            scores[element] = scores.get(element, 0.0) + score
+
+    for paragraph in root.iter('p', 'pre', 'td'):
+        length = _text_length(paragraph)
+        if length < MIN_PARAGRAPH_LENGTH:
+            continue
+        parent = paragraph.getparent()
+        add(parent, length)
+        add(parent.getparent() if parent is not None else None, length / 2)
+
+    # <p> 없이 <br> 로만 문단을 나누는 한국 언론사 본문 처리: div 의 직접 텍스트 길이
+    for div in root.iter('div'):
+        direct = len((div.text or '').strip()) + sum(len((child.tail or '').strip()) for child in div)
+        if direct >= MIN_PARAGRAPH_LENGTH:
+            add(div, direct)
+
+    best, best_score = None, 0.0
+    for element, score in scores.items():
+        total = _text_length(element)
+        if total == 0:
+            continue
+        link_length = sum(_text_length(link) for link in element.iter('a'))
+        score *= 1 - min(link_length / total, 1.0)
+        if score > best_score:
+            best, best_score = element, score
+    return best
+
+
+def extract_article_text(body: bytes, url: str = '', encoding: Optional[str] = None) -> str:
+    """
+    HTML 바이트에서 기사 본문 텍스트를 추출합니다.
+
+    Args:
+        body: HTML 원문 (잘린 바이트여도 됨)
+        url: 도메인 규칙/기본 인코딩 선택에 사용
+        encoding: 응답 헤더에 선언된 인코딩 (없으면 자동 감지)
+
+    Returns:
+        str: 본문 텍스트 (최대 ARTICLE_MAX_CHARS 자, 실패 시 빈 문자열)
+    """
+    if not body:
+        return ''
+    host = urlsplit(url).netloc.lower()
+    try:
+        root = _parse(body, _detect_encoding(body, host, encoding))
+    except (etree.ParserError, ValueError):
+        return ''
+    etree.strip_elements(root, *STRIP_TAGS, with_tail=False)
+
+    for rule in _rules_for(host):
+        for element in rule(root):
+            content = _element_text(element)
+            if len(content) >= MIN_CONTENT_LENGTH:
+                return content[:ARTICLE_MAX_CHARS]
+
+    etree.strip_elements(root, *BOILERPLATE_TAGS, with_tail=False)
+    candidate = _density_candidate(root)
+    content = _element_text(candidate) if candidate is not None else ''
+    if len(content) < MIN_CONTENT_LENGTH:
+        body_element = root.find('body')
+        content = _element_text(body_element if body_element is not None else root)
+    return content[:ARTICLE_MAX_CHARS]
+
+
+def _declared_charset(content_type: str) -> Optional[str]:
+    for part in content_type.split(';')[1:]:
+        key, _, value = part.strip().partition('=')
+        if key.lower() == 'charset' and value:
+            return value.strip('"\' ')
+    return None
+
+
+def fetch_article_text(url: str, headers: Optional[dict] = None, timeout: float = 5,
+                       max_bytes: int = ARTICLE_MAX_BYTES) -> str:
+    """
+    기사 페이지를 max_bytes 까지만 받아 본문을 추출합니다. HTML 이 아닌 응답은 빈 문자열.
+    네트워크/HTTP 오류는 호출한 쪽에서 처리하도록 그대로 전달합니다.
+    """
+    response = http_get(url, headers=headers, timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()
+        content_type = response.headers.get('Content-Type', '')
+        if content_type and 'html' not in content_type.lower():
+            return ''
+        chunks, size = [], 0
+        for chunk in response.iter_content(READ_CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                logger.debug(f"본문 페이지가 {max_bytes} 바이트를 넘어 잘라서 파싱: {url[:80]}")
+                break
+    finally:
+        response.close()
+    return extract_article_text(b''.join(chunks)[:max_bytes], response.url or url, _declared_charset(content_type))
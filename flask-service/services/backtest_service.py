@@ -0,0 +1,270 @@
+"""
+Walk-forward 백테스트 서비스
+predict_stock 과 같은 방향/가격 예측을 매매 신호로 사용했을 때의 성과를 과거 데이터로 재현합니다.
+일정 주기(retrain_every 거래일)마다 그 시점까지의 데이터로만 모델을 재학습하고,
+다음 재학습 전까지의 구간은 한 번의 predict 호출로 신호를 만든 뒤 배열 연산으로 손익을 평가합니다.
+종목별 백테스트는 배치 예측용 프로세스 풀에서 병렬로 실행됩니다.
+
+사용 예:
+    python -m services.backtest_service 005930 000660 AAPL --years 5 --retrain-every 20
+"""
+
+import time
+import logging
+import argparse
+import concurrent.futures
+from datetime import date
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from model_backends import create_direction_model, DEFAULT_DIRECTION_BACKEND
+from services.batch_prediction_service import ModelCache, get_executor
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+# 기본 백테스트 설정
+DEFAULT_BACKTEST_OPTIONS = {
+    'backend': None,          # 방향 예측 백엔드 (None이면 DIRECTION_MODEL_BACKEND)
+    'signal': 'direction',    # 'direction': 분류 모델 신호, 'price': 다음 날 종가 회귀 모델 신호
+    'min_train': 250,         # 첫 학습에 필요한 최소 거래일 수
+    'retrain_every': 20,      # 재학습 주기 (거래일)
+    'train_window': None,     # 학습 구간 길이 (None이면 처음부터 누적)
+    'cost_bps': 5.0,          # 포지션 변경 1회당 거래 비용 (bp)
+    'allow_short': False,     # 하락 신호 시 공매도 (False면 현금 보유)
+    'cache_models': True,     # 재학습 시점별 모델을 디스크 캐시에 저장/재사용
+}
+
+# predict_stock 의 가격 예측 모델과 동일한 하이퍼파라미터
+PRICE_MODEL_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 10,
+    'min_samples_leaf': 5,
+    'random_state': 42,
+}
+
+
+def load_feature_matrix(ticker: str, years: int = 5, cache: ModelCache = None) -> Optional[pd.DataFrame]:
+    """
+    백테스트용 피처 행렬 (get_stock_data_for_analysis 의 X, 'Close' 포함)
+    같은 날 같은 종목/기간 요청은 디스크 캐시에서 읽습니다.
+    """
+    cache = cache or ModelCache()
+    cache_key = f"features:{ticker}:{years}:{date.today().isoformat()}"
+    features = cache.get(cache_key)
+    if features is not None:
+        return features
+
+    from services.prediction_service import get_stock_data_for_analysis
+    features, _ = get_stock_data_for_analysis(ticker, years=years)
+    if features is None or features.empty:
+        return None
+    cache.set(cache_key, features)
+    return features
+
+
+def _fit_block_model(X_train: np.ndarray, y_train: np.ndarray, options: Dict[str, Any], model_cache=None,
+                     cache_key: str = None):
+    """한 재학습 시점의 모델 학습 (같은 학습 데이터로 학습된 모델이 캐시에 있으면 재사용)"""
+    if model_cache is not None and cache_key:
+        cache_key = f"{cache_key}:{model_cache.fingerprint(X_train, y_train)}"
+        model = model_cache.get(cache_key)
+        if model is not None:
+            return model, False
+
+    if options['signal'] == 'price':
+        model = RandomForestRegressor(**PRICE_MODEL_PARAMS)
+    else:
+        model = create_direction_model(options['backend'])
+    # 프로세스 풀 워커 안에서 실행되므로 모델 내부 병렬화는 끔
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=1)
+    model.fit(X_train, y_train)
+
+    if model_cache is not None and cache_key:
+        model_cache.set(cache_key, model)
+    return model, True
+
+
+def backtest_ticker(ticker: str, features: pd.DataFrame, model_cache=None, **options) -> Dict[str, Any]:
+    """
+    단일 종목 walk-forward 백테스트
+
+    t일 종가 시점에 t일까지의 데이터로 학습된 모델이 t+1일 방향을 예측하고,
+    그 신호로 t일 종가 ~ t+1일 종가 구간의 포지션을 잡는다고 가정합니다.
+
+    Args:
+        ticker: 종목 코드
+        features: 날짜 인덱스의 피처 DataFrame ('Close' 컬럼 필수)
+        model_cache: 학습된 모델 캐시 (get/set/fingerprint 지원 객체, 없으면 매번 학습)
+        **options: DEFAULT_BACKTEST_OPTIONS 의 값을 덮어쓸 설정
+
+    Returns:
+        종목별 성과 지표 딕셔너리
+    """
+    options = {**DEFAULT_BACKTEST_OPTIONS, **options}
+    # None 을 실제 백엔드 이름으로 바꿔 캐시 키에 반영 (DIRECTION_MODEL_BACKEND 변경 시 이전 백엔드 모델 재사용 방지)
+    options['backend'] = options['backend'] or DEFAULT_DIRECTION_BACKEND
+    started = time.perf_counter()
+
+    X = features.to_numpy(dtype=float)
+    close = features['Close'].to_numpy(dtype=float)
+    # t일 -> t+1일 수익률 (마지막 날은 다음 날이 없으므로 평가 대상에서 제외)
+    returns = close[1:] / close[:-1] - 1
+    n = len(returns)
+    X = X[:n]
+    up = (returns > 0).astype(int)
+    target = close[1:] if options['signal'] == 'price' else up
+
+    min_train = options['min_train']
+    retrain_every = options['retrain_every']
+    train_window = options['train_window']
+    if n <= min_train:
+        return {'ticker': ticker, 'success': False, 'error': f'데이터 부족 ({n} <= {min_train})'}
+
+    predicted_up = np.zeros(n - min_train, dtype=int)
+    fit_time = predict_time = 0.0
+    retrains = cache_hits = 0
+    cache_key = f"backtest:{ticker}:{options['signal']}:{options['backend']}" if model_cache is not None else None
+
+    for start in range(min_train, n, retrain_every):
+        stop = min(start + retrain_every, n)
+        train_from = 0 if train_window is None else max(0, start - train_window)
+
+        fit_started = time.perf_counter()
+        model, trained = _fit_block_model(X[train_from:start], target[train_from:start], options,
+                                          model_cache=model_cache, cache_key=cache_key)
+        fit_time += time.perf_counter() - fit_started
+        retrains += 1
+        cache_hits += not trained
+
+        predict_started = time.perf_counter()
+        block_prediction = model.predict(X[start:stop])
+        predict_time += time.perf_counter() - predict_started
+
+        if options['signal'] == 'price':
+            block_prediction = block_prediction > close[start:stop]
+        predicted_up[start - min_train:stop - min_train] = block_prediction
+
+    # --- 신호 평가 (벡터 연산) ---
+    oos_returns = returns[min_train:]
+    positions = np.where(predicted_up == 1, 1.0, -1.0 if options['allow_short'] else 0.0)
+    trades = np.abs(np.diff(positions, prepend=0.0))
+    daily_pnl = positions * oos_returns - trades * options['cost_bps'] / 10000
+    equity = np.cumprod(1 + daily_pnl)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    pnl_std = daily_pnl.std()
+
+    return {
+        'ticker': ticker,
+        'success': True,
+        'start_date': pd.Timestamp(features.index[min_train]).strftime('%Y-%m-%d'),
+        'end_date': pd.Timestamp(features.index[n]).strftime('%Y-%m-%d'),
+        'days': len(oos_returns),
+        'total_return_pct': round(float(equity[-1] - 1) * 100, 2),
+        'buy_and_hold_pct': round(float(np.prod(1 + oos_returns) - 1) * 100, 2),
+        'sharpe': round(float(daily_pnl.mean() / pnl_std * np.sqrt(TRADING_DAYS_PER_YEAR)), 3) if pnl_std > 0 else 0.0,
+        'max_drawdown_pct': round(float(drawdown.min()) * 100, 2),
+        'hit_rate': round(float(np.mean(predicted_up == up[min_train:])), 4),
+        'exposure': round(float(np.mean(positions != 0)), 4),
+        'turnover': round(float(trades.sum() / len(trades)), 4),
+        'retrains': retrains,
+        'cache_hits': cache_hits,
+        'fit_time_s': round(fit_time, 3),
+        'predict_latency_ms': round(predict_time / len(oos_returns) * 1000, 4),
+        'elapsed_s': round(time.perf_counter() - started, 3),
+    }
+
+
+# --- 워커 함수 (프로세스 풀에서 실행되므로 모듈 최상위에 정의) ---
+
+def _backtest_worker(ticker: str, years: int, options: Dict[str, Any]) -> Dict[str, Any]:
+    cache = ModelCache()
+    features = load_feature_matrix(ticker, years=years, cache=cache)
+    if features is None:
+        return {'ticker': ticker, 'success': False, 'error': 'No data available'}
+    model_cache = cache if options.get('cache_models', True) else None
+    return backtest_ticker(ticker, features, model_cache=model_cache, **options)
+
+
+class BacktestService:
+    """여러 종목의 walk-forward 백테스트를 프로세스 풀로 동시에 실행하는 서비스"""
+
+    def run(self, tickers: List[str], years: int = 5, progress=None, **options) -> pd.DataFrame:
+        """
+        Args:
+            tickers: 종목 코드 목록
+            years: 백테스트 기간 (년)
+            progress: progress(fraction, message) 콜백 (선택)
+            **options: DEFAULT_BACKTEST_OPTIONS 의 값을 덮어쓸 설정
+
+        Returns:
+            pd.DataFrame: 종목별 성과 지표 (요청 순서)
+        """
+        executor = get_executor()
+        futures = {executor.submit(_backtest_worker, ticker, years, options): ticker for ticker in tickers}
+
+        results = {}
+        for i, future in enumerate(concurrent.futures.as_completed(futures)):
+            ticker = futures[future]
+            try:
+                results[ticker] = future.result()
+            except Exception as e:
+                logger.error(f"[{ticker}] 백테스트 실패: {e}")
+                results[ticker] = {'ticker': ticker, 'success': False, 'error': str(e)}
+            if progress:
+                progress((i + 1) / len(futures), ticker)
+
+        return pd.DataFrame([results[ticker] for ticker in tickers])
+
+
+# Flask API 엔드포인트용 함수
+def run_backtest_endpoint(request_data: Dict[str, Any], progress=None) -> Dict[str, Any]:
+    """
+    Flask 작업(Job) 엔드포인트용 백테스트 함수
+    """
+    tickers = request_data.get('tickers', [])
+    if not tickers:
+        raise ValueError("tickers 가 필요합니다.")
+    years = int(request_data.get('years', 5))
+    options = {key: request_data[key] for key in DEFAULT_BACKTEST_OPTIONS if key in request_data}
+
+    report = BacktestService().run(tickers, years=years, progress=progress, **options)
+    return {
+        'success': True,
+        'options': {**DEFAULT_BACKTEST_OPTIONS, **options, 'years': years},
+        'results': report.replace({np.nan: None}).to_dict(orient='records'),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="예측 모델 walk-forward 백테스트")
+    parser.add_argument("tickers", nargs="+", help="예: 005930 000660 AAPL")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--signal", choices=['direction', 'price'], default='direction')
+    parser.add_argument("--min-train", type=int, default=DEFAULT_BACKTEST_OPTIONS['min_train'])
+    parser.add_argument("--retrain-every", type=int, default=DEFAULT_BACKTEST_OPTIONS['retrain_every'])
+    parser.add_argument("--train-window", type=int, default=None)
+    parser.add_argument("--cost-bps", type=float, default=DEFAULT_BACKTEST_OPTIONS['cost_bps'])
+    parser.add_argument("--allow-short", action="store_true")
+    parser.add_argument("--no-model-cache", action="store_true", help="재학습 모델을 디스크에 캐시하지 않음")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = BacktestService().run(
+        args.tickers, years=args.years, backend=args.backend, signal=args.signal, min_train=args.min_train,
+        retrain_every=args.retrain_every, train_window=args.train_window, cost_bps=args.cost_bps,
+        allow_short=args.allow_short, cache_models=not args.no_model_cache,
+    )
+    print(report.to_string(index=False))
+    succeeded = report[report['success']] if 'success' in report else report
+    if not succeeded.empty:
+        print("\n[전체 평균]")
+        print(succeeded[['total_return_pct', 'buy_and_hold_pct', 'sharpe', 'hit_rate', 'turnover',
+                         'fit_time_s', 'predict_latency_ms']].mean().to_string())
+    print(f"\n총 소요 시간: {time.perf_counter() - started:.1f}s ({len(args.tickers)} 종목)")
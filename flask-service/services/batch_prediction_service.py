@@ -0,0 +1,265 @@
+"""
+배치 예측 서비스
+여러 종목의 데이터 로드/모델 학습/추론을 프로세스 풀에 분산하고,
+완료되는 순서대로 결과를 돌려줍니다. 학습된 모델은 디스크 캐시를 통해 워커 간에 재사용됩니다.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+import multiprocessing
+import concurrent.futures
+from typing import List, Dict, Any, Iterator
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import train_test_split
+
+logger = logging.getLogger(__name__)
+
+# 워커 수 (기본값: CPU 코어 수)
+BATCH_PREDICTION_WORKERS = int(os.getenv('BATCH_PREDICTION_WORKERS', os.cpu_count() or 4))
+# 학습된 모델 디스크 캐시 경로
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', 'model_cache')
+# 모델 캐시 상한: 전체 크기 / 마지막 사용 후 보관 기간 (데이터가 매일 바뀌어 키가 계속 새로 생기므로 정리 필요)
+MODEL_CACHE_MAX_BYTES = int(os.getenv('MODEL_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+MODEL_CACHE_MAX_AGE_DAYS = float(os.getenv('MODEL_CACHE_MAX_AGE_DAYS', 7))
+MODEL_CACHE_SUFFIX = '.joblib'
+# 캐시 폴더 정리 최소 간격 (초, 프로세스별) - 저장할 때마다 폴더 전체를 훑지 않도록
+MODEL_CACHE_PRUNE_INTERVAL_SECONDS = float(os.getenv('MODEL_CACHE_PRUNE_INTERVAL_SECONDS', 600))
+
+_last_prune: Dict[str, float] = {}  # 캐시 폴더 -> 마지막 정리 시각 (time.monotonic)
+_last_prune_lock = threading.Lock()
+
+
+class ModelCache:
+    """
+    학습 데이터 지문(fingerprint)을 키로 학습된 모델을 저장하는 디스크 캐시
+    파일 기반이므로 프로세스 풀의 모든 워커가 같은 캐시를 공유합니다.
+    set() 후 프로세스별로 prune_interval 초에 한 번씩 오래 쓰지 않은 항목(파일 수정 시각 기준, get() 적중 시 갱신)부터
+    정리해 max_age_days / max_bytes 를 넘지 않게 합니다. 같은 폴더의 다른 파일(SQLite 등)은 건드리지 않습니다.
+    """
+
+    def __init__(self, cache_dir: str = MODEL_CACHE_DIR, max_bytes: int = MODEL_CACHE_MAX_BYTES,
+                 max_age_days: float = MODEL_CACHE_MAX_AGE_DAYS,
+                 prune_interval: float = MODEL_CACHE_PRUNE_INTERVAL_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 86400
+        self.prune_interval = prune_interval
+
+    @staticmethod
+    def fingerprint(*arrays) -> str:
+        """학습 데이터 배열들의 해시 (데이터가 바뀌면 키도 바뀜)"""
+        digest = hashlib.sha1()
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            digest.update(str(array.shape).encode())
+            digest.update(array.tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + MODEL_CACHE_SUFFIX)
+
+    def get(self, key: str):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            value = joblib.load(path)
+            os.utime(path)  # 최근 사용 표시 (정리 순서 기준)
+            return value
+        except Exception as e:
+            logger.warning(f"모델 캐시 로드 실패 ({key}): {e}")
+            return None
+
+    def set(self, key: str, value) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            # 다른 워커가 읽는 중일 수 있으므로 임시 파일에 쓴 뒤 교체
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            joblib.dump(value, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"모델 캐시 저장 실패 ({key}): {e}")
+            return
+        if self._prune_due():
+            self.prune()
+
+    def _prune_due(self) -> bool:
+        """이 프로세스에서 마지막 정리 후 prune_interval 이 지났으면 True (첫 저장 때는 바로 정리)"""
+        now = time.monotonic()
+        with _last_prune_lock:
+            last = _last_prune.get(self.cache_dir)
+            if last is not None and now - last < self.prune_interval:
+                return False
+            _last_prune[self.cache_dir] = now
+            return True
+
+    def prune(self) -> int:
+        """보관 기간이 지났거나 크기 상한을 넘는 캐시 파일을 오래된 순으로 삭제, 삭제한 파일 수 반환"""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(MODEL_CACHE_SUFFIX) and entry.is_file():
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue  # 다른 워커가 먼저 삭제
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return 0
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        expire_before = time.time() - self.max_age_seconds
+        removed = 0
+        for mtime, size, path in entries:
+            if mtime >= expire_before and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        if removed:
+            logger.info(f"모델 캐시 정리: {removed}개 삭제 (남은 크기 {total / 1024 ** 2:.1f}MB)")
+        return removed
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> concurrent.futures.ProcessPoolExecutor:
+    """프로세스 전체에서 공유하는 예측용 프로세스 풀을 반환합니다 (최초 호출 시 생성)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            logger.info(f"배치 예측 프로세스 풀 생성 (workers={BATCH_PREDICTION_WORKERS})")
+            # fork 는 TF/torch 와 백그라운드 스레드(작업 큐, 수집 워커 등)가 잡고 있던 잠금을 자식에 복사해
+            # 교착될 수 있으므로 spawn 사용
+            _executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=BATCH_PREDICTION_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+# --- 워커 함수 (프로세스 풀에서 실행되므로 모듈 최상위에 정의) ---
+
+def _analyze_company_worker(symbol: str) -> Dict[str, Any]:
+    """AIAnalysisService 단일 종목 분석 (데이터 로드 + LSTM/RF 예측)"""
+    from services.ai_analysis_service import AIAnalysisService
+    service = AIAnalysisService()
+    return service.analyze_company(symbol, model_cache=ModelCache())
+
+
+def _predict_price_rf_worker(ticker: str, prices: np.ndarray, currency: str) -> Dict[str, Any]:
+    """
+    predict_stock_prices_rf 의 종목별 로직 (다음 거래일 종가 예측)
+    같은 가격 시계열로 학습된 모델이 캐시에 있으면 재학습하지 않습니다.
+    """
+    prices = np.asarray(prices, dtype=float)
+    prices = prices[~np.isnan(prices)]
+    if len(prices) < 3:
+        return None
+
+    X = prices[:-1].reshape(-1, 1)
+    y = prices[1:]
+
+    cache = ModelCache()
+    cache_key = f"portfolio_rf:{ticker}:{cache.fingerprint(X, y)}"
+    rf = cache.get(cache_key)
+    if rf is None:
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        if len(X_train) == 0:
+            return None
+        rf = RandomForestRegressor(n_estimators=100, random_state=42)
+        rf.fit(X_train, y_train)
+        cache.set(cache_key, rf)
+
+    last_price = X[-1].reshape(1, -1)
+    predicted_price = rf.predict(last_price)[0]
+    current_price = last_price[0][0]
+
+    return {
+        "current_price": current_price,
+        "predicted_price": predicted_price,
+        "direction": "상승" if predicted_price > current_price else "하락",
+        "currency": currency
+    }
+
+
+class BatchPredictionService:
+    """N개 종목 예측을 프로세스 풀로 동시에 실행하는 서비스"""
+
+    def iter_company_predictions(self, companies: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        종목별 AI 분석을 병렬로 실행하고, 완료되는 순서대로 결과를 생성합니다.
+
+        Yields:
+            {'index': 요청 순서, 'symbol': 심볼, 'success': bool, 'prediction' 또는 'error'}
+        """
+        executor = get_executor()
+        future_to_item = {}
+        for index, company in enumerate(companies):
+            symbol = company.get('symbol')
+            if not symbol:
+                continue
+            future_to_item[executor.submit(_analyze_company_worker, symbol)] = (index, symbol)
+
+        for future in concurrent.futures.as_completed(future_to_item):
+            index, symbol = future_to_item[future]
+            try:
+                prediction = future.result()
+                if prediction is None:
+                    yield {'index': index, 'symbol': symbol, 'success': False, 'error': 'No data available'}
+                else:
+                    yield {'index': index, 'symbol': symbol, 'success': True, 'prediction': prediction}
+            except Exception as e:
+                logger.error(f"[{symbol}] 배치 예측 실패: {e}")
+                yield {'index': index, 'symbol': symbol, 'success': False, 'error': str(e)}
+
+    def predict_prices(self, stock_data, currency_info: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        포트폴리오 종목별 다음 거래일 가격 예측 (predict_stock_prices_rf 병렬 버전)
+
+        Args:
+            stock_data: 종목별 종가 DataFrame (컬럼 = 티커)
+            currency_info: {티커: 통화}
+
+        Returns:
+            {티커: 예측 결과}
+        """
+        executor = get_executor()
+        futures = {
+            executor.submit(
+                _predict_price_rf_worker, ticker, stock_data[ticker].to_numpy(), currency_info.get(ticker, 'N/A')
+            ): ticker
+            for ticker in stock_data.columns
+        }
+
+        predictions = {}
+        for future in concurrent.futures.as_completed(futures):
+            ticker = futures[future]
+            try:
+                result = future.result()
+                if result is not None:
+                    predictions[ticker] = result
+            except Exception as e:
+                logger.error(f"[{ticker}] 가격 예측 실패: {e}")
+        return predictions
+
+
+# Flask API 엔드포인트용 함수
+def iter_batch_ai_predictions(request_data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Flask 스트리밍 엔드포인트용 배치 AI 분석 함수
+    """
+    companies = request_data.get('companies', [])
+    return BatchPredictionService().iter_company_predictions(companies)
@@ -20,14 +20,16 @@ class ChartPatternService:
             'head_shoulders': 0.25
         }
     
-    def analyze_chart_patterns(self, companies: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_chart_patterns(self, companies: List[Dict[str, Any]], progress=None) -> Dict[str, Any]:
         """
         차트 패턴 분석 메인 함수
+        
+        progress가 주어지면 종목 하나를 끝낼 때마다 progress(완료 비율, 메시지)를 호출합니다.
         """
         try:
             predictions = []
             
-            for company in companies:
+            for i, company in enumerate(companies):
                 symbol = company['symbol']
                 
                 # 주식 데이터 가져오기
@@ -47,6 +49,9 @@ class ChartPatternService:
                         'patterns': patterns,
                         'confidence': combined_prediction['confidence']
                     })
+                
+                if progress:
+                    progress((i + 1) / len(companies), symbol)
             
             return {
                 'success': True,
@@ -476,12 +481,12 @@ class ChartPatternService:
         }
 
 # Flask API 엔드포인트용 함수
-def analyze_chart_patterns_endpoint(request_data: Dict[str, Any]) -> Dict[str, Any]:
+def analyze_chart_patterns_endpoint(request_data: Dict[str, Any], progress=None) -> Dict[str, Any]:
     """
     Flask API 엔드포인트용 차트 패턴 분석 함수
     """
     service = ChartPatternService()
     companies = request_data.get('companies', [])
     
-    return service.analyze_chart_patterns(companies)
+    return service.analyze_chart_patterns(companies, progress=progress)
 
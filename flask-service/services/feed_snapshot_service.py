@@ -0,0 +1,164 @@
+"""
+RSS 피드 스냅샷 서비스
+/api/news/rss 요청마다 외부 피드를 다시 받아 파싱하지 않도록, 백그라운드 스케줄러가 피드별 주기로
+get_news_rss_endpoint(원본 수집 함수)를 실행해 최신 결과(스냅샷)를 메모리에 보관합니다.
+
+- 엔드포인트는 항상 메모리의 스냅샷을 즉시 반환하고, 주기가 지난(stale) 스냅샷이면 백그라운드 갱신만 요청합니다
+  (stale-while-revalidate). 응답에는 snapshot_age_seconds / stale 이 포함됩니다.
+- 서버 시작 직후 아직 스냅샷이 없으면 외부 피드를 기다리지 않고 status='warming' 인 빈 결과를 반환합니다.
+- 갱신이 실패하면 이전 스냅샷을 그대로 유지합니다.
+"""
+
+import os
+import time
+import logging
+import threading
+import concurrent.futures
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from services.news_rss_service import get_news_rss_endpoint, RSS_FEEDS
+
+logger = logging.getLogger(__name__)
+
+FEED_SNAPSHOT_ENABLED = os.getenv('FEED_SNAPSHOT_ENABLED', 'true').lower() == 'true'
+FEED_REFRESH_SECONDS = int(os.getenv('FEED_REFRESH_SECONDS', 300))
+FEED_REFRESH_WORKERS = int(os.getenv('FEED_REFRESH_WORKERS', 3))
+# 스냅샷 없이 갱신이 실패한 피드를 요청 시 다시 시도하는 최소 간격 (초)
+FEED_ERROR_RETRY_SECONDS = 15
+DEFAULT_FEED_KEY = 'hankyung'
+
+# 피드별 갱신 주기 (초). 크롤링 기반 속보 피드는 더 자주, 느린 해외 RSS 는 덜 자주 갱신
+FEED_REFRESH_INTERVALS = {
+    **{key: FEED_REFRESH_SECONDS for key in RSS_FEEDS},
+    'naver': 120,
+    'google': 180,
+    'yahoo': 180,
+    'nasdaq': 600,
+    'marketbeat': 600,
+}
+
+
+class FeedSnapshotStore:
+    """피드 키 -> 최신 파싱 결과 스냅샷 (백그라운드 갱신)"""
+
+    def __init__(self, fetch_fn: Callable[[str], Dict[str, Any]] = get_news_rss_endpoint,
+                 intervals: Optional[Dict[str, int]] = None, max_workers: int = FEED_REFRESH_WORKERS):
+        self.fetch_fn = fetch_fn
+        self.intervals = dict(intervals or FEED_REFRESH_INTERVALS)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='feed-refresh')
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._refreshing = set()
+        self._last_attempt: Dict[str, float] = {}
+        self._last_error: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """스케줄러 스레드 시작 (모든 피드를 즉시 한 번 갱신한 뒤 주기별로 갱신)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='feed-scheduler', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            next_due = now + 60
+            for feed_key, interval in self.intervals.items():
+                due = self._last_attempt.get(feed_key, 0) + interval
+                if due <= now:
+                    self.refresh(feed_key)
+                    due = now + interval
+                next_due = min(next_due, due)
+            self._wakeup.wait(max(1.0, next_due - time.monotonic()))
+            self._wakeup.clear()
+
+    def refresh(self, feed_key: str) -> bool:
+        """백그라운드 갱신 요청 (이미 갱신 중이면 무시). 요청했으면 True."""
+        with self._lock:
+            if feed_key in self._refreshing:
+                return False
+            self._refreshing.add(feed_key)
+            self._last_attempt[feed_key] = time.monotonic()
+        self._executor.submit(self._refresh, feed_key)
+        return True
+
+    def _refresh(self, feed_key: str) -> None:
+        start = time.monotonic()
+        try:
+            result = self.fetch_fn(feed_key)
+            if result.get('success'):
+                with self._lock:
+                    self._snapshots[feed_key] = {'result': result, 'fetched_at': time.time()}
+                    self._last_error.pop(feed_key, None)
+                logger.info(f"피드 스냅샷 갱신: {feed_key} ({len(result.get('articles', []))}개, {time.monotonic() - start:.2f}s)")
+            else:
+                with self._lock:
+                    self._last_error[feed_key] = result.get('error', '피드 수집 실패')
+                logger.warning(f"피드 스냅샷 갱신 실패, 이전 스냅샷 유지: {feed_key} ({result.get('error')})")
+        except Exception as e:
+            with self._lock:
+                self._last_error[feed_key] = str(e)
+            logger.error(f"피드 스냅샷 갱신 중 오류: {feed_key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(feed_key)
+
+    def get(self, feed_key: Optional[str] = None) -> Dict[str, Any]:
+        """최신 스냅샷을 즉시 반환 (오래됐으면 백그라운드 갱신 요청)"""
+        feed_key = feed_key or DEFAULT_FEED_KEY
+        if feed_key not in self.intervals:
+            return {'success': False, 'error': f'Unknown feed key: {feed_key}'}
+
+        with self._lock:
+            snapshot = self._snapshots.get(feed_key)
+            last_error = self._last_error.get(feed_key)
+            refreshing = feed_key in self._refreshing
+
+        if snapshot is None:
+            # 아직 스냅샷 없음: 기다리지 않고 갱신만 요청
+            if not refreshing and last_error is None:
+                refreshing = self.refresh(feed_key)
+            if last_error and not refreshing:
+                if time.monotonic() - self._last_attempt.get(feed_key, 0) > FEED_ERROR_RETRY_SECONDS:
+                    self.refresh(feed_key)  # 다음 요청을 위해 재시도
+                return {'success': False, 'articles': [], 'feed': feed_key, 'status': 'error', 'error': last_error}
+            return {'success': True, 'articles': [], 'feed': feed_key, 'status': 'warming',
+                    'snapshot_age_seconds': None, 'stale': True}
+
+        age = time.time() - snapshot['fetched_at']
+        stale = age > self.intervals[feed_key]
+        if stale and not refreshing:
+            self.refresh(feed_key)
+        return {
+            **snapshot['result'],
+            'status': 'stale' if stale else 'fresh',
+            'snapshot_age_seconds': round(age, 1),
+            'fetched_at': datetime.fromtimestamp(snapshot['fetched_at'], timezone.utc).isoformat(),
+            'stale': stale,
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_feed_snapshot_store() -> FeedSnapshotStore:
+    """프로세스 전체에서 공유하는 피드 스냅샷 저장소를 반환합니다."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FeedSnapshotStore()
+        return _store
+
+
+def get_feed_snapshot_endpoint(feed_key: Optional[str] = None) -> Dict[str, Any]:
+    """/api/news/rss: 스냅샷 사용 시 메모리 스냅샷, 비활성화 시 기존처럼 직접 수집"""
+    if not FEED_SNAPSHOT_ENABLED:
+        return get_news_rss_endpoint(feed_key)
+    store = get_feed_snapshot_store()
+    store.start()
+    return store.get(feed_key)
@@ -0,0 +1,318 @@
+"""
+하이퍼파라미터 탐색 서비스 (오프라인)
+종목별로 방향 예측 모델의 하이퍼파라미터를 successive halving 방식으로 탐색하고,
+최적 파라미터를 model_registry 에 저장합니다. predict_stock 은 요청 시점에 레지스트리를 조회만 합니다.
+
+- 데이터: backtest_service 의 캐시된 피처 행렬
+- 평가: TimeSeriesSplit walk-forward 폴드별 정확도
+- 자원(resource): 폴드별 학습에 사용하는 최근 거래일 수 (단계마다 factor 배씩 증가)
+- 각 (데이터 지문, 파라미터, 폴드, 자원) 점수는 SQLite 에 저장되어, 재실행 시 새 후보만 평가합니다.
+
+사용 예:
+    python -m services.hyperparameter_search_service 005930 000660 --backend rf --candidates 30
+"""
+
+import os
+import json
+import math
+import time
+import sqlite3
+import logging
+import argparse
+import concurrent.futures
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import ParameterSampler, TimeSeriesSplit
+from sklearn.metrics import accuracy_score
+
+from model_backends import DIRECTION_MODEL_BACKENDS, DEFAULT_DIRECTION_BACKEND, create_direction_model
+from model_registry import save_model_entry
+from services.batch_prediction_service import MODEL_CACHE_DIR, ModelCache, get_executor
+from services.backtest_service import load_feature_matrix
+
+logger = logging.getLogger(__name__)
+
+# 폴드 점수 메모 (SQLite) 경로
+HPARAM_MEMO_PATH = os.getenv('HPARAM_MEMO_PATH', os.path.join(MODEL_CACHE_DIR, 'hparam_memo.sqlite'))
+
+# 백엔드별 탐색 공간 (model_backends 기본값을 덮어쓸 값)
+SEARCH_SPACES = {
+    'rf': {
+        'n_estimators': [50, 100, 200, 300],
+        'max_depth': [3, 5, 8, 10, 15, None],
+        'min_samples_leaf': [1, 3, 5, 10, 20, 40],
+        'max_features': ['sqrt', 'log2', 0.5, 1.0],
+    },
+    'hgb': {
+        'max_iter': [100, 200, 400],
+        'learning_rate': [0.01, 0.03, 0.05, 0.1],
+        'max_leaf_nodes': [7, 15, 31],
+        'min_samples_leaf': [10, 20, 50, 100],
+        'l2_regularization': [0.0, 0.1, 1.0, 10.0],
+    },
+    'logistic': {
+        'C': [0.001, 0.01, 0.1, 1.0, 10.0, 100.0],
+    },
+}
+
+DEFAULT_SEARCH_OPTIONS = {
+    'n_candidates': 30,    # 첫 단계 후보 수 (기본값 파라미터 포함)
+    'factor': 3,           # 단계마다 남길 후보 비율(1/factor) 및 자원 증가 배수
+    'min_resource': 120,   # 첫 단계 학습 거래일 수
+    'n_splits': 5,         # walk-forward 폴드 수
+    'top_n': 3,            # 피처 중요도 상위 N개만 사용 (predict_stock 과 동일, 0이면 전체)
+    'random_state': 42,
+}
+
+
+class ScoreMemo:
+    """(종목, 데이터 지문, 백엔드, 파라미터, 폴드, 자원) -> 점수 SQLite 저장소"""
+
+    def __init__(self, path: str = HPARAM_MEMO_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 여러 워커 프로세스가 동시에 쓰므로 WAL 모드 + 잠금 대기
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS fold_scores (
+                ticker TEXT NOT NULL,
+                data_fp TEXT NOT NULL,
+                backend TEXT NOT NULL,
+                params TEXT NOT NULL,
+                fold INTEGER NOT NULL,
+                resource INTEGER NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (ticker, data_fp, backend, params, fold, resource)
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, ticker: str, data_fp: str, backend: str, params: str, resource: int) -> Dict[int, float]:
+        """해당 후보/자원의 저장된 폴드별 점수 {fold: score}"""
+        rows = self.conn.execute(
+            "SELECT fold, score FROM fold_scores "
+            "WHERE ticker = ? AND data_fp = ? AND backend = ? AND params = ? AND resource = ?",
+            (ticker, data_fp, backend, params, resource)
+        ).fetchall()
+        return dict(rows)
+
+    def put_many(self, rows: List[tuple]) -> None:
+        """rows: (ticker, data_fp, backend, params, fold, resource, score) 목록"""
+        if not rows:
+            return
+        self.conn.executemany("INSERT OR REPLACE INTO fold_scores VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def _to_builtin(value):
+    """numpy 스칼라를 JSON 저장 가능한 파이썬 값으로 변환"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _params_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+def _build_model(backend: str, params: Dict[str, Any]):
+    model = create_direction_model(backend, **params)
+    # 프로세스 풀 워커 안에서 실행되므로 모델 내부 병렬화는 끔
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=1)
+    return model
+
+
+def prepare_search_data(ticker: str, years: int = 5, top_n: int = 3):
+    """
+    탐색용 (X, y, 피처 이름) 준비
+    y는 다음 거래일 상승 여부이며, 다음 날이 없는 마지막 행은 제외합니다.
+    """
+    features = load_feature_matrix(ticker, years=years)
+    if features is None or len(features) < 2:
+        return None, None, None
+
+    close = features['Close'].to_numpy(dtype=float)
+    X_df = features.iloc[:-1]
+    y = (close[1:] > close[:-1]).astype(int)
+
+    if top_n:
+        # predict_stock/prediction_service 와 같은 함수로 피처를 골라야 레지스트리 항목의 피처 목록이 일치함
+        from services.prediction_service import analyze_feature_importance
+        selected = analyze_feature_importance(ticker.split('.')[0], top_n=top_n)
+        if not selected or any(feature not in X_df.columns for feature in selected):
+            logger.warning(f"[{ticker}] 피처 중요도 분석 실패 또는 피처 불일치: {selected}")
+            return None, None, None
+        X_df = X_df[selected]
+
+    return X_df.to_numpy(dtype=float), y, list(X_df.columns)
+
+
+def successive_halving(ticker: str, X: np.ndarray, y: np.ndarray, backend: str, memo: ScoreMemo = None,
+                       **options) -> Dict[str, Any]:
+    """
+    successive halving 하이퍼파라미터 탐색
+
+    Args:
+        ticker: 종목 코드 (메모 키)
+        X, y: 피처 행렬 / 0-1 타겟
+        backend: model_backends 의 백엔드 이름
+        memo: 폴드 점수 메모 (없으면 매번 평가)
+        **options: DEFAULT_SEARCH_OPTIONS 의 값을 덮어쓸 설정
+
+    Returns:
+        {'params', 'score', 'evaluated', 'memo_hits', 'rungs'}
+    """
+    options = {**DEFAULT_SEARCH_OPTIONS, **options}
+    factor = options['factor']
+    data_fp = ModelCache.fingerprint(X, y)
+    folds = list(TimeSeriesSplit(n_splits=options['n_splits']).split(X))
+    max_resource = max(len(train_index) for train_index, _ in folds)
+
+    # 기본값({})을 항상 후보에 포함하여 기존 설정보다 나쁜 결과가 선택되지 않도록 함
+    sampled = ParameterSampler(SEARCH_SPACES[backend], n_iter=max(options['n_candidates'] - 1, 1),
+                               random_state=options['random_state'])
+    candidates = [{}]
+    for params in sampled:
+        params = {key: _to_builtin(value) for key, value in params.items()}
+        if params not in candidates:
+            candidates.append(params)
+
+    resource = min(options['min_resource'], max_resource)
+    evaluated = memo_hits = 0
+    rungs = []
+    while True:
+        scores = []
+        new_rows = []
+        for params in candidates:
+            params_key = _params_key(params)
+            cached = memo.get(ticker, data_fp, backend, params_key, resource) if memo else {}
+            fold_scores = []
+            for fold, (train_index, test_index) in enumerate(folds):
+                if fold in cached:
+                    fold_scores.append(cached[fold])
+                    memo_hits += 1
+                    continue
+                # 자원 = 학습 구간의 최근 resource 거래일
+                train_index = train_index[-resource:]
+                model = _build_model(backend, params)
+                model.fit(X[train_index], y[train_index])
+                score = float(accuracy_score(y[test_index], model.predict(X[test_index])))
+                fold_scores.append(score)
+                new_rows.append((ticker, data_fp, backend, params_key, fold, resource, score))
+                evaluated += 1
+            scores.append(float(np.mean(fold_scores)))
+        if memo:
+            memo.put_many(new_rows)
+
+        order = np.argsort(scores)[::-1]
+        rungs.append({'resource': resource, 'candidates': len(candidates), 'best_score': round(scores[order[0]], 4)})
+
+        if len(candidates) == 1 or resource >= max_resource:
+            best = order[0]
+            return {
+                'params': candidates[best],
+                'score': scores[best],
+                'evaluated': evaluated,
+                'memo_hits': memo_hits,
+                'rungs': rungs,
+            }
+        candidates = [candidates[i] for i in order[:max(1, math.ceil(len(candidates) / factor))]]
+        resource = min(resource * factor, max_resource)
+
+
+# --- 워커 함수 (프로세스 풀에서 실행되므로 모듈 최상위에 정의) ---
+
+def _search_ticker_worker(ticker: str, years: int, backend: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    X, y, feature_names = prepare_search_data(ticker, years=years, top_n=options.get('top_n', 3))
+    if X is None or len(X) <= options.get('n_splits', 5) + 1:
+        return {'ticker': ticker, 'success': False, 'error': 'No data available'}
+
+    memo = ScoreMemo()
+    try:
+        result = successive_halving(ticker, X, y, backend, memo=memo, **options)
+    finally:
+        memo.close()
+    return {
+        'ticker': ticker,
+        'success': True,
+        'backend': backend,
+        'features': feature_names,
+        'elapsed_s': round(time.perf_counter() - started, 2),
+        **result,
+    }
+
+
+class HyperparameterSearchService:
+    """여러 종목의 하이퍼파라미터 탐색을 프로세스 풀로 실행하고 결과를 레지스트리에 저장하는 서비스"""
+
+    def run(self, tickers: List[str], backend: Optional[str] = None, years: int = 1, save: bool = True,
+            **options) -> pd.DataFrame:
+        """
+        Args:
+            tickers: 종목 코드 목록
+            backend: 탐색할 백엔드 (None이면 DIRECTION_MODEL_BACKEND)
+            years: 데이터 기간 (년). 레지스트리 값은 예측 시 같은 기간/피처로 학습할 때만 적용되므로
+                   predict_stock 의 기본값(1년)에 맞춤
+            save: 최적 파라미터를 model_registry 에 저장할지 여부
+            **options: DEFAULT_SEARCH_OPTIONS 의 값을 덮어쓸 설정
+
+        Returns:
+            pd.DataFrame: 종목별 탐색 결과
+        """
+        backend = backend or DEFAULT_DIRECTION_BACKEND
+        if backend not in DIRECTION_MODEL_BACKENDS:
+            raise ValueError(f"지원하지 않는 모델 타입: {backend}")
+        options = {**DEFAULT_SEARCH_OPTIONS, **options}
+
+        executor = get_executor()
+        futures = {executor.submit(_search_ticker_worker, ticker, years, backend, options): ticker for ticker in tickers}
+
+        results = {}
+        for future in concurrent.futures.as_completed(futures):
+            ticker = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"[{ticker}] 하이퍼파라미터 탐색 실패: {e}")
+                result = {'ticker': ticker, 'success': False, 'error': str(e)}
+            results[ticker] = result
+
+            # 레지스트리 파일은 이 프로세스에서만 기록 (워커 간 동시 쓰기 방지)
+            if save and result.get('success'):
+                save_model_entry(
+                    ticker, backend, result['params'], round(result['score'], 4), features=result['features'],
+                    extra={'search': {key: options[key] for key in ('n_candidates', 'factor', 'n_splits', 'top_n')},
+                           'years': years},
+                )
+                logger.info(f"[{ticker}] {backend} 최적 파라미터 저장: {result['params']} (정확도 {result['score']:.4f})")
+
+        return pd.DataFrame([results[ticker] for ticker in tickers])
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="종목별 방향 예측 모델 하이퍼파라미터 탐색 (successive halving)")
+    parser.add_argument("tickers", nargs="+", help="예: 005930 000660 AAPL")
+    parser.add_argument("--backend", default=None, choices=list(DIRECTION_MODEL_BACKENDS))
+    parser.add_argument("--years", type=int, default=1, help="predict_stock 의 기본 학습 기간과 같아야 튜닝 값이 적용됨")
+    parser.add_argument("--candidates", type=int, default=DEFAULT_SEARCH_OPTIONS['n_candidates'])
+    parser.add_argument("--factor", type=int, default=DEFAULT_SEARCH_OPTIONS['factor'])
+    parser.add_argument("--min-resource", type=int, default=DEFAULT_SEARCH_OPTIONS['min_resource'])
+    parser.add_argument("--top-n", type=int, default=DEFAULT_SEARCH_OPTIONS['top_n'], help="0이면 전체 피처 사용")
+    parser.add_argument("--dry-run", action="store_true", help="레지스트리에 저장하지 않음")
+    args = parser.parse_args()
+
+    report = HyperparameterSearchService().run(
+        args.tickers, backend=args.backend, years=args.years, save=not args.dry_run,
+        n_candidates=args.candidates, factor=args.factor, min_resource=args.min_resource, top_n=args.top_n,
+    )
+    columns = [col for col in ('ticker', 'success', 'score', 'params', 'evaluated', 'memo_hits', 'elapsed_s', 'error')
+               if col in report.columns]
+    print(report[columns].to_string(index=False))
@@ -0,0 +1,174 @@
+"""
+비동기 작업(Job) 서비스
+오래 걸리는 분석(포트폴리오 최적화, AI 분석, 차트 패턴 분석)을 요청 스레드 밖의
+제한된 워커 풀에서 실행하고, 작업 ID로 진행 상황/결과를 조회할 수 있게 합니다.
+동일한 입력(해시)의 작업은 실행 중이면 같은 작업을, 완료되었으면 캐시된 결과를 즉시 돌려줍니다.
+"""
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import logging
+import threading
+import concurrent.futures
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+# 완료된 결과를 입력 해시로 재사용하는 시간 (초)
+JOB_RESULT_TTL_SECONDS = int(os.getenv('JOB_RESULT_TTL_SECONDS', 3600))
+# 메모리에 보관할 최대 작업 수 (초과 시 오래된 완료 작업부터 제거)
+JOB_MAX_RETAINED = int(os.getenv('JOB_MAX_RETAINED', 500))
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_SUCCEEDED = 'succeeded'
+STATUS_FAILED = 'failed'
+FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED)
+
+
+def compute_input_hash(kind: str, payload: Any) -> str:
+    """작업 종류 + 입력(JSON 정규화)의 해시"""
+    normalized = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{kind}:{normalized}".encode('utf-8')).hexdigest()
+
+
+class JobManager:
+    """
+    인프로세스 작업 큐
+
+    작업 함수는 fn(payload, progress) 형태이며, progress(fraction, message=None)로 진행률(0~1)을 보고합니다.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, result_ttl: int = JOB_RESULT_TTL_SECONDS,
+                 max_retained: int = JOB_MAX_RETAINED):
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._handlers: Dict[str, Callable] = {}
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._jobs_by_hash: Dict[str, str] = {}
+        self._condition = threading.Condition()
+        self.result_ttl = result_ttl
+        self.max_retained = max_retained
+
+    def register(self, kind: str, fn: Callable) -> None:
+        """작업 종류와 실행 함수를 등록합니다."""
+        self._handlers[kind] = fn
+
+    def submit(self, kind: str, payload: Any) -> Dict[str, Any]:
+        """
+        작업을 제출합니다.
+
+        Returns:
+            작업 상태 스냅샷 (cached=True 이면 동일 입력의 기존 작업을 재사용한 것)
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job type: {kind}")
+
+        input_hash = compute_input_hash(kind, payload)
+        with self._condition:
+            existing_id = self._jobs_by_hash.get(input_hash)
+            existing = self._jobs.get(existing_id) if existing_id else None
+            if existing and self._is_reusable(existing):
+                return {**self._snapshot(existing), 'cached': True}
+
+            job = {
+                'job_id': uuid.uuid4().hex,
+                'kind': kind,
+                'status': STATUS_QUEUED,
+                'progress': 0.0,
+                'message': None,
+                'result': None,
+                'error': None,
+                'input_hash': input_hash,
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'version': 0,
+            }
+            self._jobs[job['job_id']] = job
+            self._jobs_by_hash[input_hash] = job['job_id']
+            self._prune()
+
+        self._executor.submit(self._run, job['job_id'], payload)
+        return {**self._snapshot(job), 'cached': False}
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 상태 스냅샷 (없으면 None)"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def wait_for_update(self, job_id: str, last_version: int, timeout: float = 15.0) -> Optional[Dict[str, Any]]:
+        """
+        작업 상태가 last_version 이후로 바뀔 때까지 최대 timeout 초 대기한 뒤 스냅샷을 반환합니다.
+        (구독/SSE 용)
+        """
+        deadline = time.time() + timeout
+        with self._condition:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None
+                remaining = deadline - time.time()
+                if job['version'] > last_version or job['status'] in FINISHED_STATUSES or remaining <= 0:
+                    return self._snapshot(job)
+                self._condition.wait(remaining)
+
+    # --- 내부 함수 ---
+
+    def _run(self, job_id: str, payload: Any) -> None:
+        self._update(job_id, status=STATUS_RUNNING, started_at=time.time())
+        handler = self._handlers[self._jobs[job_id]['kind']]
+
+        def progress(fraction: float, message: str = None) -> None:
+            self._update(job_id, progress=max(0.0, min(float(fraction), 1.0)), message=message)
+
+        try:
+            result = handler(payload, progress)
+            if isinstance(result, dict) and result.get('success') is False:
+                # 핸들러가 오류를 직접 처리해 반환한 결과(대체/모의 데이터)는 실패로 기록해 재사용하지 않음
+                self._update(job_id, status=STATUS_FAILED, result=result,
+                             error=result.get('error') or '작업 실패', finished_at=time.time())
+            else:
+                self._update(job_id, status=STATUS_SUCCEEDED, progress=1.0, result=result, finished_at=time.time())
+        except Exception as e:
+            logger.error(f"작업 실패 ({job_id}): {e}")
+            self._update(job_id, status=STATUS_FAILED, error=str(e), finished_at=time.time())
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job['version'] += 1
+            self._condition.notify_all()
+
+    def _is_reusable(self, job: Dict[str, Any]) -> bool:
+        if job['status'] == STATUS_FAILED:
+            return False
+        if job['status'] == STATUS_SUCCEEDED:
+            return time.time() - job['finished_at'] <= self.result_ttl
+        return True  # 대기/실행 중인 동일 작업은 그대로 공유
+
+    def _prune(self) -> None:
+        if len(self._jobs) <= self.max_retained:
+            return
+        finished = sorted(
+            (job for job in self._jobs.values() if job['status'] in FINISHED_STATUSES),
+            key=lambda job: job['finished_at']
+        )
+        for job in finished[:len(self._jobs) - self.max_retained]:
+            del self._jobs[job['job_id']]
+            if self._jobs_by_hash.get(job['input_hash']) == job['job_id']:
+                del self._jobs_by_hash[job['input_hash']]
+
+    @staticmethod
+    def _snapshot(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in job.items() if key != 'input_hash'}
+
+
+job_manager = JobManager()
@@ -0,0 +1,203 @@
+"""
+뉴스 링크 중복 확인 (출처별 Bloom 필터)
+manage_news_crawling 이 크롤링 주기마다 출처의 모든 링크를 DB 에서 읽어 set 으로 만들던 것을 대신합니다.
+
+- 출처별로 저장된 링크 해시(news_articles.link_hash = SHA1(link))를 Bloom 필터에 담아 SQLite 에 저장하고,
+  다음 주기에는 마지막으로 반영한 id 이후의 기사만 읽어 필터를 갱신합니다 (O(새 기사)).
+- 필터에 없으면 확실히 새 기사이고, 필터에 있으면(아마도 있음) link_hash 인덱스로 DB 에서 한 번 더 확인합니다.
+- 저장된 기사 수가 필터 용량을 넘으면 용량을 두 배로 늘려 DB 에서 다시 만듭니다.
+
+사용 예:
+    deduper = get_link_deduper('naver')
+    deduper.sync()
+    new_articles = deduper.filter_new(crawled_articles)
+"""
+
+import os
+import math
+import sqlite3
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from services.batch_prediction_service import MODEL_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+LINK_DEDUP_STATE_PATH = os.getenv('LINK_DEDUP_STATE_PATH', os.path.join(MODEL_CACHE_DIR, 'link_dedup.sqlite'))
+# 출처별 초기 필터 용량(기사 수) / 목표 오탐률
+LINK_BLOOM_CAPACITY = int(os.getenv('LINK_BLOOM_CAPACITY', 200000))
+LINK_BLOOM_ERROR_RATE = float(os.getenv('LINK_BLOOM_ERROR_RATE', 0.01))
+LINK_SYNC_PAGE_SIZE = 10000
+
+
+class BloomFilter:
+    """SHA1 링크 해시용 Bloom 필터 (해시 앞 16바이트로 이중 해싱)"""
+
+    def __init__(self, capacity: int, error_rate: float, bits: Optional[bytes] = None, count: int = 0):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, digest: bytes):
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:16], 'big') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, digest: bytes) -> bool:
+        """해시 추가, 새로 추가된 항목이면 True (이미 있던 항목은 count 에 세지 않음)"""
+        added = False
+        for position in self._positions(digest):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+
+class LinkDeduper:
+    """
+    한 출처의 링크 중복 확인기
+
+    fetch_fn(source, after_id, limit) 는 [(id, link_hash), ...] 를 id 순으로,
+    exists_fn(hashes) 는 그중 DB 에 있는 해시 set 을 반환해야 합니다.
+    """
+
+    def __init__(self, source: str, path: str = LINK_DEDUP_STATE_PATH, fetch_fn: Optional[Callable] = None,
+                 exists_fn: Optional[Callable] = None, capacity: int = LINK_BLOOM_CAPACITY,
+                 error_rate: float = LINK_BLOOM_ERROR_RATE, page_size: int = LINK_SYNC_PAGE_SIZE):
+        self.source = source
+        self.page_size = page_size
+        self._fetch_fn = fetch_fn
+        self._exists_fn = exists_fn
+        self._lock = threading.RLock()
+        self.stats = {'checked': 0, 'probable': 0, 'confirmed': 0, 'false_positive': 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS link_bloom (
+                source TEXT PRIMARY KEY,
+                capacity INTEGER NOT NULL,
+                error_rate REAL NOT NULL,
+                item_count INTEGER NOT NULL,
+                last_id INTEGER NOT NULL,
+                bits BLOB NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+        row = self.conn.execute("SELECT capacity, error_rate, item_count, last_id, bits FROM link_bloom WHERE source = ?",
+                                (source,)).fetchone()
+        if row and row[1] == error_rate:
+            self.bloom = BloomFilter(row[0], row[1], bits=row[4], count=row[2])
+            self.last_id = row[3]
+        else:
+            self.bloom = BloomFilter(max(capacity, row[0] if row else 0), error_rate)
+            self.last_id = 0
+        self._dirty = False
+
+    def _fetch(self, after_id: int) -> List:
+        if self._fetch_fn is None:
+            from db_utils import get_link_hashes_since
+            self._fetch_fn = get_link_hashes_since
+        return self._fetch_fn(self.source, after_id, self.page_size)
+
+    def _exists(self, hashes: List[bytes]) -> set:
+        if self._exists_fn is None:
+            from db_utils import find_existing_link_hashes
+            self._exists_fn = find_existing_link_hashes
+        return self._exists_fn(hashes)
+
+    @staticmethod
+    def _hash(link: str) -> bytes:
+        from db_utils import link_hash
+        return link_hash(link)
+
+    def sync(self) -> int:
+        """마지막으로 반영한 id 이후 저장된 기사를 필터에 반영 (최초 1회는 전체), 반영한 기사 수 반환"""
+        with self._lock:
+            added = 0
+            while True:
+                rows = self._fetch(self.last_id)
+                for row_id, digest in rows:
+                    self.bloom.add(digest)
+                    self.last_id = row_id
+                added += len(rows)
+                if len(rows) < self.page_size:
+                    break
+
+            if self.bloom.count > self.bloom.capacity:
+                logger.info(f"[{self.source}] 링크 필터 용량 초과 ({self.bloom.count}/{self.bloom.capacity}), 두 배로 재생성")
+                self.bloom = BloomFilter(self.bloom.capacity * 2, self.bloom.error_rate)
+                self.last_id = 0
+                return self.sync()
+
+            if added:
+                self._dirty = True
+                self.save()
+            return added
+
+    def is_known(self, link: str) -> bool:
+        """이미 저장된 링크인지 (필터에 있으면 DB 로 확인)"""
+        return not self.filter_new([{'link': link}])
+
+    def filter_new(self, articles: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """DB 에 없는 기사만 반환합니다. 필터 적중(아마도 있음) 항목만 link_hash 로 한 번에 조회합니다."""
+        articles = [article for article in articles if article.get('link')]
+        hashes = [self._hash(article['link']) for article in articles]
+        with self._lock:
+            probable = [digest for digest in hashes if digest in self.bloom]
+        existing = self._exists(probable) if probable else set()
+
+        self.stats['checked'] += len(hashes)
+        self.stats['probable'] += len(probable)
+        self.stats['confirmed'] += len(existing)
+        self.stats['false_positive'] += len(set(probable) - existing)
+        return [article for article, digest in zip(articles, hashes) if digest not in existing]
+
+    def add(self, links: Iterable[str]) -> None:
+        """새로 저장한 링크를 필터에 바로 반영 (id 워터마크는 다음 sync 때 따라옴)"""
+        with self._lock:
+            for link in links:
+                if link and self.bloom.add(self._hash(link)):
+                    self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO link_bloom VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.source, self.bloom.capacity, self.bloom.error_rate, self.bloom.count,
+                     self.last_id, bytes(self.bloom.bits))
+                )
+                self.conn.commit()
+                self._dirty = False
+            except sqlite3.Error as e:
+                logger.warning(f"[{self.source}] 링크 필터 저장 실패: {e}")
+
+
+_dedupers: Dict[str, LinkDeduper] = {}
+_dedupers_lock = threading.Lock()
+
+
+def get_link_deduper(source: str) -> LinkDeduper:
+    """프로세스 전체에서 공유하는 출처별 링크 중복 확인기를 반환합니다."""
+    with _dedupers_lock:
+        deduper = _dedupers.get(source)
+        if deduper is None:
+            deduper = _dedupers[source] = LinkDeduper(source)
+        return deduper
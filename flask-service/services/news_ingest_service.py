@@ -0,0 +1,241 @@
+"""
+뉴스 수집 단계 감성 분석 파이프라인
+크롤러가 새 기사를 저장하면 백그라운드 소비자 스레드가 기사를 모아(배치) 감성 모델로 분석하고,
+실제 레이블/신뢰도와 관련 종목 티커를 news_articles 에 기록합니다.
+sentiment_score 를 사용하는 모델은 조회 시점에 분석할 필요 없이 미리 계산된 레이블을 읽을 수 있습니다.
+
+- 분석은 backend_logic.score_headlines (캐시 -> 번역/로컬 한국어 모델 -> FinBERT) 를 그대로 사용합니다.
+- 번역 실패/모델 fallback 항목은 기록하지 않고 NULL 로 남겨, 다음 백필(backfill_unscored) 때 다시 분석합니다.
+- 큐가 NEWS_INGEST_BACKFILL_INTERVAL_SECONDS 동안 비어 있으면 워커가 직접 백필을 실행하고,
+  남은 미분석 기사가 있으면(페이지가 가득 찼으면) 곧바로 다음 페이지를 이어서 처리합니다.
+"""
+
+import os
+import re
+import time
+import queue
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+NEWS_INGEST_BATCH_SIZE = int(os.getenv('NEWS_INGEST_BATCH_SIZE', 64))
+# 배치가 다 차지 않아도 첫 기사 도착 후 이 시간이 지나면 분석 (초)
+NEWS_INGEST_MAX_WAIT_SECONDS = float(os.getenv('NEWS_INGEST_MAX_WAIT_SECONDS', 2.0))
+NEWS_INGEST_QUEUE_SIZE = int(os.getenv('NEWS_INGEST_QUEUE_SIZE', 5000))
+NEWS_INGEST_ENABLED = os.getenv('NEWS_INGEST_ENABLED', 'true').lower() == 'true'
+# 큐가 이 시간 동안 비어 있으면 미분석 기사 백필 실행 (초, 0 이면 주기 백필 안 함)
+NEWS_INGEST_BACKFILL_INTERVAL_SECONDS = float(os.getenv('NEWS_INGEST_BACKFILL_INTERVAL_SECONDS', 300))
+NEWS_INGEST_BACKFILL_PAGE_SIZE = 500
+
+SENTIMENT_LABELS = ('negative', 'neutral', 'positive')
+
+
+class TickerTagger:
+    """헤드라인에 처음 등장하는 종목명을 찾아 티커를 반환 (stock_map.json 기반)"""
+
+    # 짧은 영문 종목명(CJ, 3S 등)은 일반 단어와 겹치므로 제외
+    MIN_ASCII_NAME_LENGTH = 3
+
+    def __init__(self, name_to_ticker: Dict[str, str]):
+        names = [name for name in name_to_ticker
+                 if len(name) >= 2 and not (name.isascii() and len(name) < self.MIN_ASCII_NAME_LENGTH)]
+        self.name_to_ticker = {name: name_to_ticker[name] for name in names}
+        # 긴 이름을 먼저 시도해야 '삼성전자우'/'삼성전자' 등이 올바르게 구분됨
+        names.sort(key=len, reverse=True)
+        self.pattern = re.compile('|'.join(map(re.escape, names))) if names else None
+
+    def tag(self, headline: str) -> Optional[str]:
+        if not self.pattern or not headline:
+            return None
+        match = self.pattern.search(headline)
+        return self.name_to_ticker[match.group(0)] if match else None
+
+
+def _default_score_fn(headlines: List[str]):
+    """backend_logic 의 감성 분석 경로 사용 -> (레이블 목록, 신뢰도 목록, 실패 여부 목록)"""
+    from backend_logic import score_headlines
+    gamma, confidence, _, failed, _ = score_headlines(headlines, "뉴스 수집")
+    return [SENTIMENT_LABELS[g + 1] for g in gamma], confidence.tolist(), failed.tolist()
+
+
+def _default_tagger() -> TickerTagger:
+    try:
+        from app_helpers import get_stock_mapping
+        return TickerTagger(get_stock_mapping())
+    except Exception as e:
+        logger.warning(f"종목 맵 로드 실패, 티커 태깅 없이 진행합니다: {e}")
+        return TickerTagger({})
+
+
+class NewsIngestWorker:
+    """
+    저장된 기사를 큐로 받아 배치 단위로 감성 분석하는 백그라운드 소비자
+
+    score_fn(headlines) 는 (레이블 목록, 신뢰도 목록, 실패 여부 목록) 을 반환해야 합니다.
+    """
+
+    def __init__(self, score_fn: Optional[Callable] = None, update_fn: Optional[Callable] = None,
+                 tagger: Optional[TickerTagger] = None, batch_size: int = NEWS_INGEST_BATCH_SIZE,
+                 max_wait: float = NEWS_INGEST_MAX_WAIT_SECONDS, max_queue: int = NEWS_INGEST_QUEUE_SIZE,
+                 backfill_interval: float = NEWS_INGEST_BACKFILL_INTERVAL_SECONDS):
+        self.score_fn = score_fn or _default_score_fn
+        self._update_fn = update_fn
+        self._tagger = tagger
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait
+        self.backfill_interval = backfill_interval
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._backfill_after_id = 0  # 백필 키셋 커서 (마지막으로 큐에 넣은 미분석 기사 id)
+        self.stats = {'queued': 0, 'dropped': 0, 'scored': 0, 'failed': 0, 'tagged': 0, 'batches': 0}
+
+    @property
+    def tagger(self) -> TickerTagger:
+        # 종목 맵 로딩은 첫 배치에서 한 번만
+        if self._tagger is None:
+            self._tagger = _default_tagger()
+        return self._tagger
+
+    def _update(self, rows: List[Dict[str, Any]]) -> int:
+        if self._update_fn is None:
+            from db_utils import update_article_sentiments
+            self._update_fn = update_article_sentiments
+        return self._update_fn(rows)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='news-ingest', daemon=True)
+                self._thread.start()
+
+    def submit(self, articles: List[Dict[str, Any]]) -> int:
+        """분석할 기사(headline, link 필수)를 큐에 넣습니다. 큐가 가득 차면 버리고 백필에 맡깁니다."""
+        self.start()
+        accepted = 0
+        for article in articles:
+            if not article.get('link') or not article.get('headline'):
+                continue
+            try:
+                self._queue.put_nowait({'headline': article['headline'], 'link': article['link'],
+                                        'related_ticker': article.get('related_ticker')})
+                accepted += 1
+            except queue.Full:
+                self.stats['dropped'] += len(articles) - accepted
+                logger.warning("뉴스 분석 큐가 가득 찼습니다. 나머지 기사는 백필 때 분석합니다.")
+                break
+        self.stats['queued'] += accepted
+        return accepted
+
+    def _idle_timeout(self) -> Optional[float]:
+        """빈 큐에서 기다릴 시간: 이어서 읽을 백필 페이지가 있으면 바로, 없으면 백필 주기 (주기 백필 안 하면 무한 대기)"""
+        if self.backfill_interval <= 0:
+            return None
+        return self.max_wait if self._backfill_after_id else self.backfill_interval
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        """다음 배치, 대기 시간 안에 기사가 오지 않으면 빈 목록"""
+        try:
+            batch = [self._queue.get(timeout=self._idle_timeout())]  # 첫 기사가 올 때까지 대기
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                try:
+                    self.backfill_unscored()
+                except Exception as e:
+                    logger.error(f"미분석 기사 백필 실패: {e}", exc_info=True)
+                continue
+            try:
+                self.process_batch(batch)
+            except Exception as e:
+                logger.error(f"뉴스 감성 분석 배치 실패 ({len(batch)}개): {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def process_batch(self, batch: List[Dict[str, Any]]) -> int:
+        """기사 배치 분석 후 DB 기록, 기록한 기사 수 반환"""
+        batch = list({item['link']: item for item in batch}.values())  # 같은 링크 중복 제거
+        labels, confidences, failed = self.score_fn([item['headline'] for item in batch])
+
+        rows = []
+        for item, label, confidence, is_failed in zip(batch, labels, confidences, failed):
+            if is_failed:
+                continue
+            ticker = item.get('related_ticker') or self.tagger.tag(item['headline'])
+            rows.append({'link': item['link'], 'sentiment': label,
+                         'confidence': round(float(confidence), 4), 'related_ticker': ticker})
+
+        written = self._update(rows) if rows else 0
+        self.stats['batches'] += 1
+        self.stats['scored'] += written
+        self.stats['failed'] += len(batch) - len(rows)
+        self.stats['tagged'] += sum(1 for row in rows if row['related_ticker'])
+        logger.info(f"뉴스 감성 분석 배치 완료: {written}/{len(batch)}개 기록")
+        return written
+
+    def backfill_unscored(self, limit: int = NEWS_INGEST_BACKFILL_PAGE_SIZE) -> int:
+        """
+        sentiment 가 NULL 인(미분석/이전 실패) 기사를 오래된 순으로 limit 개씩 다시 큐에 넣습니다.
+        호출마다 이전 호출 다음 id 부터 이어서 읽고, 끝까지 읽으면 처음(실패 후 NULL 로 남은 기사)부터 다시 시작합니다.
+        """
+        from db_utils import get_unscored_articles
+        with self._lock:
+            articles = get_unscored_articles(limit=limit, after_id=self._backfill_after_id)
+            self._backfill_after_id = articles[-1]['id'] if len(articles) >= limit else 0
+        return self.submit(articles)
+
+    def join(self) -> None:
+        """큐의 모든 기사가 처리될 때까지 대기 (CLI/테스트용)"""
+        self._queue.join()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_news_ingest_worker() -> NewsIngestWorker:
+    """프로세스 전체에서 공유하는 수집 분석 워커를 반환합니다."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = NewsIngestWorker()
+        return _worker
+
+
+def enqueue_saved_articles(articles: List[Dict[str, Any]]) -> int:
+    """크롤러가 새로 저장한 기사를 감성 분석 큐에 넣습니다 (NEWS_INGEST_ENABLED=false 면 무시)."""
+    if not NEWS_INGEST_ENABLED or not articles:
+        return 0
+    return get_news_ingest_worker().submit(articles)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="미분석 뉴스 기사 감성 분석 백필")
+    parser.add_argument("--limit", type=int, default=500)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    worker = get_news_ingest_worker()
+    count = worker.backfill_unscored(limit=args.limit)
+    print(f"{count}개 기사 분석 시작...")
+    worker.join()
+    print(worker.stats)
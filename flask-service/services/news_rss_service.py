@@ -1,7 +1,15 @@
+import os
+import time
 import feedparser
 import logging
 import requests
+import threading
 import urllib.request
+import concurrent.futures
+from collections import OrderedDict
+
+from http_client import http_get
+from services.article_extractor import fetch_article_text
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, quote
 from datetime import datetime, timezone, timedelta
@@ -24,6 +32,51 @@ COMMON_HEADERS = {
 # KST 시간대
 KST = timezone(timedelta(hours=9))
 
+# 본문 크롤링을 지원하는 피드
+CONTENT_FEEDS = ('hankyung', 'mk', 'nasdaq', 'marketbeat')
+# 본문 동시 크롤링: 워커 수 / 피드 요청 1건당 전체 대기 시간 (초)
+ARTICLE_FETCH_WORKERS = int(os.getenv('ARTICLE_FETCH_WORKERS', 8))
+ARTICLE_FETCH_DEADLINE_SECONDS = float(os.getenv('ARTICLE_FETCH_DEADLINE_SECONDS', 8))
+# 본문 캐시 (URL 기준)
+ARTICLE_CONTENT_CACHE_TTL = int(os.getenv('ARTICLE_CONTENT_CACHE_TTL', 6 * 3600))
+ARTICLE_CONTENT_CACHE_SIZE = int(os.getenv('ARTICLE_CONTENT_CACHE_SIZE', 1000))
+
+
+class ArticleContentCache:
+    """URL -> 기사 본문 TTL + LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, ttl=ARTICLE_CONTENT_CACHE_TTL, max_size=ARTICLE_CONTENT_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            item = self._items.get(url)
+            if item is None:
+                return None
+            stored_at, content = item
+            if time.time() - stored_at > self.ttl:
+                del self._items[url]
+                return None
+            self._items.move_to_end(url)
+            return content
+
+    def put(self, url, content):
+        with self._lock:
+            self._items[url] = (time.time(), content)
+            self._items.move_to_end(url)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+article_content_cache = ArticleContentCache()
+# 모든 피드 요청이 공유하는 본문 크롤링 풀 (동시 요청이 많아도 외부 사이트로 나가는 요청 수는 제한됨)
+_article_executor = concurrent.futures.ThreadPoolExecutor(max_workers=ARTICLE_FETCH_WORKERS, thread_name_prefix='article')
+_inflight = {}  # URL -> 진행 중인 Future (같은 기사를 중복으로 받지 않도록)
+_inflight_lock = threading.Lock()
+
 def _crawl_article_content(url):
     """
     뉴스 기사 본문을 크롤링합니다.
@@ -38,54 +91,57 @@ def _crawl_article_content(url):
         return ''
     
     try:
-        # 타임아웃 5초로 제한
-        response = requests.get(url, headers=COMMON_HEADERS, timeout=5)
-        response.raise_for_status()
-        
-        # 인코딩 설정
-        if 'naver.com' in url:
-            response.encoding = 'EUC-KR'
-        elif 'mk.co.kr' in url or 'hankyung.com' in url:
-            response.encoding = 'UTF-8'
-        
-        soup = BeautifulSoup(response.text, 'lxml')
-        
-        # 본문 선택자 (웹사이트별)
-        content_selectors = [
-            '#articleBodyContents',  # 네이버
-            '#viewContent',  # 네이버
-            '.article_body',  # 한국경제
-            '#newsEndContents',  # 네이버
-            'article.article',
-            'div.article-body',
-            '.article-content',
-            'p'  # 모든 p 태그
-        ]
-        
-        content = ''
-        for selector in content_selectors:
-            elements = soup.select(selector)
-            if elements:
-                # 첫 번째 요소의 텍스트 추출
-                content = elements[0].get_text(strip=True)
-                if len(content) > 100:  # 충분한 길이의 본문
-                    break
-        
-        # 스크립트, 스타일 태그 제거
-        for script in soup(["script", "style", "meta", "link"]):
-            script.decompose()
-        
-        # 본문이 없으면 전체 텍스트 추출
-        if not content or len(content) < 100:
-            content = soup.get_text(strip=True)
-        
-        # 본문 길이 제한 (10000자)
-        return content[:10000] if content else ''
-        
+        # 타임아웃 5초, ARTICLE_MAX_BYTES 까지만 읽고 도메인 규칙/밀도 기반으로 본문 추출
+        return fetch_article_text(url, headers=COMMON_HEADERS, timeout=5)
+
     except Exception as e:
         logger.warning(f"본문 크롤링 실패 ({url[:80]}): {str(e)[:100]}")
         return ''
 
+def _submit_article_fetch(url):
+    """본문 크롤링 작업 제출 (이미 진행 중이면 같은 Future 반환). 완료되면 본문을 캐시에 저장."""
+    with _inflight_lock:
+        future = _inflight.get(url)
+        if future is not None:
+            return future
+        future = _inflight[url] = _article_executor.submit(_crawl_article_content, url)
+
+    def _on_done(done_future):
+        with _inflight_lock:
+            _inflight.pop(url, None)
+        if not done_future.cancelled() and done_future.exception() is None and done_future.result():
+            article_content_cache.put(url, done_future.result())  # 실패(빈 본문)는 캐시하지 않음
+
+    future.add_done_callback(_on_done)
+    return future
+
+
+def fetch_article_contents(urls, deadline=ARTICLE_FETCH_DEADLINE_SECONDS):
+    """
+    여러 기사 본문을 동시에 가져옵니다.
+    캐시된 본문은 바로 사용하고, 나머지는 deadline 초 안에 끝난 것만 반환합니다.
+    (시간 안에 못 끝난 작업은 계속 진행되어 캐시에 저장되므로 다음 요청에서 사용됨)
+
+    Returns:
+        dict: {url: 본문}
+    """
+    contents, futures = {}, {}
+    for url in dict.fromkeys(u for u in urls if u and u != '#'):
+        cached = article_content_cache.get(url)
+        if cached is not None:
+            contents[url] = cached
+        else:
+            futures[_submit_article_fetch(url)] = url
+
+    if futures:
+        cached_count = len(contents)
+        done, not_done = concurrent.futures.wait(futures, timeout=deadline)
+        for future in done:
+            if future.exception() is None and future.result():
+                contents[futures[future]] = future.result()
+        logger.info(f"본문 크롤링: 캐시 {cached_count}개, 완료 {len(done)}개, 시간 초과 {len(not_done)}개")
+    return contents
+
 def _crawl_naver_news(limit=20):
     """
     네이버 금융 '실시간 속보' 뉴스를 크롤링
@@ -106,7 +162,7 @@ def _crawl_naver_news(limit=20):
     for url in urls_to_try:
         try:
             logger.info(f"  시도 중: {url}")
-            response = requests.get(url, headers=COMMON_HEADERS, timeout=10)
+            response = http_get(url, headers=COMMON_HEADERS, timeout=10)
             response.raise_for_status()
             response.encoding = 'EUC-KR'
             html_content = response.text
@@ -227,7 +283,7 @@ def _crawl_google_news(limit=20):
     logger.info(f"구글 뉴스 크롤링 시작 (URL: {url})...")
     
     try:
-        response = requests.get(url, headers=COMMON_HEADERS, timeout=10)
+        response = http_get(url, headers=COMMON_HEADERS, timeout=10, conditional=True)
         response.raise_for_status()
         soup = BeautifulSoup(response.content, 'xml')
         items = soup.find_all('item')
@@ -259,7 +315,7 @@ def _crawl_yahoo_news(limit=20):
     logger.info(f"Yahoo Finance 크롤링 시작 (URL: {url})...")
     
     try:
-        response = requests.get(url, headers=COMMON_HEADERS, timeout=10)
+        response = http_get(url, headers=COMMON_HEADERS, timeout=10, conditional=True)
         
         # 400 에러인 경우 대체 URL 시도
         if response.status_code == 400:
@@ -267,7 +323,7 @@ def _crawl_yahoo_news(limit=20):
             for alt_url in urls[1:]:
                 try:
                     logger.info(f"Yahoo Finance 대체 URL 시도: {alt_url}")
-                    response = requests.get(alt_url, headers=COMMON_HEADERS, timeout=10)
+                    response = http_get(alt_url, headers=COMMON_HEADERS, timeout=10, conditional=True)
                     if response.status_code == 200:
                         url = alt_url
                         break
@@ -412,8 +468,8 @@ def get_news_rss_endpoint(feed_key=None):
                 logger.info(f"타임아웃 25초로 Nasdaq RSS 피드 다운로드 시작...")
                 
                 try:
-                    # requests를 먼저 시도 (더 빠름, stream으로 부분 다운로드)
-                    response = requests.get(feed_url, headers=COMMON_HEADERS, timeout=20, stream=True)
+                    # [수정] 공용 HTTP 클라이언트로 조건부 요청 (변경 없으면 304 + 캐시된 본문)
+                    response = http_get(feed_url, headers=COMMON_HEADERS, timeout=20, conditional=True)
                     response.raise_for_status()
                     
                     # Content-Type 확인
@@ -443,7 +499,10 @@ def get_news_rss_endpoint(feed_key=None):
                         'error': 'Nasdaq RSS server is slow or unavailable. Please try again later.'
                     }
             else:
-                feed = feedparser.parse(feed_url)
+                # [수정] feedparser 가 직접 다운로드하지 않고 공용 HTTP 클라이언트로 조건부 요청 후 파싱
+                response = http_get(feed_url, headers=COMMON_HEADERS, timeout=20, conditional=True)
+                response.raise_for_status()
+                feed = feedparser.parse(response.content)
         except Exception as parse_error:
             logger.error(f"RSS 피드 파싱 실패 ({feed_key}): {parse_error}")
             # 실패 시 빈 리스트 반환 (404 에러 방지)
@@ -470,19 +529,13 @@ def get_news_rss_endpoint(feed_key=None):
                     'published': entry.get('published', entry.get('updated', '')),
                     'content': ''  # 본문 크롤링 추가
                 }
-                
-                # 뉴스 본문 크롤링 시도
-                if feed_key in ['hankyung', 'mk', 'nasdaq', 'marketbeat']:
-                    article_url = entry.get('link', '')
-                    if article_url and article_url != '#':
-                        logger.info(f"본문 크롤링 시도: {article_url[:80]}")
-                        article['content'] = _crawl_article_content(article_url)
-                        if article['content']:
-                            logger.info(f"본문 크롤링 성공: {len(article['content'])}자")
-                        else:
-                            logger.info(f"본문 크롤링 실패: 비어있는 내용")
-                
                 articles.append(article)
+
+            # [수정] 뉴스 본문은 기사별로 순차 요청하지 않고, 공유 풀에서 동시에 가져와 제한 시간 안에 끝난 것만 사용
+            if feed_key in CONTENT_FEEDS:
+                contents = fetch_article_contents([article['link'] for article in articles])
+                for article in articles:
+                    article['content'] = contents.get(article['link'], '')
         else:
             logger.warning(f"No entries found in RSS feed: {feed_key}")
         
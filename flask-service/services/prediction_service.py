@@ -10,6 +10,7 @@ import FinanceDataReader as fdr
 import yfinance as yf
 from datetime import datetime, timedelta, timezone
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from model_backends import create_direction_model_for_ticker
 import pandas_ta as ta # ASR flask-service/requirements.txt 에 pandas_ta 추가가 필요할 수 있습니다.
 
 # --- FF 프로젝트의 technical_analyzer.py (backend_logic.py 내) 로직 ---
@@ -236,7 +237,8 @@ def get_stock_prediction(ticker: str, years: int = 1, data_df: pd.DataFrame = No
 
         X_cls = df_cls[features_to_use]
         y_cls = df_cls['Target']
-        cls_model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1, max_depth=10, min_samples_leaf=5)
+        cls_model = create_direction_model_for_ticker(feature_ticker, features=features_to_use,
+                                                      years=years if data_df is None else None)
         cls_model.fit(X_cls, y_cls)
         latest_data_features = df_model_ready[features_to_use].iloc[-1].values.reshape(1, -1)
         direction_prediction = cls_model.predict(latest_data_features)[0]
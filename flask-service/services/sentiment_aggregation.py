@@ -0,0 +1,285 @@
+"""
+시간 감쇠 + 신뢰도 가중 감성 집계
+기사별 감성 레이블(gamma: 긍정 1 / 중립 0 / 부정 -1)을 FinBERT 신뢰도로 가중하고,
+발행 시각으로부터 지수적으로(반감기) 감쇠시켜 종목별 감성 점수를 계산합니다.
+
+    score(t) = Σ c_i * gamma_i * 2^(-(t - t_i) / 반감기) / (Σ c_i * 2^(-(t - t_i) / 반감기) + prior)
+
+- 종목별 상태(가중 합, 가중치 합, 기준 시각)만 보관하므로, 새로 분석된 기사만 반영하면 됩니다 (O(새 기사)).
+  증분 기준은 news_articles 의 (sentiment_scored_at, id) 워터마크이며, 상태는 SQLite 에 저장됩니다.
+  반영은 되돌릴 수 없으므로 기사 레이블은 한 번만 기록됩니다 (db_utils.update_article_sentiments).
+- prior 는 중립 가상 가중치로, 최근 기사가 적을수록 점수를 0 쪽으로 줄입니다.
+- 모델 피처용 일별 시계열은 daily_ticker_sentiment 의 일별 신뢰도 가중 합에 같은 감쇠를 적용해 만듭니다.
+"""
+
+import os
+import math
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from services.batch_prediction_service import MODEL_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_HALF_LIFE_HOURS = float(os.getenv('SENTIMENT_HALF_LIFE_HOURS', 72))
+SENTIMENT_PRIOR_WEIGHT = float(os.getenv('SENTIMENT_PRIOR_WEIGHT', 1.0))
+SENTIMENT_STATE_PATH = os.getenv('SENTIMENT_STATE_PATH', os.path.join(MODEL_CACHE_DIR, 'sentiment_state.sqlite'))
+# 증분 갱신은 이 시간(초)보다 먼저 기록된 레이블까지만 읽음. sentiment_scored_at 은 커밋 전에 정해지고
+# 여러 기록 주체(크롤러 저장, 수집 워커)가 시각 순서와 다르게 커밋하므로, 늦게 커밋된 기록이 워터마크 뒤로 밀려 누락되지 않게 함
+SENTIMENT_WATERMARK_LAG_SECONDS = float(os.getenv('SENTIMENT_WATERMARK_LAG_SECONDS', 120))
+# 저장된 기사 기반 점수를 사용하기 위한 최소 유효 가중치 (미만이면 실시간 분석 기사로 대체)
+SENTIMENT_MIN_EFFECTIVE_WEIGHT = float(os.getenv('SENTIMENT_MIN_EFFECTIVE_WEIGHT', 2.0))
+
+_GAMMA_BY_LABEL = {'negative': -1.0, 'positive': 1.0}
+
+# 점수 -> 포트폴리오 sentiment_map 키
+SENTIMENT_LABEL_THRESHOLDS = (
+    (0.3, "매우 긍정적"),
+    (0.1, "긍정적"),
+    (-0.1, "중립적"),
+    (-0.3, "부정적"),
+)
+
+
+def score_to_sentiment_label(score: float) -> str:
+    """감성 점수(-1~1)를 sentiment_map 키(매우 긍정적 ~ 매우 부정적)로 변환"""
+    for threshold, label in SENTIMENT_LABEL_THRESHOLDS:
+        if score >= threshold:
+            return label
+    return "매우 부정적"
+
+
+def _to_epoch(value) -> Optional[float]:
+    """datetime(naive 는 UTC 로 간주) -> epoch 초"""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _decay_rate(half_life_hours: float) -> float:
+    """초당 감쇠율 (ln2 / 반감기)"""
+    return math.log(2) / (max(half_life_hours, 1e-6) * 3600.0)
+
+
+def aggregate_articles(articles: Iterable[Dict[str, Any]], half_life_hours: float = SENTIMENT_HALF_LIFE_HOURS,
+                       now: Optional[datetime] = None, prior: float = SENTIMENT_PRIOR_WEIGHT) -> Tuple[float, float]:
+    """
+    기사 목록(sentiment, confidence, pub_date)을 한 번에 집계합니다 (실시간 검색 결과용).
+
+    Returns:
+        (점수, 유효 가중치)
+    """
+    now_ts = _to_epoch(now) if now else datetime.now(timezone.utc).timestamp()
+    rate = _decay_rate(half_life_hours)
+    weighted_sum = weight = 0.0
+    for article in articles:
+        t = _to_epoch(article.get('pub_date')) or now_ts  # 발행 시각이 없으면 현재 기사로 간주
+        w = float(article.get('confidence') or 0.0) * math.exp(-rate * max(now_ts - t, 0.0))
+        weighted_sum += w * _GAMMA_BY_LABEL.get(article.get('sentiment'), 0.0)
+        weight += w
+    return weighted_sum / (weight + prior) if weight + prior > 0 else 0.0, weight
+
+
+def decayed_daily_series(daily: pd.DataFrame, half_life_hours: float = SENTIMENT_HALF_LIFE_HOURS,
+                         prior: float = SENTIMENT_PRIOR_WEIGHT) -> pd.Series:
+    """
+    일별 신뢰도 가중 합(weighted_sum) / 신뢰도 합(weight) -> 일별 감쇠 점수 시계열.
+    기사가 없는 날도 감쇠가 진행되도록 달력 일 단위로 채운 뒤 1차 재귀 필터로 누적합니다.
+    """
+    if daily.empty:
+        return pd.Series(dtype=float, name='sentiment_score')
+    index = pd.date_range(daily.index.min(), daily.index.max(), freq='D')
+    daily = daily.reindex(index, fill_value=0.0)
+    day_decay = 0.5 ** (24.0 / half_life_hours)
+    # y[d] = x[d] + day_decay * y[d-1]
+    weighted_sum = lfilter([1.0], [1.0, -day_decay], daily['weighted_sum'].to_numpy(dtype=float))
+    weight = lfilter([1.0], [1.0, -day_decay], daily['weight'].to_numpy(dtype=float))
+    denominator = weight + prior
+    score = np.divide(weighted_sum, denominator, out=np.zeros_like(weighted_sum), where=denominator > 0)
+    return pd.Series(score, index=index, name='sentiment_score')
+
+
+def get_decayed_daily_sentiment(ticker: str, start_date: datetime, end_date: datetime,
+                                half_life_hours: float = SENTIMENT_HALF_LIFE_HOURS) -> pd.DataFrame:
+    """
+    모델 피처용 종목 일별 감쇠 감성 점수 (get_daily_stock_sentiment_scores 와 같은 형식: date 인덱스, sentiment_score 컬럼).
+    시작일 이전 기사도 감쇠되어 반영되도록 반감기의 10배만큼 앞에서부터 조회합니다.
+    """
+    from db_utils import get_daily_sentiment_rollup
+
+    warmup = timedelta(hours=half_life_hours * 10)
+    start_utc = start_date.astimezone(timezone.utc)
+    end_utc = end_date.astimezone(timezone.utc)
+    daily = get_daily_sentiment_rollup(ticker, start_utc - warmup, end_utc)
+    series = decayed_daily_series(daily, half_life_hours)
+    start_day = pd.Timestamp(start_utc.date())
+    df = series[series.index >= start_day].to_frame()
+    df.index.name = 'date'
+    return df
+
+
+class DecayedSentimentAggregator:
+    """
+    종목별 감쇠 감성 상태를 증분 갱신하는 집계기
+
+    상태는 기준 시각 ref_time 에서의 (가중 합 S, 가중치 합 W) 이며,
+    새 기사(t_i)는 max(ref_time, t_i) 시점으로 맞춘 뒤 더합니다.
+    fetch_fn(scored_after, after_id, limit, scored_before) 은 워터마크 이후, scored_before 이전에 기록된
+    기사 목록을 반환해야 합니다. scored_before = 현재 - watermark_lag 이므로 최근 기록은 다음 갱신 때 반영됩니다.
+    """
+
+    def __init__(self, half_life_hours: float = SENTIMENT_HALF_LIFE_HOURS, path: str = SENTIMENT_STATE_PATH,
+                 fetch_fn: Optional[Callable] = None, prior: float = SENTIMENT_PRIOR_WEIGHT, page_size: int = 1000,
+                 watermark_lag: float = SENTIMENT_WATERMARK_LAG_SECONDS):
+        self.half_life_hours = float(half_life_hours)
+        self.rate = _decay_rate(self.half_life_hours)
+        self.prior = prior
+        self.page_size = page_size
+        self.watermark_lag = watermark_lag
+        self._fetch_fn = fetch_fn
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # 반감기가 다르면 상태도 달라지므로 반감기별로 보관
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ticker_sentiment_state (
+                half_life_hours REAL NOT NULL,
+                ticker TEXT NOT NULL,
+                ref_time REAL NOT NULL,
+                weighted_sum REAL NOT NULL,
+                weight REAL NOT NULL,
+                article_count INTEGER NOT NULL,
+                PRIMARY KEY (half_life_hours, ticker)
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sentiment_watermark (
+                half_life_hours REAL PRIMARY KEY,
+                scored_after TEXT,
+                after_id INTEGER NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+        self._state: Dict[str, List[float]] = {
+            ticker: [ref_time, s, w, n] for ticker, ref_time, s, w, n in self.conn.execute(
+                "SELECT ticker, ref_time, weighted_sum, weight, article_count FROM ticker_sentiment_state "
+                "WHERE half_life_hours = ?", (self.half_life_hours,))
+        }
+        row = self.conn.execute("SELECT scored_after, after_id FROM sentiment_watermark WHERE half_life_hours = ?",
+                                (self.half_life_hours,)).fetchone()
+        self._watermark = (datetime.fromisoformat(row[0]) if row and row[0] else None, row[1] if row else 0)
+
+    def _fetch(self, scored_after, after_id, limit, scored_before):
+        if self._fetch_fn is None:
+            from db_utils import get_scored_articles_since
+            self._fetch_fn = get_scored_articles_since
+        return self._fetch_fn(scored_after, after_id, limit, scored_before)
+
+    def _fold(self, ticker: str, t: float, gamma: float, confidence: float) -> None:
+        state = self._state.get(ticker)
+        if state is None:
+            self._state[ticker] = [t, confidence * gamma, confidence, 1]
+            return
+        ref_time, s, w, n = state
+        if t > ref_time:
+            decay = math.exp(-self.rate * (t - ref_time))
+            s, w, ref_time, c = s * decay, w * decay, t, confidence
+        else:
+            c = confidence * math.exp(-self.rate * (ref_time - t))  # 늦게 들어온 과거 기사
+        self._state[ticker] = [ref_time, s + c * gamma, w + c, n + 1]
+
+    def update(self) -> int:
+        """워터마크 이후 새로 감성 레이블이 기록된 기사만 반영, 반영한 기사 수 반환"""
+        with self._lock:
+            processed = 0
+            touched = set()
+            scored_after, after_id = self._watermark
+            # sentiment_scored_at 은 naive UTC 로 저장됨
+            scored_before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.watermark_lag)
+            while True:
+                rows = self._fetch(scored_after, after_id, self.page_size, scored_before)
+                for row in rows:
+                    t = _to_epoch(row.get('pub_date')) or _to_epoch(row.get('crawl_date'))
+                    ticker = row.get('related_ticker')
+                    confidence = row.get('sentiment_confidence')
+                    # 신뢰도가 없는(모델로 분석하지 않은) 레이블은 일별 집계와 같이 가중치에 넣지 않음
+                    if t is not None and ticker and confidence is not None:
+                        self._fold(ticker, t, _GAMMA_BY_LABEL.get(row.get('sentiment'), 0.0), float(confidence))
+                        touched.add(ticker)
+                    scored_after, after_id = row['sentiment_scored_at'], row['id']
+                processed += len(rows)
+                if len(rows) < self.page_size:
+                    break
+
+            if processed:
+                self._watermark = (scored_after, after_id)
+                self._persist(touched)
+                logger.info(f"감쇠 감성 상태 갱신: 기사 {processed}개, 종목 {len(touched)}개")
+            return processed
+
+    def _persist(self, tickers) -> None:
+        scored_after, after_id = self._watermark
+        try:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO ticker_sentiment_state VALUES (?, ?, ?, ?, ?, ?)",
+                [(self.half_life_hours, t, *self._state[t]) for t in tickers]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sentiment_watermark VALUES (?, ?, ?)",
+                (self.half_life_hours, scored_after.isoformat() if scored_after else None, after_id)
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"감쇠 감성 상태 저장 실패: {e}")
+
+    def _decayed(self, ticker: str, now_ts: float) -> Tuple[float, float, int]:
+        state = self._state.get(ticker)
+        if state is None:
+            return 0.0, 0.0, 0
+        ref_time, s, w, n = state
+        decay = math.exp(-self.rate * max(now_ts - ref_time, 0.0))
+        return s * decay, w * decay, int(n)
+
+    def get_score(self, ticker: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """종목의 현재(now) 감쇠 감성 점수"""
+        return self.combined_score([ticker], now)
+
+    def combined_score(self, tickers: Iterable[str], now: Optional[datetime] = None) -> Dict[str, Any]:
+        """여러 종목(포트폴리오)의 감쇠 가중 합을 합쳐 하나의 점수로 계산"""
+        now_ts = _to_epoch(now) if now else datetime.now(timezone.utc).timestamp()
+        weighted_sum = weight = 0.0
+        articles = 0
+        with self._lock:
+            for ticker in tickers:
+                s, w, n = self._decayed(ticker.split('.')[0], now_ts)
+                weighted_sum += s; weight += w; articles += n
+        score = weighted_sum / (weight + self.prior) if weight + self.prior > 0 else 0.0
+        return {"score": score, "effective_weight": weight, "articles": articles,
+                "half_life_hours": self.half_life_hours}
+
+
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+
+def get_sentiment_aggregator() -> DecayedSentimentAggregator:
+    """프로세스 전체에서 공유하는 감쇠 감성 집계기 (SENTIMENT_HALF_LIFE_HOURS 기준)"""
+    global _aggregator
+    with _aggregator_lock:
+        if _aggregator is None:
+            _aggregator = DecayedSentimentAggregator()
+        return _aggregator
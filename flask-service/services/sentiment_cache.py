@@ -0,0 +1,140 @@
+"""
+헤드라인 감성 캐시
+같은 헤드라인이 국내/해외 뉴스 검색, RSS 피드에서 반복해서 들어오므로,
+정규화한 헤드라인의 해시를 키로 번역 결과와 감성 레이블/신뢰도를 SQLite 에 저장합니다.
+
+- 번역은 모델과 무관하므로 헤드라인 해시만으로 저장합니다.
+- 감성 결과는 (헤드라인 해시, 모델 버전) 으로 저장하여, 모델이 바뀌면 자동으로 다시 분석됩니다.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from typing import List, Dict, Any, Optional
+
+from services.batch_prediction_service import MODEL_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_CACHE_PATH = os.getenv('SENTIMENT_CACHE_PATH', os.path.join(MODEL_CACHE_DIR, 'sentiment_cache.sqlite'))
+
+
+def normalize_headline(headline: str) -> str:
+    """유니코드 정규화(NFKC) + 공백 정리 + 소문자"""
+    headline = unicodedata.normalize('NFKC', headline or '')
+    return re.sub(r'\s+', ' ', headline).strip().lower()
+
+
+def headline_hash(headline: str) -> str:
+    return hashlib.sha1(normalize_headline(headline).encode('utf-8')).hexdigest()
+
+
+class HeadlineSentimentCache:
+    """헤드라인 해시 -> 번역 / (모델 버전별) 감성 결과 SQLite 캐시"""
+
+    def __init__(self, path: str = SENTIMENT_CACHE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 요청 스레드들이 하나의 연결을 공유하므로 잠금으로 보호
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS headline_translations (
+                headline_hash TEXT PRIMARY KEY,
+                translation TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS headline_sentiments (
+                headline_hash TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                sentiment TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (headline_hash, model_version)
+            )
+        """)
+        self.conn.commit()
+
+    def _select(self, query: str, hashes: List[str], *params) -> List[tuple]:
+        rows = []
+        # SQLite 바인딩 변수 개수 제한을 피하기 위해 나눠서 조회
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows.extend(self.conn.execute(query.format(placeholders=placeholders), (*params, *chunk)).fetchall())
+        return rows
+
+    def get_many(self, headlines: List[str], model_version: str) -> List[Optional[Dict[str, Any]]]:
+        """
+        헤드라인별 캐시 항목 (입력 순서)
+
+        Returns:
+            [{'translation': str|None, 'sentiment': str|None, 'confidence': float|None} 또는 None, ...]
+        """
+        hashes = [headline_hash(h) for h in headlines]
+        unique_hashes = list(dict.fromkeys(hashes))
+        try:
+            with self._lock:
+                translations = dict(self._select(
+                    "SELECT headline_hash, translation FROM headline_translations WHERE headline_hash IN ({placeholders})",
+                    unique_hashes
+                ))
+                sentiments = {h: (s, c) for h, s, c in self._select(
+                    "SELECT headline_hash, sentiment, confidence FROM headline_sentiments "
+                    "WHERE model_version = ? AND headline_hash IN ({placeholders})",
+                    unique_hashes, model_version
+                )}
+        except sqlite3.Error as e:
+            logger.warning(f"감성 캐시 조회 실패: {e}")
+            return [None] * len(headlines)
+
+        entries = []
+        for h in hashes:
+            if h not in translations and h not in sentiments:
+                entries.append(None)
+                continue
+            sentiment, confidence = sentiments.get(h, (None, None))
+            entries.append({'translation': translations.get(h), 'sentiment': sentiment, 'confidence': confidence})
+        return entries
+
+    def put_translations(self, pairs: List[tuple]) -> None:
+        """pairs: (원문 헤드라인, 번역) 목록"""
+        rows = [(headline_hash(h), t, time.time()) for h, t in pairs if t]
+        self._write("INSERT OR REPLACE INTO headline_translations VALUES (?, ?, ?)", rows)
+
+    def put_sentiments(self, items: List[tuple], model_version: str) -> None:
+        """items: (원문 헤드라인, 감성 레이블, 신뢰도) 목록"""
+        rows = [(headline_hash(h), model_version, s, float(c), time.time()) for h, s, c in items]
+        self._write("INSERT OR REPLACE INTO headline_sentiments VALUES (?, ?, ?, ?, ?)", rows)
+
+    def _write(self, query: str, rows: List[tuple]) -> None:
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self.conn.executemany(query, rows)
+                self.conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"감성 캐시 저장 실패: {e}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_headline_sentiment_cache() -> HeadlineSentimentCache:
+    """프로세스 전체에서 공유하는 헤드라인 감성 캐시를 반환합니다."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HeadlineSentimentCache()
+        return _cache
@@ -0,0 +1,349 @@
+"""
+뉴스 헤드라인 감성 추론 서비스 (EN-FinBERT)
+프로세스 전체에서 모델을 한 번만 로드하여(최초 사용 시 또는 preload) 재사용합니다.
+모델은 eval 모드로 유지되며, 추론은 torch.inference_mode 안에서 실행됩니다.
+헤드라인은 토큰 길이순으로 정렬한 뒤 FINBERT_BATCH_SIZE 개씩 묶어, 각 묶음 안에서만 패딩합니다.
+
+추론 백엔드 (FINBERT_BACKEND):
+    - torch: PyTorch (기본값)
+    - onnx: ONNX Runtime (GPU 없는 서버용). 최초 사용 시 모델을 ONNX로 변환하여 FINBERT_ONNX_DIR 에 저장하며,
+            FINBERT_ONNX_QUANTIZE=true 이면 동적 int8 양자화 모델을 사용합니다.
+
+한국어 헤드라인 로컬 모델 (KO_SENTIMENT_ROUTE=local):
+    KR_FINBERT_MODEL_PATH 의 로컬 가중치(KR-FinBERT 등)를 한 번만 로드하여 번역 없이 바로 분석합니다.
+    레이블은 모델 config 의 id2label 을 positive/negative/neutral 로 정규화하여 사용합니다.
+
+백엔드 비교 (레이블 일치율 + 처리량):
+    python -m services.sentiment_service --file headlines.txt
+"""
+
+import os
+import time
+import logging
+import argparse
+import threading
+from typing import List, Dict, Any
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
+
+from services.batch_prediction_service import MODEL_CACHE_DIR
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+FINBERT_MODEL_NAME = os.getenv('FINBERT_MODEL_NAME', 'ProsusAI/finbert')
+FINBERT_MAX_LENGTH = int(os.getenv('FINBERT_MAX_LENGTH', 512))
+# 한 번의 forward 에 넣을 헤드라인 수 (메모리 사용량 상한)
+FINBERT_BATCH_SIZE = int(os.getenv('FINBERT_BATCH_SIZE', 32))
+FINBERT_BACKEND = os.getenv('FINBERT_BACKEND', 'torch')
+FINBERT_ONNX_QUANTIZE = os.getenv('FINBERT_ONNX_QUANTIZE', 'false').lower() == 'true'
+FINBERT_ONNX_DIR = os.getenv('FINBERT_ONNX_DIR', os.path.join(MODEL_CACHE_DIR, 'finbert_onnx'))
+# 한국어 헤드라인 처리 방식: 'translate' (OpenAI 번역 후 EN-FinBERT, 기본값) 또는 'local' (로컬 한국어 모델)
+KO_SENTIMENT_ROUTE = os.getenv('KO_SENTIMENT_ROUTE', 'translate')
+KR_FINBERT_MODEL_PATH = os.getenv('KR_FINBERT_MODEL_PATH', 'models/kr-finbert')
+
+# 모델별 레이블 표기를 공통 레이블로 정규화
+LABEL_ALIASES = {
+    'pos': 'positive', '긍정': 'positive',
+    'neg': 'negative', '부정': 'negative',
+    'neu': 'neutral', '중립': 'neutral',
+}
+
+# 모델을 사용할 수 없을 때의 결과 (fallback=True 인 결과는 캐시하지 않음)
+NEUTRAL_RESULT = {'sentiment': 'neutral', 'confidence': 0.5, 'fallback': True}
+
+
+def export_finbert_onnx(model_name: str = FINBERT_MODEL_NAME, output_dir: str = FINBERT_ONNX_DIR,
+                        quantize: bool = False) -> str:
+    """
+    FinBERT 를 ONNX 로 변환합니다 (이미 있으면 재사용).
+
+    Returns:
+        사용할 ONNX 파일 경로 (quantize=True 이면 int8 양자화 모델)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    fp32_path = os.path.join(output_dir, 'model.onnx')
+    int8_path = os.path.join(output_dir, 'model.int8.onnx')
+
+    if not os.path.exists(fp32_path):
+        logger.info(f"FinBERT ONNX 변환 시작 ({model_name} -> {fp32_path})")
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        model.eval()
+        sample = tokenizer(["Stocks rallied after earnings beat expectations."], return_tensors="pt")
+        input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+        dynamic_axes['logits'] = {0: 'batch'}
+        tmp_path = f"{fp32_path}.{os.getpid()}.tmp"
+        with torch.inference_mode():
+            torch.onnx.export(
+                model, tuple(sample[name] for name in input_names), tmp_path,
+                input_names=input_names, output_names=['logits'], dynamic_axes=dynamic_axes, opset_version=14,
+            )
+        os.replace(tmp_path, fp32_path)
+
+    if not quantize:
+        return fp32_path
+
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        logger.info(f"FinBERT ONNX 동적 int8 양자화 ({int8_path})")
+        tmp_path = f"{int8_path}.{os.getpid()}.tmp"
+        quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, int8_path)
+    return int8_path
+
+
+class FinBertSentimentService:
+    """FinBERT 모델을 소유하고 헤드라인 감성을 예측하는 장기 실행 서비스"""
+
+    def __init__(self, model_name: str = FINBERT_MODEL_NAME, max_length: int = FINBERT_MAX_LENGTH,
+                 batch_size: int = FINBERT_BATCH_SIZE, backend: str = FINBERT_BACKEND,
+                 quantize: bool = FINBERT_ONNX_QUANTIZE, onnx_dir: str = FINBERT_ONNX_DIR,
+                 local_files_only: bool = False):
+        self.model_name = model_name
+        self.local_files_only = local_files_only
+        self.max_length = max_length
+        self.batch_size = max(1, batch_size)
+        self.backend = backend
+        self.quantize = quantize
+        self.onnx_dir = onnx_dir
+        self._tokenizer = None
+        self._model = None
+        self._session = None
+        self._id2label = None
+        self._load_failed = False
+        self._load_lock = threading.Lock()
+        # 토크나이저/모델을 여러 요청 스레드가 동시에 호출하지 않도록 추론을 직렬화
+        self._inference_lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None or self._session is not None
+
+    @property
+    def active_backend(self) -> str:
+        """실제로 사용 중인 백엔드 ('onnx' 요청 후 실패하면 'torch')"""
+        if self._session is not None:
+            return 'onnx-int8' if self.quantize else 'onnx'
+        return 'torch'
+
+    @property
+    def model_version(self) -> str:
+        """
+        감성 캐시 키에 사용하는 모델 식별자 (백엔드별로 결과가 미세하게 다를 수 있으므로 포함)
+        설정값이 아니라 실제로 로드된 백엔드 기준이므로, ONNX 로드 실패로 torch 로 전환되면 torch 키를 사용합니다.
+        (ONNX 설정이면 어떤 백엔드가 로드될지 알아야 하므로 아직 로드 전이면 먼저 로드)
+        """
+        if self.backend != 'torch' and not self.is_loaded:
+            self.load()
+        backend = self.active_backend
+        return self.model_name if backend == 'torch' else f"{self.model_name}:{backend}"
+
+    def load(self) -> bool:
+        """모델을 로드합니다 (이미 로드되었거나 실패한 경우 다시 로드하지 않음)."""
+        if self.is_loaded or self._load_failed:
+            return self.is_loaded
+        with self._load_lock:
+            if self.is_loaded or self._load_failed:
+                return self.is_loaded
+            try:
+                tokenizer = AutoTokenizer.from_pretrained(self.model_name, local_files_only=self.local_files_only)
+                config = AutoConfig.from_pretrained(self.model_name, local_files_only=self.local_files_only)
+                id2label = {
+                    int(i): LABEL_ALIASES.get(label.lower(), label.lower()) for i, label in config.id2label.items()
+                }
+
+                model = None
+                session = self._load_onnx_session() if self.backend == 'onnx' else None
+                if session is None:
+                    model = AutoModelForSequenceClassification.from_pretrained(
+                        self.model_name, local_files_only=self.local_files_only
+                    )
+                    model.eval()
+                # is_loaded 는 락 없이 모델/세션만 확인하므로 토크나이저/레이블을 먼저 공개하고 모델/세션은 마지막에 설정
+                self._tokenizer = tokenizer
+                self._id2label = id2label
+                self._session = session
+                self._model = model
+                logger.info(f"FinBERT 모델 로드 완료 ({self.model_name}, backend={self.active_backend})")
+            except Exception as e:
+                logger.error(f"FinBERT 모델 로딩 실패 ({self.model_name}): {e}")
+                self._load_failed = True
+        return self.is_loaded
+
+    def _load_onnx_session(self):
+        """ONNX Runtime 세션 생성 (사용할 수 없으면 None -> PyTorch 로 대체)"""
+        if ort is None:
+            logger.warning("onnxruntime 미설치. FinBERT 를 PyTorch 백엔드로 실행합니다.")
+            return None
+        try:
+            path = export_finbert_onnx(self.model_name, self.onnx_dir, quantize=self.quantize)
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            return ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        except Exception as e:
+            logger.warning(f"FinBERT ONNX 세션 생성 실패, PyTorch 백엔드로 실행합니다: {e}")
+            return None
+
+    def preload(self) -> threading.Thread:
+        """백그라운드 스레드에서 모델을 미리 로드합니다 (서버 시작 시 사용)."""
+        thread = threading.Thread(target=self.load, name='finbert-preload', daemon=True)
+        thread.start()
+        return thread
+
+    def _predict_proba(self, features: List[Dict[str, Any]]) -> np.ndarray:
+        """토크나이즈된 한 묶음의 클래스 확률 [batch, labels]"""
+        if self._session is not None:
+            inputs = self._tokenizer.pad(features, padding=True, return_tensors="np")
+            feed = {node.name: inputs[node.name].astype(np.int64) for node in self._session.get_inputs()}
+            logits = self._session.run(['logits'], feed)[0]
+            logits = logits - logits.max(axis=1, keepdims=True)
+            exp = np.exp(logits)
+            return exp / exp.sum(axis=1, keepdims=True)
+
+        inputs = self._tokenizer.pad(features, padding=True, return_tensors="pt")
+        return F.softmax(self._model(**inputs).logits, dim=1).numpy()
+
+    def predict(self, headlines: List[str]) -> List[Dict[str, Any]]:
+        """
+        헤드라인 감성 예측
+
+        Returns:
+            [{'sentiment': 'positive'|'negative'|'neutral', 'confidence': float}, ...] (입력 순서)
+        """
+        if not headlines:
+            return []
+        if not self.load():
+            logger.warning("FinBERT 모델 없음. 중립으로 처리합니다.")
+            return [dict(NEUTRAL_RESULT) for _ in headlines]
+
+        try:
+            with self._inference_lock, torch.inference_mode():
+                # 패딩 없이 한 번만 토크나이즈한 뒤, 길이가 비슷한 헤드라인끼리 묶음을 구성
+                encodings = self._tokenizer(headlines, truncation=True, max_length=self.max_length)
+                keys = list(encodings.keys())
+                order = sorted(range(len(headlines)), key=lambda i: len(encodings['input_ids'][i]))
+
+                results = [None] * len(headlines)
+                for start in range(0, len(order), self.batch_size):
+                    bucket = order[start:start + self.batch_size]
+                    probs = self._predict_proba([{key: encodings[key][i] for key in keys} for i in bucket])
+                    preds = probs.argmax(axis=1)
+                    confidences = probs[np.arange(len(bucket)), preds]
+                    for i, pred, confidence in zip(bucket, preds.tolist(), confidences.tolist()):
+                        results[i] = {'sentiment': self._id2label[pred], 'confidence': confidence}
+            return results
+        except Exception as e:
+            logger.error(f"FinBERT 예측 오류: {e}")
+            return [dict(NEUTRAL_RESULT) for _ in headlines]
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_sentiment_service() -> FinBertSentimentService:
+    """프로세스 전체에서 공유하는 FinBERT 서비스를 반환합니다."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = FinBertSentimentService()
+        return _service
+
+
+_korean_service = None
+
+
+def get_korean_sentiment_service():
+    """
+    한국어 헤드라인용 로컬 감성 모델 서비스 (KO_SENTIMENT_ROUTE=local 일 때만, 아니면 None)
+    네트워크 없이 동작하도록 로컬 가중치만 사용합니다.
+    """
+    global _korean_service
+    if KO_SENTIMENT_ROUTE != 'local':
+        return None
+    with _service_lock:
+        if _korean_service is None:
+            _korean_service = FinBertSentimentService(model_name=KR_FINBERT_MODEL_PATH, backend='torch',
+                                                      local_files_only=True)
+        return _korean_service
+
+
+def benchmark_backends(headlines: List[str], configs=(('torch', False), ('onnx', False), ('onnx', True)),
+                       repeats: int = 3) -> List[Dict[str, Any]]:
+    """
+    백엔드별 처리량과 PyTorch 대비 레이블 일치율(parity)을 측정합니다.
+
+    Args:
+        headlines: 측정용 헤드라인 목록
+        configs: (backend, quantize) 목록 (첫 번째가 기준 레이블)
+        repeats: 처리량 측정 반복 횟수
+
+    Returns:
+        [{'backend', 'headlines_per_s', 'label_agreement', 'max_confidence_diff', 'load_time_s'}, ...]
+    """
+    rows = []
+    reference = None
+    for backend, quantize in configs:
+        service = FinBertSentimentService(backend=backend, quantize=quantize)
+        started = time.perf_counter()
+        if not service.load():
+            print(f"[{backend}] 모델 로드 실패. 건너뜁니다.")
+            continue
+        load_time = time.perf_counter() - started
+        if backend == 'onnx' and service.active_backend == 'torch':
+            print(f"[{backend}] ONNX 를 사용할 수 없어 건너뜁니다.")
+            continue
+
+        service.predict(headlines[:service.batch_size])  # 워밍업
+        started = time.perf_counter()
+        for _ in range(repeats):
+            results = service.predict(headlines)
+        elapsed = (time.perf_counter() - started) / repeats
+
+        if reference is None:
+            reference = results
+        rows.append({
+            'backend': service.active_backend,
+            'headlines_per_s': round(len(headlines) / elapsed, 1),
+            'label_agreement': round(float(np.mean([r['sentiment'] == ref['sentiment'] for r, ref in zip(results, reference)])), 4),
+            'max_confidence_diff': round(max(abs(r['confidence'] - ref['confidence']) for r, ref in zip(results, reference)), 4),
+            'load_time_s': round(load_time, 2),
+        })
+        print(rows[-1])
+    return rows
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="FinBERT 추론 백엔드 비교 (PyTorch / ONNX / ONNX int8)")
+    parser.add_argument("--file", help="한 줄에 헤드라인 하나인 텍스트 파일 (없으면 예시 헤드라인 사용)")
+    parser.add_argument("--count", type=int, default=512, help="예시 헤드라인 사용 시 측정할 개수")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            sample_headlines = [line.strip() for line in f if line.strip()]
+    else:
+        examples = [
+            "Apple shares jump after record quarterly revenue beats estimates",
+            "Tesla recalls vehicles over steering defect, stock slides",
+            "Fed holds rates steady as inflation cools",
+            "Samsung Electronics warns of weaker chip demand in the second half of the year amid inventory build-up",
+            "Nvidia extends rally on strong AI data center orders",
+            "Oil prices fall as supply concerns ease",
+            "Bank earnings mixed as loan growth slows and deposit costs rise",
+            "Retail sales unchanged in March",
+        ]
+        sample_headlines = [examples[i % len(examples)] for i in range(args.count)]
+
+    benchmark_backends(sample_headlines, repeats=args.repeats)
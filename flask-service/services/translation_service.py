@@ -0,0 +1,128 @@
+"""
+헤드라인 번역 스케줄러
+한국어 헤드라인 번역 배치를 스레드 풀에서 동시에 요청하되,
+분당 요청 수(RPM)와 분당 토큰 수(TPM) 예산을 토큰 버킷으로 지키고,
+실패한 배치는 지수 백오프(+지터)로 재시도하며, 번역 개수가 맞지 않으면 배치를 반으로 나눠 다시 요청합니다.
+
+OPENAI_BASE_URL 을 지정하면 로컬 스텁 서버로 요청을 보낼 수 있습니다.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+import concurrent.futures
+from typing import Callable, List, Optional
+
+from http_client import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_MODEL = os.getenv('TRANSLATION_MODEL', 'gpt-4o-mini')
+TRANSLATION_BATCH_SIZE = int(os.getenv('TRANSLATION_BATCH_SIZE', 20))
+TRANSLATION_MAX_CONCURRENCY = int(os.getenv('TRANSLATION_MAX_CONCURRENCY', 8))
+TRANSLATION_MAX_RETRIES = int(os.getenv('TRANSLATION_MAX_RETRIES', 3))
+# OpenAI 계정 한도보다 약간 낮게 설정
+TRANSLATION_RPM = int(os.getenv('TRANSLATION_RPM', 400))
+TRANSLATION_TPM = int(os.getenv('TRANSLATION_TPM', 150000))
+
+# 헤드라인당 응답 토큰 상한 (기존 translate_headlines_batch_openai 와 동일)
+MAX_TOKENS_PER_HEADLINE = 70
+
+
+class TranslationCountMismatch(ValueError):
+    """번역 결과 개수가 요청한 헤드라인 수와 다를 때 발생"""
+
+
+def request_translations(client, headlines_ko: List[str], model: str = TRANSLATION_MODEL) -> List[Optional[str]]:
+    """
+    OpenAI 로 번호가 매겨진 헤드라인 배치를 번역합니다 (실패 시 예외 발생).
+
+    Raises:
+        TranslationCountMismatch: 결과 개수가 다를 때
+        Exception: API/파싱 오류
+    """
+    numbered_headlines = "\n".join([f"{i+1}. {h}" for i, h in enumerate(headlines_ko)])
+    system_prompt = "You are a helpful assistant who translates Korean news headlines into English."
+    user_prompt = f"""Translate the following numbered Korean headlines into English.
+Return the results ONLY as a JSON object containing a single key "translations" which holds a list of strings. Each string in the list must be the English translation corresponding to the numbered headline.
+Example JSON structure: {{"translations": ["translation 1", "translation 2", ...]}}
+
+Korean Headlines:
+{numbered_headlines}
+
+JSON Result:"""
+    response = client.chat.completions.create(
+        model=model, messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+        max_tokens=len(headlines_ko) * MAX_TOKENS_PER_HEADLINE, temperature=0.0, response_format={"type": "json_object"})
+    translations = json.loads(response.choices[0].message.content.strip()).get("translations")
+    if not isinstance(translations, list) or len(translations) != len(headlines_ko):
+        count = len(translations) if isinstance(translations, list) else None
+        raise TranslationCountMismatch(f"번역 결과 개수 오류 ({count} != {len(headlines_ko)})")
+    return [t.strip().strip('"').strip("'") if isinstance(t, str) else None for t in translations]
+
+
+def estimate_tokens(headlines: List[str]) -> int:
+    """요청 1건이 소비할 토큰 수 추정 (프롬프트 + 최대 응답, 한글은 글자당 약 1토큰으로 보수적으로 계산)"""
+    return 150 + sum(len(h) + 4 for h in headlines) + len(headlines) * MAX_TOKENS_PER_HEADLINE
+
+
+class TranslationScheduler:
+    """
+    번역 배치 동시 실행기
+
+    request_fn(headlines) 는 번역 목록을 반환하거나, 실패 시 예외를 발생시켜야 합니다.
+    (개수가 다르면 TranslationCountMismatch)
+    """
+
+    def __init__(self, request_fn: Callable[[List[str]], List[Optional[str]]],
+                 batch_size: int = TRANSLATION_BATCH_SIZE, max_concurrency: int = TRANSLATION_MAX_CONCURRENCY,
+                 max_retries: int = TRANSLATION_MAX_RETRIES, rpm: int = TRANSLATION_RPM, tpm: int = TRANSLATION_TPM,
+                 backoff_base: float = 1.0, backoff_max: float = 30.0):
+        self.request_fn = request_fn
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # 스케줄러 인스턴스를 공유하는 모든 호출이 같은 예산을 사용
+        self.request_limiter = RateLimiter(rpm)
+        self.token_limiter = RateLimiter(tpm)
+
+    def translate(self, headlines: List[str]) -> List[Optional[str]]:
+        """헤드라인 목록 번역 (입력 순서, 최종 실패한 항목은 None)"""
+        results: List[Optional[str]] = [None] * len(headlines)
+        batches = [list(range(start, min(start + self.batch_size, len(headlines))))
+                   for start in range(0, len(headlines), self.batch_size)]
+        if not batches:
+            return results
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches)),
+                                                   thread_name_prefix='translate') as pool:
+            futures = [pool.submit(self._translate_batch, [headlines[i] for i in batch]) for batch in batches]
+            for batch, future in zip(batches, futures):
+                for i, translation in zip(batch, future.result()):
+                    results[i] = translation
+        return results
+
+    def _translate_batch(self, headlines: List[str]) -> List[Optional[str]]:
+        for attempt in range(self.max_retries + 1):
+            self.request_limiter.acquire()
+            self.token_limiter.acquire(estimate_tokens(headlines))
+            try:
+                return self.request_fn(headlines)
+            except TranslationCountMismatch as e:
+                if len(headlines) > 1:
+                    # 개수 불일치: 반으로 나눠 각각 다시 요청
+                    logger.warning(f"{e}. 배치를 나눠 재요청합니다 ({len(headlines)}개).")
+                    middle = len(headlines) // 2
+                    return self._translate_batch(headlines[:middle]) + self._translate_batch(headlines[middle:])
+                logger.warning(f"번역 실패 (단일 헤드라인, 시도 {attempt + 1}): {e}")
+            except Exception as e:
+                logger.warning(f"번역 배치 실패 ({len(headlines)}개, 시도 {attempt + 1}/{self.max_retries + 1}): {e}")
+            if attempt < self.max_retries:
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                time.sleep(delay + random.uniform(0, delay))
+        return [None] * len(headlines)
@@ -131,6 +131,23 @@ def calculate_macd(data: pd.Series, fast: int = 12, slow: int = 26, signal: int
         return {'macd': pd.Series(), 'signal': pd.Series(), 'histogram': pd.Series()}
 
 
+def calculate_momentum(close, window: int = 30) -> np.ndarray:
+    """
+    N일 모멘텀 (N일 변화율) 계산: close[window:] / close[:-window] - 1
+    
+    Args:
+        close: 종가 배열 (1차원: 한 종목, 2차원: [날짜, 종목] 으로 여러 종목을 한 번에 계산)
+        window: 변화율 기간 (기본값: 30)
+    
+    Returns:
+        변화율 배열 (numpy, 길이 = len(close) - window, 데이터가 부족하면 빈 배열)
+    """
+    close = np.asarray(close, dtype=float)
+    if len(close) <= window:
+        return np.empty((0,) + close.shape[1:])
+    return close[window:] / close[:-window] - 1
+
+
 def calculate_obv(close: pd.Series, volume: pd.Series):
     """
     OBV (On-Balance Volume) 계산